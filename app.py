@@ -2,17 +2,16 @@ import streamlit as st
 import os
 from dotenv import load_dotenv 
 from utils.resume_parser import ResumeParser
+from utils.resilience import ResilientCaller
 from utils.fitment_scorer import FitmentScorer
 from utils.email_sender import EmailSender
 from utils.database_manager import DatabaseManager
+from utils.parse_cache import ParseCache
 import json
 
 # Load environment variables
 load_dotenv()
 
-# Initialize database
-db = DatabaseManager()
-
 # Page configuration
 st.set_page_config(
     page_title="people.ai - AI Recruitment",
@@ -21,6 +20,13 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Initialize database - one pooled manager shared by all sessions
+@st.cache_resource(show_spinner=False)
+def init_database():
+    return DatabaseManager()
+
+db = init_database()
+
 # Enhanced Custom CSS
 st.markdown("""
 <style>
@@ -328,7 +334,15 @@ def init_clients():
     if not gemini_api_key:
         raise ValueError("GEMINI_API_KEY not found in .env file")
     
-    parser = ResumeParser(gemini_api_key)
+    # Parse cache lives next to the main database
+    db_dir = os.path.dirname(os.getenv('DATABASE_PATH', 'database.db'))
+    parse_cache = ParseCache(os.path.join(db_dir, 'parse_cache.db'))
+    
+    resilience = ResilientCaller(timeout=float(os.getenv('GEMINI_TIMEOUT', '60')), hedge_percentile=95)
+    # Skip Gemini for the heuristic parser while its p95 latency is over budget
+    latency_budget = os.getenv('GEMINI_LATENCY_BUDGET')
+    parser = ResumeParser(gemini_api_key, cache=parse_cache, resilience=resilience,
+                          latency_budget=float(latency_budget) if latency_budget else 20.0)
     scorer = FitmentScorer()
     mailer = EmailSender(smtp_server, smtp_port, email_address, email_password)
     
@@ -390,7 +404,8 @@ if st.session_state.page == 'upload':
                     # Parse resume
                     status_text.text("🤖 AI is analyzing your resume...")
                     progress_bar.progress(50)
-                    parsed_data = parser.parse_resume(file_bytes, uploaded_file.name)
+                    # Async path: per-call deadline and retries instead of blocking this script thread indefinitely
+                    parsed_data = parser.run_async(parser.parse_resume_async(file_bytes, uploaded_file.name))
                     
                     progress_bar.progress(100)
                     status_text.text("✅ Parsing complete!")
@@ -419,6 +434,9 @@ elif st.session_state.page == 'form':
     st.markdown("---")
     
     data = st.session_state.parsed_data
+    if data.get('parsed_by'):
+        st.warning("⚠️ The AI parser was unavailable, so these fields were filled in by a simpler "
+                   "fallback parser. Please check them carefully before continuing.")
     
     # Create form
     with st.form("candidate_form"):
@@ -700,50 +718,38 @@ elif st.session_state.page == 'form':
                     status_text.text("💾 Saving to database...")
                     progress_bar.progress(50)
                     
-                    # Save candidate
-                    candidate_id = db.save_candidate(candidate_data)
-                    
-                    # Save resume if available
-                    if st.session_state.resume_bytes:
-                        db.save_resume(
-                            candidate_id,
-                            st.session_state.resume_filename,
-                            st.session_state.resume_bytes,
-                            st.session_state.resume_filename.split('.')[-1],
-                            str(data)
-                        )
-                    
-                    # Save initial fitment score
-                    db.save_fitment_score(candidate_id, fitment_result)
-                    
-                    # Create personality test token
-                    status_text.text("🧠 Creating personality test...")
+                    # Save candidate, resume (if available), initial fitment score and
+                    # personality test token in one transaction
+                    resume_filename = st.session_state.resume_filename
+                    candidate_id, test_token = db.submit_application(
+                        candidate_data,
+                        fitment_result,
+                        filename=resume_filename,
+                        file_content=st.session_state.resume_bytes or None,
+                        file_type=resume_filename.split('.')[-1] if resume_filename else None,
+                        extracted_text=str(data)
+                    )
                     progress_bar.progress(60)
-                    test_token = db.create_personality_test(candidate_id)
                     
                     # Build test URL (Streamlit big5 test on port 8502)
                     test_url = f"http://localhost:8502?token={test_token}"
                     
-                    # Send confirmation email with test link
-                    status_text.text("📧 Sending confirmation email...")
+                    # Queue confirmation email with test link - email_worker.py delivers it
+                    status_text.text("📧 Queueing confirmation email...")
                     progress_bar.progress(80)
                     
-                    email_sent = mailer.send_confirmation_email(
-                        email, 
-                        name, 
-                        test_token,
-                        "http://localhost:8502"  # Big5 test URL
-                    )
-                    
-                    # Log email
-                    db.log_email(
-                        candidate_id,
-                        'confirmation',
-                        email,
-                        'Application Received - Next Steps',
-                        'sent' if email_sent else 'failed',
-                        None if email_sent else 'SMTP error'
-                    )
+                    try:
+                        message = mailer.render_confirmation_email(
+                            name,
+                            test_token,
+                            "http://localhost:8502"  # Big5 test URL
+                        )
+                        db.enqueue_email(candidate_id, 'confirmation', email,
+                                         message.subject, message.html, message.text)
+                        email_queued = True
+                    except Exception as e:
+                        print(f"Error queueing confirmation email: {str(e)}")
+                        email_queued = False
                     
                     progress_bar.progress(100)
                     status_text.empty()
@@ -756,11 +762,11 @@ elif st.session_state.page == 'form':
                     st.session_state.test_token = test_token
                     st.session_state.test_url = test_url
                     
-                    if email_sent:
+                    if email_queued:
                         st.success("✅ Application submitted successfully!")
                         st.info(f"📧 Check your email for the personality test link")
                     else:
-                        st.warning(f"⚠️ Application submitted but email failed to send.")
+                        st.warning(f"⚠️ Application submitted but the email could not be queued.")
                         st.info(f"🔗 Direct test link: {test_url}")
                     
                     st.session_state.page = 'results'
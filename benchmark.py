@@ -0,0 +1,747 @@
+"""
+Performance benchmarks for people.ai
+Each benchmark runs against throwaway data in a temporary directory
+
+Usage:
+    python benchmark.py resume-scan [--resumes 500] [--size-kb 150]
+    python benchmark.py smtp [--messages 200] [--handshake-ms 50]
+    python benchmark.py email-render [--messages 10000]
+    python benchmark.py pdf-extract [--pages 5 50 500] [--workers 4]
+    python benchmark.py prompt-budget [--resumes 200] [--token-budget 6000]
+    python benchmark.py fast-path [--corpus fixtures/resumes] [--record]
+    python benchmark.py parse-async [--resumes 400] [--failure-rate 0.05] [--tail-rate 0.02]
+    python benchmark.py decode [--responses 2000] [--malformed-rate 0.05]
+    python benchmark.py batch-parse [--resumes 400] [--batch-tokens 0 4000 12000]
+    python benchmark.py fallback [--resumes 200] [--slow-ms 300] [--latency-budget-ms 100]
+    python benchmark.py personality-rescore [--tests 100000] [--legacy-sample 2000]
+    python benchmark.py retention-batch [--candidates 100000]
+"""
+
+import argparse
+import asyncio
+import glob
+import io
+import json
+import os
+import random
+import re
+import socketserver
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from utils.database_manager import DatabaseManager
+from utils.email_sender import EmailSender
+from utils.candidate_schema import coerce_candidate, default_values
+from utils.fast_extractor import FAST_FIELDS, extract_fields
+from utils.json_repair import decode_json_object
+from utils.parser_backends import BackendRouter, HeuristicBackend
+from utils import email_templates
+from utils.big5_scoring import BIG5_QUESTIONS, TRAITS
+from utils.fitment_scorer import FitmentScorer
+from utils.ingestion import IngestionStats
+from utils.pdf_extraction import extract_pdf_text, PAGE_SEPARATOR
+from utils.resilience import ResilientCaller
+from utils.retention_scorer import RISK_FLAGS, RetentionScorer
+from utils.resume_parser import ResumeParser
+from stub_model import StubModel
+from utils.text_preprocessor import estimate_tokens
+
+import numpy as np
+import pandas as pd
+import PyPDF2
+
+LEGACY_RESUMES_SQL = '''
+    CREATE TABLE resumes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        candidate_id TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        file_content BLOB NOT NULL,
+        file_type TEXT NOT NULL,
+        extracted_text TEXT,
+        uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+def timed(fn, repeat: int = 5) -> float:
+    """Best-of-N wall time in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_resume_scan(args):
+    """Full scan of the resumes table with BLOBs inline vs. in the blob store"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+
+        conn = sqlite3.connect(db_path)
+        conn.execute(LEGACY_RESUMES_SQL)
+        conn.executemany(
+            'INSERT INTO resumes (candidate_id, filename, file_content, file_type, extracted_text) VALUES (?, ?, ?, ?, ?)',
+            ((f'CAND_{i}', f'resume_{i}.pdf', os.urandom(args.size_kb * 1024), 'pdf', 'text ' * 200)
+             for i in range(args.resumes))
+        )
+        conn.commit()
+
+        def scan():
+            conn.execute('SELECT * FROM resumes').fetchall()
+
+        before_size = os.path.getsize(db_path)
+        before = timed(scan)
+        conn.close()
+
+        DatabaseManager(db_path).close()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute('VACUUM')
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        after_size = os.path.getsize(db_path)
+        after = timed(scan)
+        conn.close()
+
+    print(f"resumes table scan ({args.resumes} rows, {args.size_kb} KB files)")
+    print(f"  inline BLOBs: {before * 1000:8.2f} ms  db size {before_size / 1e6:8.1f} MB")
+    print(f"  blob store:   {after * 1000:8.2f} ms  db size {after_size / 1e6:8.1f} MB")
+    print(f"  speedup:      {before / after:8.1f}x")
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server that accepts and discards every message"""
+
+    def handle(self):
+        # Stand-in for the TLS handshake and AUTH round trips of a real server
+        time.sleep(self.server.handshake_delay)
+        self.wfile.write(b'220 sink ready\r\n')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command == b'EHLO':
+                self.wfile.write(b'250-sink\r\n250 8BITMIME\r\n')
+            elif command == b'DATA':
+                self.wfile.write(b'354 end with .\r\n')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                self.server.messages += 1
+                self.wfile.write(b'250 queued\r\n')
+            elif command == b'QUIT':
+                self.wfile.write(b'221 bye\r\n')
+                return
+            else:
+                self.wfile.write(b'250 ok\r\n')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handshake_delay: float):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.handshake_delay = handshake_delay
+        self.messages = 0
+
+
+def bench_smtp(args):
+    """Email throughput: a new SMTP session per message vs. one reused session"""
+    sink = SMTPSink(args.handshake_ms / 1000)
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    port = sink.server_address[1]
+
+    sender = EmailSender('127.0.0.1', port, 'bench@people.ai', '', use_tls=False)
+    email = sender.render_confirmation_email('Bench Candidate', 'TOKEN123')
+    messages = [(f'candidate{i}@example.com', *email) for i in range(args.messages)]
+
+    start = time.perf_counter()
+    for message in messages:
+        sender.deliver(*message)
+        sender.close()
+    per_message = time.perf_counter() - start
+    per_message_connections = sender.connections_opened
+
+    sender.connections_opened = 0
+    start = time.perf_counter()
+    errors = sender.send_many(messages)
+    sender.close()
+    reused = time.perf_counter() - start
+
+    sink.shutdown()
+    sink.server_close()
+
+    failed = sum(error is not None for error in errors)
+    print(f"SMTP delivery ({args.messages} messages, {args.handshake_ms} ms handshake, {sink.messages} received)")
+    print(f"  session per message: {args.messages / per_message:8.1f} msg/s  {per_message_connections} connections")
+    print(f"  send_many:           {args.messages / reused:8.1f} msg/s  {sender.connections_opened} connections"
+          f"{f'  {failed} failed' if failed else ''}")
+    print(f"  speedup:             {per_message / reused:8.1f}x")
+
+
+def bench_email_render(args):
+    """Render cost per message of each email template, as paid by bulk sends"""
+    score_data = {
+        'overall_fitment_score': 83.4, 'category': 'Experienced', 'fitment_score': 77.12, 'big5_score': 66.0,
+        'breakdown': {'dataset_contribution': '70%', 'big5_contribution': '30%'},
+        'big5_trait_scores': {'O': 0.8, 'C': 0.6, 'E': 0.5, 'A': 0.7, 'N': 0.3}
+    }
+    big5_scores = {'openness': 30, 'conscientiousness': 31, 'extraversion': 20, 'agreeableness': 28, 'neuroticism': 12}
+    retention_data = {
+        'retention_score': 71, 'retention_risk': 'Medium', 'flag_count': 2,
+        'component_scores': {'stability': 60, 'personality': 70, 'engagement': 80, 'fitment_factor': 75},
+        'risk_flags': ['Short average tenure', 'Low research engagement'],
+        'insights': [f'Recommendation {i}' for i in range(5)]
+    }
+    renders = {
+        'confirmation': lambda i: email_templates.render_confirmation(
+            f'Candidate {i}', f'http://localhost:8502?token=TOKEN{i}'),
+        'fitment_score': lambda i: email_templates.render_fitment_score(f'Candidate {i}', score_data),
+        'comprehensive_results': lambda i: email_templates.render_comprehensive_results(
+            f'Candidate {i}', score_data, big5_scores, retention_data),
+    }
+
+    print(f"Email render cost ({args.messages} messages each, HTML + plain text)")
+    for name, render in renders.items():
+        elapsed = timed(lambda: [render(i) for i in range(args.messages)], repeat=3)
+        print(f"  {name:<22} {elapsed / args.messages * 1e6:8.1f} us/msg  {args.messages / elapsed:10.0f} msg/s")
+
+
+def make_synthetic_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    """Minimal valid PDF with one text page per page, built without a PDF library"""
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_ids = []
+    for page in range(pages):
+        lines = [f'Page {page + 1} line {line}: Published paper on distributed systems, IIT Delhi, 2019'
+                 for line in range(lines_per_page)]
+        stream = 'BT /F1 10 Tf 50 780 Td 12 TL ' + ' '.join(f'({line}) Tj T*' for line in lines) + ' ET'
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream.encode()))
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % len(objects))
+        page_ids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % page_id for page_id in page_ids), pages)
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    out.write(b''.join(b'%010d 00000 n \n' % offset for offset in offsets))
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def legacy_extract_pdf(file_bytes: bytes) -> str:
+    """Pre-streaming ResumeParser.extract_text_from_pdf - string concatenation per page"""
+    text = ""
+    for page in PyPDF2.PdfReader(io.BytesIO(file_bytes)).pages:
+        text += page.extract_text()
+    return text
+
+
+def bench_pdf_extract(args):
+    """PDF text extraction: per-page concatenation vs. streamed and page-parallel extraction"""
+    print(f"PDF text extraction (page cap and byte budget disabled, {args.workers} workers)")
+    for pages in args.pages:
+        pdf = make_synthetic_pdf(pages)
+        legacy = timed(lambda: legacy_extract_pdf(pdf), repeat=3)
+        serial = timed(lambda: extract_pdf_text(pdf, max_pages=pages, max_bytes=None, workers=1), repeat=3)
+        parallel = timed(lambda: extract_pdf_text(pdf, max_pages=pages, max_bytes=None, workers=args.workers,
+                                                  parallel_min_pages=0), repeat=3)
+        capped = timed(lambda: extract_pdf_text(pdf), repeat=3)
+        print(f"  {pages:>4} pages ({len(pdf) / 1e6:5.2f} MB): legacy {legacy * 1000:8.1f} ms  "
+              f"streamed {serial * 1000:8.1f} ms  parallel {parallel * 1000:8.1f} ms  "
+              f"default caps {capped * 1000:8.1f} ms")
+
+
+def make_synthetic_resume(index: int, pages: int, papers: int) -> str:
+    """Extracted-text resume with a running header, page footers and a publication list"""
+    body = [
+        f"Candidate {index}", f"candidate{index}@example.com | +91 98765 {index:05d}", "Srinagar, Jammu & Kashmir", "",
+        "EDUCATION", "PhD Computer Science, IIT Delhi, 2015", "M.Tech, NIT Srinagar, 2010", "",
+        "EXPERIENCE", "Associate Professor, University of Kashmir, 2016-present",
+        "Assistant Professor, NIT Srinagar, 2010-2016", "",
+        "PUBLICATIONS",
+    ] + [
+        f"{i + 1}. C. Author, B. Kumar, C. Singh, D. Gupta, E. Sharma. Paper {i} on deep learning for medical "
+        f"imaging and federated analytics. IEEE Transactions on Something, vol. {i % 40}, pp. {i}-{i + 9}, 2019."
+        for i in range(papers)
+    ] + ["", "REFERENCES", "Prof. X, IIT Delhi, x@iitd.ac.in", "", "DECLARATION",
+         "I hereby declare that the above information is true to the best of my knowledge."]
+
+    per_page = -(-len(body) // pages)
+    chunks = [body[i:i + per_page] for i in range(0, len(body), per_page)]
+    return PAGE_SEPARATOR.join(
+        f"Candidate {index} - Curriculum Vitae\n" + "\n".join(chunk) +
+        f"\n    Page {n + 1} of {len(chunks)}    \ncandidate{index}@example.com"
+        for n, chunk in enumerate(chunks)
+    )
+
+
+def bench_prompt_budget(args):
+    """Prompt tokens and stub parse latency with and without the preprocessing token budget"""
+    rng = random.Random(7)
+    # Mostly one or two page CVs with a long tail of publication-heavy academic ones
+    resumes = []
+    for i in range(args.resumes):
+        pages = rng.choice([1, 1, 2, 2, 2, 3, 4]) if rng.random() < 0.9 else rng.randint(10, 40)
+        resumes.append(make_synthetic_resume(i, pages, papers=pages * 12))
+
+    print(f"Prompt construction ({args.resumes} resumes, stub model {args.ms_per_1k_tokens} ms per 1k tokens)")
+    modes = (('raw text', False, None), ('cleaned', True, None), (f'budget {args.token_budget}', True, args.token_budget))
+    for label, preprocess, budget in modes:
+        parser = ResumeParser(model=StubModel(seconds_per_1k_tokens=args.ms_per_1k_tokens / 1000),
+                              token_budget=budget)
+        latencies = []
+        tokens = []
+        for text in resumes:
+            prepared = parser.prepare_text(text).text if preprocess else text
+            start = time.perf_counter()
+            parser.parse_text(prepared, preprocess=False)
+            latencies.append(time.perf_counter() - start)
+            tokens.append(estimate_tokens(prepared))
+        p50 = IngestionStats._percentile(latencies, 50)
+        p95 = IngestionStats._percentile(latencies, 95)
+        print(f"  {label:<12} tokens sent {sum(tokens):>9}  max/doc {max(tokens):>6}  "
+              f"p50 {p50 * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms")
+
+
+def _agrees(field: str, local, reference) -> bool:
+    if isinstance(local, list):
+        return len(local) == len(reference or [])
+    if field == 'phone':
+        return re.sub(r'\D', '', local) == re.sub(r'\D', '', str(reference or ''))
+    if field == 'email':
+        return local.lower() == str(reference or '').lower()
+    return local == reference
+
+
+def bench_fast_path(args):
+    """Agreement of the rule-based fast path with reference parses, and prompt tokens saved"""
+    texts = sorted(glob.glob(os.path.join(args.corpus, '*.txt')))
+    if not texts:
+        raise SystemExit(f"❌ No .txt resumes in {args.corpus}")
+
+    if args.record:
+        load_dotenv()
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            raise SystemExit("❌ GEMINI_API_KEY is required to record reference parses")
+        llm = ResumeParser(api_key, fast_path=False)
+        for path in texts:
+            with open(path, encoding='utf-8') as f:
+                reference = llm.parse_text(f.read())
+            with open(path[:-4] + '.json', 'w', encoding='utf-8') as f:
+                json.dump(reference, f, indent=2)
+            print(f"  recorded {os.path.basename(path)[:-4]}.json")
+
+    prompt_parser = ResumeParser(model=StubModel())
+    agree = dict.fromkeys(FAST_FIELDS, 0)
+    compared = dict.fromkeys(FAST_FIELDS, 0)
+    elapsed = 0.0
+    full_tokens = fast_tokens = 0
+    for path in texts:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        with open(path[:-4] + '.json', encoding='utf-8') as f:
+            reference = json.load(f)
+
+        start = time.perf_counter()
+        local = extract_fields(text)
+        elapsed += time.perf_counter() - start
+
+        for field, value in local.items():
+            compared[field] += 1
+            if _agrees(field, value, reference.get(field)):
+                agree[field] += 1
+            elif args.verbose:
+                print(f"  ✗ {os.path.basename(path)} {field}: local {value!r} reference {reference.get(field)!r}")
+        full_tokens += estimate_tokens(prompt_parser.build_prompt(text))
+        fast_tokens += estimate_tokens(prompt_parser.build_prompt(text, exclude=local))
+
+    total_agree = sum(agree.values())
+    total_compared = sum(compared.values())
+    print(f"Fast path on {len(texts)} resumes: {elapsed / len(texts) * 1e6:.0f} µs/doc, "
+          f"agreement {total_agree}/{total_compared} ({total_agree / max(total_compared, 1):.0%})")
+    for field in FAST_FIELDS:
+        if compared[field]:
+            print(f"  {field:<22} {agree[field]:>3}/{compared[field]:<3} filled locally in "
+                  f"{compared[field] / len(texts):.0%} of resumes")
+    print(f"  prompt tokens: {full_tokens} -> {fast_tokens} "
+          f"({(full_tokens - fast_tokens) / max(full_tokens, 1):.0%} fewer)")
+
+
+def bench_parse_async(args):
+    """Parse latency and failures against a flaky, long-tailed fake model: blocking vs async with retries/hedging"""
+    texts = [make_synthetic_resume(i, 1, papers=5) for i in range(args.resumes)]
+
+    def fake_model():
+        return StubModel(args.latency_ms / 1000, failure_rate=args.failure_rate, tail_rate=args.tail_rate,
+                         tail_latency_seconds=args.tail_ms / 1000, seed=11)
+
+    def report(label, latencies, failures, model):
+        p50 = IngestionStats._percentile(latencies, 50) if latencies else 0
+        p95 = IngestionStats._percentile(latencies, 95) if latencies else 0
+        p99 = IngestionStats._percentile(latencies, 99) if latencies else 0
+        print(f"  {label:<22} ok {len(latencies):>4}  failed {failures:>3}  model calls {model.calls:>4}  "
+              f"p50 {p50 * 1000:6.1f} ms  p95 {p95 * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms")
+
+    print(f"{args.resumes} parses, {args.latency_ms} ms model, {args.failure_rate:.0%} transient errors, "
+          f"{args.tail_rate:.0%} of calls +{args.tail_ms} ms")
+
+    # Blocking path: no deadline, no retry
+    model = fake_model()
+    parser = ResumeParser(model=model)
+    latencies, failures = [], 0
+    for text in texts:
+        start = time.perf_counter()
+        try:
+            parser.parse_text(text)
+            latencies.append(time.perf_counter() - start)
+        except Exception:
+            failures += 1
+    report('blocking', latencies, failures, model)
+
+    for label, hedge in (('async + retries', None), (f'async + hedge p{args.hedge_percentile:g}', args.hedge_percentile)):
+        model = fake_model()
+        parser = ResumeParser(model=model, resilience=ResilientCaller(
+            timeout=args.timeout_ms / 1000, attempts=3, base_delay=0.01, hedge_percentile=hedge))
+
+        async def run_all():
+            latencies, failures = [], 0
+            for text in texts:
+                start = time.perf_counter()
+                try:
+                    await parser.parse_text_async(text)
+                    latencies.append(time.perf_counter() - start)
+                except Exception:
+                    failures += 1
+            return latencies, failures
+
+        latencies, failures = asyncio.run(run_all())
+        report(label, latencies, failures, model)
+
+
+def legacy_decode(response_text: str) -> dict:
+    """Response decoding as it was before structured output: fence regexes, json.loads, default fill"""
+    response_text = response_text.strip()
+    response_text = re.sub(r'^```json\s*', '', response_text)
+    response_text = re.sub(r'^```\s*', '', response_text)
+    response_text = re.sub(r'\s*```$', '', response_text)
+    parsed = json.loads(response_text.strip())
+    for key, default_val in default_values().items():
+        if key not in parsed:
+            parsed[key] = default_val
+    return parsed
+
+
+def bench_decode(args):
+    """Model answer decoding: legacy json.loads vs repairing, schema-coercing decoder"""
+    model = StubModel(malformed_rate=args.malformed_rate, seed=5)
+    parser = ResumeParser(model=model)
+    responses = [model._respond(parser.build_prompt(make_synthetic_resume(i, 1, papers=8)))
+                 for i in range(args.responses)]
+
+    def legacy():
+        failures = 0
+        for text in responses:
+            try:
+                legacy_decode(text)
+            except json.JSONDecodeError:
+                failures += 1
+        return failures
+
+    def repairing():
+        failures = 0
+        for text in responses:
+            decoded, _ = decode_json_object(text)
+            if decoded is None:
+                failures += 1
+            else:
+                coerce_candidate(decoded)
+        return failures
+
+    print(f"Decoding {args.responses} answers, {args.malformed_rate:.0%} truncated")
+    for label, decode in (('legacy json.loads', legacy), ('repair + coerce', repairing)):
+        failures = decode()
+        seconds = timed(decode)
+        print(f"  {label:<18} {seconds / len(responses) * 1e6:7.1f} µs/answer  "
+              f"re-requests needed {failures:>4} ({failures / len(responses):.1%})")
+
+
+def bench_batch_parse(args):
+    """Documents/sec with several resumes per LLM request, against a stub with per-request overhead"""
+    rng = random.Random(3)
+    texts = [make_synthetic_resume(i, 1, papers=rng.randint(0, 6)) for i in range(args.resumes)]
+
+    print(f"{args.resumes} short resumes, stub model {args.request_ms} ms per request + "
+          f"{args.ms_per_1k_tokens} ms per 1k tokens, {args.concurrency} concurrent requests")
+    for budget in args.batch_tokens:
+        model = StubModel(args.request_ms / 1000, args.ms_per_1k_tokens / 1000)
+        parser = ResumeParser(model=model)
+        prepared = [parser.prepare_text(text).text for text in texts]
+
+        batches, batch, batch_tokens = [], [], 0
+        for text in prepared:
+            tokens = estimate_tokens(text)
+            if batch and (batch_tokens + tokens > budget or len(batch) >= args.batch_docs):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        batches.append(batch)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            parsed = sum(len(results) for results in pool.map(
+                lambda docs: parser.parse_batch(docs, preprocess=False), batches))
+        elapsed = time.perf_counter() - start
+        prompt_tokens = sum(estimate_tokens(parser.build_batch_prompt(docs) if len(docs) > 1 else
+                                            parser.build_prompt(docs[0])) for docs in batches)
+        label = f"batch {budget} tokens" if budget else "one per request"
+        print(f"  {label:<20} requests {model.calls:>4}  {parsed / elapsed:7.1f} docs/sec  "
+              f"prompt tokens/doc {prompt_tokens // parsed}")
+
+
+def bench_fallback(args):
+    """Completed parses and docs/sec during a model outage and a slowdown, with and without the backend router"""
+    rng = random.Random(5)
+    texts = [make_synthetic_resume(i, 1, papers=rng.randint(0, 6)) for i in range(args.resumes)]
+    scenarios = [
+        ('outage', lambda: StubModel(args.latency_ms / 1000, failure_rate=1.0, seed=1)),
+        ('slowdown', lambda: StubModel(args.slow_ms / 1000, seed=1)),
+    ]
+
+    print(f"{args.resumes} resumes, {args.concurrency} concurrent requests, "
+          f"latency budget {args.latency_budget_ms:.0f} ms")
+    for scenario, make_model in scenarios:
+        for routed in (False, True):
+            model = make_model()
+            router = BackendRouter([model, HeuristicBackend()], latency_budget=args.latency_budget_ms / 1000,
+                                   probe_interval=1.0) if routed else None
+            parser = ResumeParser(model=router or model)
+
+            def parse(text):
+                try:
+                    parser.parse_text(text)
+                    return True
+                except Exception:
+                    return False
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                parsed = sum(pool.map(parse, texts))
+            elapsed = time.perf_counter() - start
+            label = f"{scenario}, {'router' if routed else 'model only'}"
+            served = f"  {router.report()}" if router else ''
+            print(f"  {label:<22} parsed {parsed:>4}/{len(texts)}  {parsed / elapsed:8.1f} docs/sec{served}")
+
+
+def legacy_big5_scores(answers: dict) -> dict:
+    """Per-answer scoring as big5_test_app did before utils/big5_scoring.py"""
+    scores = {trait: 0 for trait in TRAITS}
+    for q_id, answer_value in answers.items():
+        question = next((q for q in BIG5_QUESTIONS if q['id'] == q_id), None)
+        if question:
+            scores[question['trait']] += 6 - answer_value if question['reverse'] else answer_value
+    return {trait: int((score - 10) * 40 / 40) for trait, score in scores.items()}
+
+
+def bench_personality_rescore(args):
+    """Rescoring stored personality tests: per-row decode/score/update vs the chunked matrix job"""
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'rescore.db')
+        db = DatabaseManager(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.executemany(
+            'INSERT INTO candidates (candidate_id, name, email, longevity_years, average_experience, workshops, '
+            'trainings, total_papers, achievements, number_of_unique_designations) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            ((f'CAND{i}', f'Candidate {i}', f'c{i}@example.com', rng.uniform(0, 12), rng.uniform(0, 15),
+              rng.randint(0, 15), rng.randint(0, 15), rng.randint(0, 5), rng.randint(0, 9), rng.randint(1, 6))
+             for i in range(args.tests))
+        )
+        conn.executemany(
+            "INSERT INTO personality_tests (candidate_id, test_token, test_status, test_answers) "
+            "VALUES (?, ?, 'completed', ?)",
+            ((f'CAND{i}', f'token{i}', json.dumps([[q['id'], rng.randint(1, 5)] for q in BIG5_QUESTIONS]))
+             for i in range(args.tests))
+        )
+        conn.commit()
+        print(f"{args.tests:,} completed tests")
+
+        scorer = FitmentScorer()
+        legacy_rows = conn.execute(
+            'SELECT p.id, p.test_answers, c.* FROM personality_tests p '
+            'JOIN candidates c ON c.candidate_id = p.candidate_id LIMIT ?', (args.legacy_sample,)
+        )
+        columns = [desc[0] for desc in legacy_rows.description]
+        expected = {}
+        start = time.perf_counter()
+        for row in legacy_rows.fetchall():
+            record = dict(zip(columns, row))
+            big5 = legacy_big5_scores({q_id: value for q_id, value in json.loads(record['test_answers'])})
+            scorer.calculate_overall_fitment(record, big5)
+            conn.execute('UPDATE personality_tests SET openness = ?, conscientiousness = ?, extraversion = ?, '
+                         'agreeableness = ?, neuroticism = ? WHERE id = ?',
+                         (*(big5[trait] for trait in TRAITS), record['id']))
+            conn.commit()
+            expected[record['id']] = big5
+        legacy = time.perf_counter() - start
+        print(f"  per-row (sample {args.legacy_sample:,}) {args.legacy_sample / legacy:10,.0f} tests/sec  "
+              f"-> {args.tests / (args.legacy_sample / legacy):,.1f}s projected for all")
+
+        start = time.perf_counter()
+        total = db.rescore_personality_tests(scorer.score_batch, chunk_size=args.chunk_size)
+        batched = time.perf_counter() - start
+        print(f"  chunked matrix job     {total / batched:10,.0f} tests/sec  ({batched:.2f}s for {total:,})")
+
+        rescored = conn.execute(f'SELECT id, {", ".join(TRAITS)} FROM personality_tests WHERE id <= ?',
+                                (max(expected),)).fetchall()
+        mismatches = sum(dict(zip(TRAITS, row[1:])) != expected[row[0]] for row in rescored if row[0] in expected)
+        print(f"  trait mismatches vs per-row scoring: {mismatches}")
+        conn.close()
+        db.close()
+
+
+def bench_retention_batch(args):
+    """Retention risk for a whole candidate base: per-candidate calculate_retention_risk vs the batch API"""
+    rng = np.random.default_rng(13)
+    n = args.candidates
+    df = pd.DataFrame({
+        'longevity_years': rng.uniform(0, 12, n),
+        'number_of_unique_designations': rng.integers(0, 7, n),
+        'average_experience': rng.uniform(0, 15, n),
+        'workshops': rng.integers(0, 15, n),
+        'trainings': rng.integers(0, 15, n),
+        'total_papers': rng.integers(0, 5, n),
+        'total_patents': rng.integers(0, 2, n),
+        'achievements': rng.integers(0, 9, n),
+        **{trait: rng.integers(0, 41, n) for trait in TRAITS},
+        'fitment_score': rng.uniform(20, 95, n),
+        'category': rng.choice(['Experienced', 'Inexperienced', 'Fresher'], n),
+    })
+    scorer = RetentionScorer()
+    print(f"{n:,} candidates")
+
+    records = df.to_dict('records')
+    start = time.perf_counter()
+    scalar = [scorer.calculate_retention_risk(record, record['fitment_score'], record, record['category'])
+              for record in records]
+    per_row = time.perf_counter() - start
+    print(f"  per-candidate        {per_row:7.2f}s  ({n / per_row:10,.0f} candidates/sec)")
+
+    start = time.perf_counter()
+    batch = scorer.calculate_retention_risk_batch(df)
+    risk_counts = batch['retention_risk'].value_counts()
+    flag_counts = {flag: int((batch['risk_flags'].to_numpy() >> bit & 1).sum()) for bit, flag in enumerate(RISK_FLAGS)}
+    vectorized = time.perf_counter() - start
+    print(f"  batch + dashboard    {vectorized:7.2f}s  ({n / vectorized:10,.0f} candidates/sec)")
+
+    mismatches = sum(scalar[i]['retention_score'] != batch['retention_score'].iat[i] or
+                     scalar[i]['risk_flags'] != scorer.retention_details(batch.iloc[i])['risk_flags']
+                     for i in range(min(n, 2000)))
+    print(f"  risk levels: {', '.join(f'{level} {count:,}' for level, count in risk_counts.items())}")
+    print(f"  most common flag: {max(flag_counts, key=flag_counts.get)}")
+    print(f"  mismatches vs per-candidate (first 2,000): {mismatches}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="people.ai performance benchmarks")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    resume_scan = subparsers.add_parser('resume-scan', help=bench_resume_scan.__doc__)
+    resume_scan.add_argument('--resumes', type=int, default=500)
+    resume_scan.add_argument('--size-kb', type=int, default=150)
+    resume_scan.set_defaults(func=bench_resume_scan)
+
+    smtp = subparsers.add_parser('smtp', help=bench_smtp.__doc__)
+    smtp.add_argument('--messages', type=int, default=200)
+    smtp.add_argument('--handshake-ms', type=float, default=50,
+                      help="Simulated TLS + AUTH cost per connection")
+    smtp.set_defaults(func=bench_smtp)
+
+    email_render = subparsers.add_parser('email-render', help=bench_email_render.__doc__)
+    email_render.add_argument('--messages', type=int, default=10000)
+    email_render.set_defaults(func=bench_email_render)
+
+    pdf_extract = subparsers.add_parser('pdf-extract', help=bench_pdf_extract.__doc__)
+    pdf_extract.add_argument('--pages', type=int, nargs='+', default=[5, 50, 500])
+    pdf_extract.add_argument('--workers', type=int, default=os.cpu_count())
+    pdf_extract.set_defaults(func=bench_pdf_extract)
+
+    prompt_budget = subparsers.add_parser('prompt-budget', help=bench_prompt_budget.__doc__)
+    prompt_budget.add_argument('--resumes', type=int, default=200)
+    prompt_budget.add_argument('--token-budget', type=int, default=6000)
+    prompt_budget.add_argument('--ms-per-1k-tokens', type=float, default=20.0,
+                               help="Simulated model latency per 1k prompt tokens")
+    prompt_budget.set_defaults(func=bench_prompt_budget)
+
+    fast_path = subparsers.add_parser('fast-path', help=bench_fast_path.__doc__)
+    fast_path.add_argument('--corpus', default=os.path.join('fixtures', 'resumes'),
+                           help="Directory of .txt resumes with .json reference parses")
+    fast_path.add_argument('--record', action='store_true',
+                           help="Regenerate the .json references with Gemini (needs GEMINI_API_KEY)")
+    fast_path.add_argument('--verbose', action='store_true', help="Print every disagreement")
+    fast_path.set_defaults(func=bench_fast_path)
+
+    parse_async = subparsers.add_parser('parse-async', help=bench_parse_async.__doc__)
+    parse_async.add_argument('--resumes', type=int, default=400)
+    parse_async.add_argument('--latency-ms', type=float, default=10)
+    parse_async.add_argument('--failure-rate', type=float, default=0.05)
+    parse_async.add_argument('--tail-rate', type=float, default=0.02)
+    parse_async.add_argument('--tail-ms', type=float, default=500)
+    parse_async.add_argument('--timeout-ms', type=float, default=2000, help="Per-attempt deadline")
+    parse_async.add_argument('--hedge-percentile', type=float, default=95)
+    parse_async.set_defaults(func=bench_parse_async)
+
+    decode = subparsers.add_parser('decode', help=bench_decode.__doc__)
+    decode.add_argument('--responses', type=int, default=2000)
+    decode.add_argument('--malformed-rate', type=float, default=0.05)
+    decode.set_defaults(func=bench_decode)
+
+    batch_parse = subparsers.add_parser('batch-parse', help=bench_batch_parse.__doc__)
+    batch_parse.add_argument('--resumes', type=int, default=400)
+    batch_parse.add_argument('--batch-tokens', type=int, nargs='+', default=[0, 4000, 12000],
+                             help="Token budgets per request to compare (0 = one resume per request)")
+    batch_parse.add_argument('--batch-docs', type=int, default=8)
+    batch_parse.add_argument('--concurrency', type=int, default=4)
+    batch_parse.add_argument('--request-ms', type=float, default=400, help="Fixed stub latency per request")
+    batch_parse.add_argument('--ms-per-1k-tokens', type=float, default=20)
+    batch_parse.set_defaults(func=bench_batch_parse)
+
+    fallback = subparsers.add_parser('fallback', help=bench_fallback.__doc__)
+    fallback.add_argument('--resumes', type=int, default=200)
+    fallback.add_argument('--concurrency', type=int, default=4)
+    fallback.add_argument('--latency-ms', type=float, default=20, help="Stub latency of a failing call")
+    fallback.add_argument('--slow-ms', type=float, default=300, help="Stub latency during the slowdown")
+    fallback.add_argument('--latency-budget-ms', type=float, default=100)
+    fallback.set_defaults(func=bench_fallback)
+
+    personality_rescore = subparsers.add_parser('personality-rescore', help=bench_personality_rescore.__doc__)
+    personality_rescore.add_argument('--tests', type=int, default=100000)
+    personality_rescore.add_argument('--legacy-sample', type=int, default=2000,
+                                     help="Tests rescored the per-row way (projected to --tests)")
+    personality_rescore.add_argument('--chunk-size', type=int, default=10000)
+    personality_rescore.set_defaults(func=bench_personality_rescore)
+
+    retention_batch = subparsers.add_parser('retention-batch', help=bench_retention_batch.__doc__)
+    retention_batch.add_argument('--candidates', type=int, default=100000)
+    retention_batch.set_defaults(func=bench_retention_batch)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
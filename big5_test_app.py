@@ -7,6 +7,7 @@ Now includes Retention Risk Analysis
 import streamlit as st
 import os
 from dotenv import load_dotenv
+from utils.big5_scoring import BIG5_QUESTIONS, calculate_big5_scores
 from utils.database_manager import DatabaseManager
 from utils.fitment_scorer import FitmentScorer
 from utils.email_sender import EmailSender
@@ -108,8 +109,12 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize database and services
-db = DatabaseManager()
+# Initialize database and services - one pooled manager shared by all sessions
+@st.cache_resource(show_spinner=False)
+def init_database():
+    return DatabaseManager()
+
+db = init_database()
 scorer = FitmentScorer()
 retention_scorer = RetentionScorer()
 mailer = EmailSender(
@@ -119,69 +124,6 @@ mailer = EmailSender(
     os.getenv('EMAIL_PASSWORD')
 )
 
-# Big Five Questions (50 total - 10 per trait)
-BIG5_QUESTIONS = [
-    # Openness (10 questions)
-    {"id": 1, "text": "I have a vivid imagination", "trait": "openness", "reverse": False},
-    {"id": 2, "text": "I am interested in abstract ideas", "trait": "openness", "reverse": False},
-    {"id": 3, "text": "I have difficulty understanding abstract ideas", "trait": "openness", "reverse": True},
-    {"id": 4, "text": "I have a rich vocabulary", "trait": "openness", "reverse": False},
-    {"id": 5, "text": "I enjoy thinking about complex topics", "trait": "openness", "reverse": False},
-    {"id": 6, "text": "I am not interested in theoretical discussions", "trait": "openness", "reverse": True},
-    {"id": 7, "text": "I enjoy hearing new ideas", "trait": "openness", "reverse": False},
-    {"id": 8, "text": "I prefer routine to variety", "trait": "openness", "reverse": True},
-    {"id": 9, "text": "I am curious about many different things", "trait": "openness", "reverse": False},
-    {"id": 10, "text": "I avoid philosophical discussions", "trait": "openness", "reverse": True},
-    
-    # Conscientiousness (10 questions)
-    {"id": 11, "text": "I am always prepared", "trait": "conscientiousness", "reverse": False},
-    {"id": 12, "text": "I pay attention to details", "trait": "conscientiousness", "reverse": False},
-    {"id": 13, "text": "I make a mess of things", "trait": "conscientiousness", "reverse": True},
-    {"id": 14, "text": "I get chores done right away", "trait": "conscientiousness", "reverse": False},
-    {"id": 15, "text": "I often forget to put things back", "trait": "conscientiousness", "reverse": True},
-    {"id": 16, "text": "I like order", "trait": "conscientiousness", "reverse": False},
-    {"id": 17, "text": "I shirk my duties", "trait": "conscientiousness", "reverse": True},
-    {"id": 18, "text": "I follow a schedule", "trait": "conscientiousness", "reverse": False},
-    {"id": 19, "text": "I am exacting in my work", "trait": "conscientiousness", "reverse": False},
-    {"id": 20, "text": "I leave my belongings around", "trait": "conscientiousness", "reverse": True},
-    
-    # Extraversion (10 questions)
-    {"id": 21, "text": "I am the life of the party", "trait": "extraversion", "reverse": False},
-    {"id": 22, "text": "I don't talk a lot", "trait": "extraversion", "reverse": True},
-    {"id": 23, "text": "I feel comfortable around people", "trait": "extraversion", "reverse": False},
-    {"id": 24, "text": "I keep in the background", "trait": "extraversion", "reverse": True},
-    {"id": 25, "text": "I start conversations", "trait": "extraversion", "reverse": False},
-    {"id": 26, "text": "I have little to say", "trait": "extraversion", "reverse": True},
-    {"id": 27, "text": "I talk to a lot of different people at parties", "trait": "extraversion", "reverse": False},
-    {"id": 28, "text": "I don't like to draw attention to myself", "trait": "extraversion", "reverse": True},
-    {"id": 29, "text": "I don't mind being the center of attention", "trait": "extraversion", "reverse": False},
-    {"id": 30, "text": "I am quiet around strangers", "trait": "extraversion", "reverse": True},
-    
-    # Agreeableness (10 questions)
-    {"id": 31, "text": "I feel others' emotions", "trait": "agreeableness", "reverse": False},
-    {"id": 32, "text": "I am not really interested in others", "trait": "agreeableness", "reverse": True},
-    {"id": 33, "text": "I make people feel at ease", "trait": "agreeableness", "reverse": False},
-    {"id": 34, "text": "I insult people", "trait": "agreeableness", "reverse": True},
-    {"id": 35, "text": "I sympathize with others' feelings", "trait": "agreeableness", "reverse": False},
-    {"id": 36, "text": "I am not interested in other people's problems", "trait": "agreeableness", "reverse": True},
-    {"id": 37, "text": "I have a soft heart", "trait": "agreeableness", "reverse": False},
-    {"id": 38, "text": "I take time out for others", "trait": "agreeableness", "reverse": False},
-    {"id": 39, "text": "I feel little concern for others", "trait": "agreeableness", "reverse": True},
-    {"id": 40, "text": "I make people feel welcome", "trait": "agreeableness", "reverse": False},
-    
-    # Neuroticism (10 questions)
-    {"id": 41, "text": "I get stressed out easily", "trait": "neuroticism", "reverse": False},
-    {"id": 42, "text": "I am relaxed most of the time", "trait": "neuroticism", "reverse": True},
-    {"id": 43, "text": "I worry about things", "trait": "neuroticism", "reverse": False},
-    {"id": 44, "text": "I seldom feel blue", "trait": "neuroticism", "reverse": True},
-    {"id": 45, "text": "I am easily disturbed", "trait": "neuroticism", "reverse": False},
-    {"id": 46, "text": "I get upset easily", "trait": "neuroticism", "reverse": False},
-    {"id": 47, "text": "I change my mood a lot", "trait": "neuroticism", "reverse": False},
-    {"id": 48, "text": "I have frequent mood swings", "trait": "neuroticism", "reverse": False},
-    {"id": 49, "text": "I get irritated easily", "trait": "neuroticism", "reverse": False},
-    {"id": 50, "text": "I often feel blue", "trait": "neuroticism", "reverse": False},
-]
-
 # Initialize session state
 if 'token' not in st.session_state:
     st.session_state.token = None
@@ -204,7 +146,7 @@ def get_token_from_url():
 # Verify token and load candidate
 def verify_token(token):
     try:
-        candidate = db.get_candidate_by_token(token)
+        candidate = db.resolve_token(token)
         if candidate:
             st.session_state.candidate = candidate
             st.session_state.token = token
@@ -215,35 +157,6 @@ def verify_token(token):
         st.error(f"Error verifying token: {str(e)}")
         return False
 
-# Calculate Big5 scores from answers
-def calculate_big5_scores(answers):
-    scores = {
-        'openness': 0,
-        'conscientiousness': 0,
-        'extraversion': 0,
-        'agreeableness': 0,
-        'neuroticism': 0
-    }
-    
-    for q_id, answer_value in answers.items():
-        question = next((q for q in BIG5_QUESTIONS if q['id'] == q_id), None)
-        if question:
-            trait = question['trait']
-            if question['reverse']:
-                score = 6 - answer_value
-            else:
-                score = answer_value
-            scores[trait] += score
-    
-    # Convert to 0-40 scale
-    return {
-        'openness': int((scores['openness'] - 10) * 40 / 40),
-        'conscientiousness': int((scores['conscientiousness'] - 10) * 40 / 40),
-        'extraversion': int((scores['extraversion'] - 10) * 40 / 40),
-        'agreeableness': int((scores['agreeableness'] - 10) * 40 / 40),
-        'neuroticism': int((scores['neuroticism'] - 10) * 40 / 40),
-    }
-
 # Main app logic
 token = get_token_from_url()
 
@@ -259,6 +172,12 @@ if not st.session_state.verified:
         if not verify_token(token):
             st.error("❌ Invalid or expired test token. Please contact support.")
             st.stop()
+    
+    # A completed test can't be retaken - reloading the link would otherwise start it over
+    if st.session_state.candidate.get('test_status') == 'completed':
+        st.markdown('<div class="test-header"><h1>🧠 Big Five Personality Test</h1></div>', unsafe_allow_html=True)
+        st.info("✅ You have already completed this test. Your results were sent to your email.")
+        st.stop()
 
 candidate = st.session_state.candidate
 current_q = st.session_state.current_question
@@ -322,26 +241,23 @@ if current_q >= len(BIG5_QUESTIONS):
             final_fitment['category']
         )
         
-        # Save final fitment score
-        db.save_fitment_score(candidate['candidate_id'], final_fitment)
+        # Save final fitment score and retention assessment together
+        db.save_final_scores(candidate['candidate_id'], final_fitment, retention_result)
         
-        # Send comprehensive final email with ALL results
-        email_sent = mailer.send_comprehensive_results_email(
-            candidate['email'],
-            candidate['name'],
-            final_fitment,
-            big5_scores,
-            retention_result
-        )
-        
-        # Log email
-        db.log_email(
-            candidate['candidate_id'],
-            'comprehensive_results',
-            candidate['email'],
-            f"Complete Assessment Results - Fitment: {final_fitment['overall_fitment_score']:.0f}/100",
-            'sent' if email_sent else 'failed'
-        )
+        # Queue comprehensive final email with ALL results - email_worker.py delivers it
+        try:
+            message = mailer.render_comprehensive_results_email(
+                candidate['name'],
+                final_fitment,
+                big5_scores,
+                retention_result
+            )
+            db.enqueue_email(candidate['candidate_id'], 'comprehensive_results',
+                             candidate['email'], message.subject, message.html, message.text)
+            email_queued = True
+        except Exception as e:
+            print(f"Error queueing results email: {str(e)}")
+            email_queued = False
     
     # Display comprehensive results
     st.success("✅ Complete assessment finished!")
@@ -415,10 +331,10 @@ if current_q >= len(BIG5_QUESTIONS):
         st.info(f"{insight}")
     
     # Email Status
-    if email_sent:
-        st.success("📧 Complete results have been sent to your email!")
+    if email_queued:
+        st.success("📧 Complete results are on their way to your email!")
     else:
-        st.error("⚠️ Email failed to send. Please contact support for your results.")
+        st.error("⚠️ Results email could not be queued. Please contact support for your results.")
     
     st.balloons()
     st.stop()
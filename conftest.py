@@ -0,0 +1,18 @@
+"""
+pytest setup - run with: python -m pytest -q
+Every test gets a throwaway database under tmp_path; database.db is never touched.
+"""
+
+import pytest
+
+from utils.database_manager import DatabaseManager
+
+# Manual script: writes a test candidate into database.db at import time
+collect_ignore = ['test_integration.py']
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'test.db'))
+    yield manager
+    manager.close()
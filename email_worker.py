@@ -0,0 +1,62 @@
+"""
+Email outbox worker - delivers emails queued by app.py and big5_test_app.py
+Run it alongside the Streamlit apps:
+
+    python email_worker.py [--poll-interval 5] [--batch-size 20]
+    python email_worker.py --once        # deliver what is due now and exit
+"""
+
+import argparse
+import logging
+import os
+from dotenv import load_dotenv
+from utils.database_manager import DatabaseManager
+from utils.email_outbox import OutboxWorker
+from utils.email_sender import EmailSender
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver queued emails from the outbox")
+    parser.add_argument('--db', default=os.getenv('DATABASE_PATH', 'database.db'),
+                        help="SQLite database path")
+    parser.add_argument('--poll-interval', type=float, default=5.0,
+                        help="Seconds between outbox polls when idle")
+    parser.add_argument('--batch-size', type=int, default=20,
+                        help="Emails claimed per poll")
+    parser.add_argument('--max-attempts', type=int, default=6,
+                        help="Delivery attempts before an email is marked failed")
+    parser.add_argument('--once', action='store_true', help="Deliver due emails once and exit")
+    args = parser.parse_args()
+    
+    # run_forever reports through the utils.email_outbox logger
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
+    db = DatabaseManager(args.db)
+    sender = EmailSender(
+        os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
+        int(os.getenv('SMTP_PORT', 587)),
+        os.getenv('EMAIL_ADDRESS'),
+        os.getenv('EMAIL_PASSWORD'),
+        use_tls=os.getenv('SMTP_USE_TLS', 'true').lower() != 'false'
+    )
+    worker = OutboxWorker(db, sender, batch_size=args.batch_size, max_attempts=args.max_attempts)
+    
+    try:
+        if args.once:
+            counts = worker.run_once()
+            print(f"📧 Outbox: {counts['sent']} sent, {counts['retried']} retrying, {counts['failed']} failed")
+            return
+        
+        print(f"📧 Email worker polling {args.db} every {args.poll_interval}s (Ctrl+C to stop)")
+        worker.run_forever(args.poll_interval)
+    except KeyboardInterrupt:
+        print("👋 Email worker stopped")
+    finally:
+        sender.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Bulk resume ingestion - parse and score a folder or zip of resumes in one go
+
+Usage:
+    python ingest_resumes.py resumes/ [--concurrency 4] [--rps 2] [--batch-size 25]
+    python ingest_resumes.py resumes.zip --stub        # local stub model, no Gemini calls
+    python ingest_resumes.py resumes/ --offline        # rule-based fields only, no model at all
+    python ingest_resumes.py resumes/ --async --llm-timeout 30 --hedge-percentile 95
+    python ingest_resumes.py resumes/ --llm-batch-tokens 12000   # several short resumes per request
+    python ingest_resumes.py resumes/ --latency-budget 20         # fall back to local parsing when Gemini is slow
+"""
+
+import argparse
+import json
+import os
+from dotenv import load_dotenv
+from utils.database_manager import DatabaseManager
+from utils.fitment_scorer import FitmentScorer
+from utils.ingestion import BulkIngestor
+from utils.parse_cache import ParseCache
+from utils.parser_backends import BackendRouter, HeuristicBackend
+from utils.resilience import ResilientCaller
+from utils.resume_parser import ResumeParser
+from utils.text_preprocessor import DEFAULT_TOKEN_BUDGET
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a directory or zip file of resumes")
+    parser.add_argument('path', help="Directory or .zip containing PDF/DOCX/TXT resumes")
+    parser.add_argument('--db', default=os.getenv('DATABASE_PATH', 'database.db'),
+                        help="SQLite database path")
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help="Maximum concurrent LLM requests")
+    parser.add_argument('--rps', type=float, default=None,
+                        help="LLM requests per second (token bucket); unlimited if omitted")
+    parser.add_argument('--batch-size', type=int, default=25,
+                        help="Applications written per database transaction")
+    parser.add_argument('--extract-workers', type=int, default=None,
+                        help="Processes used for text extraction (default: CPU count)")
+    parser.add_argument('--stub', action='store_true',
+                        help="Use the local stub model instead of Gemini")
+    parser.add_argument('--stub-latency', type=float, default=0.0,
+                        help="Simulated stub model latency in seconds")
+    parser.add_argument('--stub-latency-per-1k-tokens', type=float, default=0.0,
+                        help="Additional simulated stub latency per 1k prompt tokens")
+    parser.add_argument('--stub-failure-rate', type=float, default=0.0,
+                        help="Fraction of stub calls that fail with a retryable error")
+    parser.add_argument('--stub-tail-rate', type=float, default=0.0,
+                        help="Fraction of stub calls that take --stub-tail-latency longer")
+    parser.add_argument('--stub-tail-latency', type=float, default=0.0,
+                        help="Extra seconds for slow stub calls")
+    parser.add_argument('--stub-malformed-rate', type=float, default=0.0,
+                        help="Fraction of stub answers returned as truncated JSON")
+    parser.add_argument('--async', dest='async_llm', action='store_true',
+                        help="Parse on the async client with per-call deadlines, retries and a circuit breaker")
+    parser.add_argument('--llm-timeout', type=float, default=60.0,
+                        help="Seconds allowed per model call (--async)")
+    parser.add_argument('--llm-attempts', type=int, default=3,
+                        help="Attempts per document for timeouts and 5xx/429 errors (--async)")
+    parser.add_argument('--hedge-percentile', type=float, default=None,
+                        help="Send a duplicate request when a call runs past this latency percentile (--async)")
+    parser.add_argument('--llm-batch-tokens', type=int, default=0,
+                        help="Pack resumes into one LLM request up to this many estimated tokens (0 = one per request)")
+    parser.add_argument('--llm-batch-docs', type=int, default=8,
+                        help="Maximum resumes per LLM request with --llm-batch-tokens")
+    parser.add_argument('--offline', action='store_true',
+                        help="Skip the LLM - store only rule-extracted fields (contact, flags, counts)")
+    parser.add_argument('--no-fallback', action='store_true',
+                        help="Fail instead of falling back to a local model / heuristic rules when the LLM is down")
+    parser.add_argument('--latency-budget', type=float, default=None,
+                        help="Fall back to local parsing while the LLM's p95 latency is above this many seconds")
+    parser.add_argument('--no-fast-path', action='store_true',
+                        help="Ask the LLM for every field instead of filling structured fields locally")
+    parser.add_argument('--token-budget', type=int, default=DEFAULT_TOKEN_BUDGET,
+                        help="Maximum estimated tokens of resume text per LLM call (0 = no limit)")
+    parser.add_argument('--json', action='store_true', help="Print the stats summary as JSON")
+    args = parser.parse_args()
+    
+    db = DatabaseManager(args.db)
+    token_budget = args.token_budget or None
+    fast_path = not args.no_fast_path
+    resilience = ResilientCaller(timeout=args.llm_timeout, attempts=args.llm_attempts,
+                                 hedge_percentile=args.hedge_percentile)
+    if args.offline:
+        resume_parser = ResumeParser(offline=True, token_budget=token_budget)
+    elif args.stub:
+        from stub_model import StubModel
+        stub = StubModel(args.stub_latency, args.stub_latency_per_1k_tokens, failure_rate=args.stub_failure_rate,
+                         tail_rate=args.stub_tail_rate, tail_latency_seconds=args.stub_tail_latency,
+                         malformed_rate=args.stub_malformed_rate)
+        model = stub if args.no_fallback else BackendRouter([stub, HeuristicBackend()], args.latency_budget)
+        resume_parser = ResumeParser(model=model, token_budget=token_budget, fast_path=fast_path,
+                                     resilience=resilience)
+    else:
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            raise SystemExit("❌ GEMINI_API_KEY not found in .env file (use --stub for a dry run)")
+        cache = ParseCache(os.path.join(os.path.dirname(args.db), 'parse_cache.db'))
+        resume_parser = ResumeParser(api_key, cache=cache, token_budget=token_budget, fast_path=fast_path,
+                                     resilience=resilience, fallback=not args.no_fallback,
+                                     latency_budget=args.latency_budget)
+    
+    ingestor = BulkIngestor(
+        db, resume_parser, FitmentScorer(),
+        concurrency=args.concurrency,
+        requests_per_second=args.rps,
+        extract_workers=args.extract_workers,
+        batch_size=args.batch_size,
+        async_llm=args.async_llm,
+        llm_batch_tokens=args.llm_batch_tokens or None,
+        llm_batch_docs=args.llm_batch_docs
+    )
+    
+    print(f"📂 Ingesting resumes from {args.path}")
+    stats = ingestor.run(args.path)
+    
+    if args.json:
+        print(json.dumps(stats.summary(), indent=2))
+    else:
+        print(stats.report())
+        if isinstance(resume_parser.model, BackendRouter):
+            print(resume_parser.model.report())
+
+
+if __name__ == "__main__":
+    main()
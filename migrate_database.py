@@ -0,0 +1,75 @@
+"""
+Apply versioned schema migrations to database.db
+
+Usage:
+    python migrate_database.py --dry-run        # show pending migrations and estimated rewrite cost
+    python migrate_database.py [--batch-size 200] [--vacuum] [--gc-blobs]
+"""
+
+import argparse
+import os
+from dotenv import load_dotenv
+from utils.database_manager import DatabaseManager
+from utils.migrations import MigrationRunner, read_only_connection
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument('--db', default=os.getenv('DATABASE_PATH', 'database.db'),
+                        help="SQLite database path")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Report pending migrations and estimated cost without applying them")
+    parser.add_argument('--batch-size', type=int, default=200,
+                        help="Rows per transaction in batched backfills")
+    parser.add_argument('--vacuum', action='store_true',
+                        help="VACUUM afterwards to return freed space to the OS (takes an exclusive lock)")
+    parser.add_argument('--gc-blobs', action='store_true',
+                        help="Delete stored resume files no resume row references (left by rolled-back saves)")
+    parser.add_argument('--gc-min-age', type=float, default=3600,
+                        help="Seconds a file must be unreferenced-and-untouched before --gc-blobs deletes it")
+    args = parser.parse_args()
+    
+    if args.dry_run:
+        # Read-only - opening a DatabaseManager would create missing tables and switch to WAL
+        runner = MigrationRunner(None, batch_size=args.batch_size)
+        conn = read_only_connection(args.db)
+        try:
+            print(f"📦 {args.db}: schema version {runner.current_version(conn)}, latest {runner.latest_version}")
+            plan = runner.plan(conn)
+        finally:
+            conn.close()
+        if not plan:
+            print("✅ Nothing to migrate")
+        for step in plan:
+            print(f"   → {step['version']}: {step['description']}")
+            print(f"     rewrites ~{step['rows']:,} rows / {step['bytes'] / 1e6:,.1f} MB"
+                  f" in {', '.join(step['tables']) or 'no tables'}")
+        return
+    
+    db = DatabaseManager(args.db, auto_migrate=False)
+    runner = MigrationRunner(db, batch_size=args.batch_size)
+    
+    conn = db.get_connection()
+    current = runner.current_version(conn)
+    conn.close()
+    print(f"📦 {args.db}: schema version {current}, latest {runner.latest_version}")
+    
+    version = runner.run()
+    print(f"✅ Schema at version {version}")
+    
+    if args.gc_blobs:
+        deleted = db.collect_orphan_blobs(args.gc_min_age)
+        print(f"✅ Deleted {deleted} orphaned resume file(s)")
+    
+    if args.vacuum:
+        conn = db.get_connection()
+        conn.execute('VACUUM')
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.close()
+        print("✅ Database vacuumed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Bulk re-scoring job - recompute fitment_scores for the whole candidates table
+Run after changing thresholds or weights in utils/fitment_rules.json
+
+Usage:
+    python rescore_fitment.py [--db database.db] [--chunk-size 10000] [--completed-only]
+"""
+
+import argparse
+import os
+import time
+from dotenv import load_dotenv
+from utils.database_manager import DatabaseManager
+from utils.fitment_scorer import FitmentScorer
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute fitment scores for all candidates")
+    parser.add_argument('--db', default=os.getenv('DATABASE_PATH', 'database.db'),
+                        help="SQLite database path")
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help="Candidates scored and committed per transaction")
+    parser.add_argument('--completed-only', action='store_true',
+                        help="Only rescore candidates with a completed personality test")
+    args = parser.parse_args()
+    
+    db = DatabaseManager(args.db)
+    scorer = FitmentScorer()
+    
+    start = time.perf_counter()
+    
+    def report(done: int):
+        elapsed = time.perf_counter() - start
+        print(f"   {done:,} candidates rescored ({done / elapsed:,.0f} rows/sec)")
+    
+    print(f"🔄 Rescoring fitment scores in {args.db} (chunks of {args.chunk_size:,})")
+    total = db.rescore_fitment_scores(
+        scorer.score_batch,
+        chunk_size=args.chunk_size,
+        completed_only=args.completed_only,
+        on_chunk=report
+    )
+    
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"✅ Rescored {total:,} candidates in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
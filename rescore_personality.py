@@ -0,0 +1,54 @@
+"""
+Bulk personality rescoring job - recompute Big5 trait scores from stored test answers
+Run after changing questions or their scoring key in utils/big5_scoring.py; each
+candidate's latest test also gets a fresh fitment and retention score. Tests already
+scored with the current big5_scoring.SCORING_VERSION are skipped, so an interrupted
+run can simply be started again
+
+Usage:
+    python rescore_personality.py [--db database.db] [--chunk-size 10000] [--all]
+"""
+
+import argparse
+import os
+import time
+from dotenv import load_dotenv
+from utils.database_manager import DatabaseManager
+from utils.fitment_scorer import FitmentScorer
+from utils.retention_scorer import RetentionScorer
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute personality test scores from stored answers")
+    parser.add_argument('--db', default=os.getenv('DATABASE_PATH', 'database.db'),
+                        help="SQLite database path")
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help="Tests scored and committed per transaction")
+    parser.add_argument('--all', action='store_true',
+                        help="Also rescore tests already at the current scoring version")
+    args = parser.parse_args()
+    
+    db = DatabaseManager(args.db)
+    scorer = FitmentScorer()
+    retention_scorer = RetentionScorer()
+    
+    start = time.perf_counter()
+    
+    def report(done: int):
+        elapsed = time.perf_counter() - start
+        print(f"   {done:,} tests rescored ({done / elapsed:,.0f} rows/sec)")
+    
+    print(f"🔄 Rescoring personality tests in {args.db} (chunks of {args.chunk_size:,})")
+    total = db.rescore_personality_tests(scorer.score_batch, chunk_size=args.chunk_size, on_chunk=report,
+                                         retention_batch=retention_scorer.calculate_retention_risk_batch,
+                                         redo=args.all)
+    
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"✅ Rescored {total:,} tests in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
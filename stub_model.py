@@ -0,0 +1,96 @@
+"""
+Local stand-in for the Gemini backend - development and benchmarking only
+Used by ingest_resumes.py --stub dry runs and benchmark.py; not imported by the apps.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, Dict, Optional, Tuple
+from utils.candidate_schema import default_values
+from utils.parser_backends import ParserBackend, prompt_documents
+from utils.resilience import TransientError
+
+
+class StubModel(ParserBackend):
+    """
+    Local stand-in for the Gemini backend used in bulk ingestion dry runs and tests
+    
+    Returns a deterministic JSON parse built from simple pattern matching on the
+    resume text embedded in the prompt, after an optional simulated latency: a
+    fixed part plus a part proportional to prompt size (~4 chars per token).
+    To exercise timeouts, retries and hedging it can also behave like a flaky
+    server: failure_rate of calls raise TransientError and tail_rate of calls
+    take tail_latency_seconds longer. malformed_rate of answers come back fenced
+    and cut off part-way, like a response that hit max_output_tokens.
+    """
+    
+    name = 'stub-model'
+    
+    def __init__(self, latency_seconds: float = 0.0, seconds_per_1k_tokens: float = 0.0,
+                 failure_rate: float = 0.0, tail_rate: float = 0.0, tail_latency_seconds: float = 0.0,
+                 malformed_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency_seconds = latency_seconds
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+        self.failure_rate = failure_rate
+        self.tail_rate = tail_rate
+        self.tail_latency_seconds = tail_latency_seconds
+        self.malformed_rate = malformed_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+    
+    def _plan(self, prompt: str) -> Tuple[float, bool]:
+        """(latency, fails) for one call"""
+        self.calls += 1
+        latency = self.latency_seconds + self.seconds_per_1k_tokens * len(prompt) / 4000
+        if self.tail_rate and self._random.random() < self.tail_rate:
+            latency += self.tail_latency_seconds
+        return latency, bool(self.failure_rate) and self._random.random() < self.failure_rate
+    
+    def generate_content(self, prompt: str, generation_config: Dict[str, Any] = None):
+        latency, fails = self._plan(prompt)
+        if latency:
+            time.sleep(latency)
+        if fails:
+            raise TransientError("Stub model: simulated 503")
+        return _StubResponse(self._respond(prompt))
+    
+    async def generate_content_async(self, prompt: str, generation_config: Dict[str, Any] = None):
+        latency, fails = self._plan(prompt)
+        if latency:
+            await asyncio.sleep(latency)
+        if fails:
+            raise TransientError("Stub model: simulated 503")
+        return _StubResponse(self._respond(prompt))
+    
+    @staticmethod
+    def _parse(resume_text: str) -> Dict[str, Any]:
+        lines = [line.strip() for line in resume_text.splitlines() if line.strip()]
+        email = re.search(r'[\w.+-]+@[\w-]+\.[\w.-]+', resume_text)
+        phone = re.search(r'\+?\d[\d\s-]{8,}\d', resume_text)
+        
+        return {
+            **default_values(),
+            'name': lines[0] if lines else '',
+            'email': email.group(0) if email else '',
+            'phone': phone.group(0) if phone else '',
+            'state_jk': 1 if re.search(r'Jammu|Kashmir|Srinagar|J&K', resume_text) else 0,
+        }
+    
+    def _respond(self, prompt: str) -> str:
+        documents = prompt_documents(prompt)
+        if documents[0][0] is not None:
+            text = json.dumps({'results': [{'doc_id': doc_id, **self._parse(resume_text)}
+                                           for doc_id, resume_text in documents]}, indent=2)
+        else:
+            text = json.dumps(self._parse(documents[0][1]), indent=2)
+        if self.malformed_rate and self._random.random() < self.malformed_rate:
+            text = "```json\n" + text[:int(len(text) * self._random.uniform(0.3, 0.9))]
+        return text
+
+
+class _StubResponse:
+    def __init__(self, text: str):
+        self.text = text
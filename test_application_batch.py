@@ -0,0 +1,61 @@
+"""save_applications_batch: one SAVEPOINT per application inside a single transaction"""
+
+import sqlite3
+
+from utils.candidate_schema import default_values
+from utils.fitment_scorer import FitmentScorer
+
+
+def application(i: int, **extra):
+    candidate = {**default_values(), 'name': f'Candidate {i}', 'email': f'candidate{i}@example.com',
+                 'longevity_years': i, 'average_experience': i}
+    return {'candidate_data': candidate, 'fitment_result': FitmentScorer().calculate_overall_fitment(candidate),
+            **extra}
+
+
+def count(db, sql: str, params: tuple = ()) -> int:
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return conn.execute(sql, params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_batch_saves_every_application(db):
+    applications = [application(i, filename=f'resume_{i}.txt', file_content=f'resume {i}'.encode(),
+                                file_type='txt', extracted_text=f'resume {i}') for i in range(3)]
+
+    candidate_ids, errors = db.save_applications_batch(applications)
+
+    assert errors == [None, None, None]
+    assert all(candidate_ids)
+    assert count(db, 'SELECT COUNT(*) FROM candidates') == 3
+    assert count(db, 'SELECT COUNT(*) FROM resumes') == 3
+    assert count(db, 'SELECT COUNT(*) FROM fitment_scores') == 3
+
+
+def test_failed_application_is_rolled_back_alone(db):
+    # The candidate row is inserted before the fitment score fails, and must not survive
+    bad = application(1)
+    bad['fitment_result'] = {}
+    applications = [application(0), bad, application(2)]
+
+    candidate_ids, errors = db.save_applications_batch(applications)
+
+    assert candidate_ids[0] and candidate_ids[2] and candidate_ids[1] is None
+    assert errors[0] is None and errors[2] is None
+    assert errors[1].startswith('Error saving application')
+    assert count(db, 'SELECT COUNT(*) FROM candidates WHERE email = ?', ('candidate1@example.com',)) == 0
+    assert count(db, 'SELECT COUNT(*) FROM candidates') == 2
+    assert count(db, 'SELECT COUNT(*) FROM fitment_scores') == 2
+
+
+def test_failed_resume_leaves_no_rows(db):
+    # file_type is NOT NULL in resumes
+    bad = application(1, filename='resume_1.pdf', file_content=b'%PDF', file_type=None)
+
+    candidate_ids, errors = db.save_applications_batch([bad, application(2)])
+
+    assert candidate_ids[0] is None and errors[0]
+    assert count(db, 'SELECT COUNT(*) FROM resumes') == 0
+    assert count(db, 'SELECT COUNT(*) FROM candidates') == 1
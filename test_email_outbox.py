@@ -0,0 +1,133 @@
+"""Email outbox: delivery, retry with backoff, giving up, and claim leases"""
+
+import sqlite3
+import time
+
+from utils.email_outbox import OutboxWorker
+from utils.email_sender import EmailSender
+
+
+class RecordingSender(EmailSender):
+    """EmailSender whose SMTP delivery is replaced by a list of sent messages"""
+
+    def __init__(self, reject=()):
+        super().__init__('localhost', 25, 'hr@example.com', 'password')
+        self.reject = set(reject)
+        self.sent = []
+
+    def deliver(self, recipient, subject, body, text_body=None):
+        if recipient in self.reject:
+            raise ConnectionError(f"550 mailbox unavailable: {recipient}")
+        self.sent.append(recipient)
+
+
+def outbox_rows(db):
+    conn = sqlite3.connect(db.db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return {row['recipient_email']: dict(row) for row in conn.execute('SELECT * FROM email_outbox')}
+    finally:
+        conn.close()
+
+
+def email_log_statuses(db):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return sorted(conn.execute('SELECT recipient_email, status FROM email_logs').fetchall())
+    finally:
+        conn.close()
+
+
+def enqueue(db, *recipients):
+    for recipient in recipients:
+        db.enqueue_email('CAND1', 'application_received', recipient, 'Hello', '<p>Hello</p>', 'Hello')
+
+
+def test_delivers_and_logs(db):
+    enqueue(db, 'a@example.com', 'b@example.com')
+    sender = RecordingSender()
+
+    counts = OutboxWorker(db, sender).run_once()
+
+    assert counts == {'sent': 2, 'retried': 0, 'failed': 0}
+    assert sorted(sender.sent) == ['a@example.com', 'b@example.com']
+    assert {row['status'] for row in outbox_rows(db).values()} == {'sent'}
+    assert email_log_statuses(db) == [('a@example.com', 'sent'), ('b@example.com', 'sent')]
+    # Nothing left to claim
+    assert OutboxWorker(db, sender).run_once() == {'sent': 0, 'retried': 0, 'failed': 0}
+
+
+def test_failure_is_retried_with_backoff(db):
+    enqueue(db, 'bad@example.com', 'good@example.com')
+    worker = OutboxWorker(db, RecordingSender(reject={'bad@example.com'}), base_delay=60)
+
+    before = time.time()
+    counts = worker.run_once()
+
+    assert counts == {'sent': 1, 'retried': 1, 'failed': 0}
+    row = outbox_rows(db)['bad@example.com']
+    assert row['status'] == 'pending'
+    assert row['attempts'] == 1
+    assert '550' in row['last_error']
+    # Jittered between half and the full base delay
+    assert before + 30 <= row['next_attempt_at'] <= time.time() + 60
+    # Not due yet
+    assert worker.run_once() == {'sent': 0, 'retried': 0, 'failed': 0}
+    assert email_log_statuses(db) == [('good@example.com', 'sent')]
+
+
+def test_gives_up_after_max_attempts(db):
+    enqueue(db, 'bad@example.com')
+    worker = OutboxWorker(db, RecordingSender(reject={'bad@example.com'}), max_attempts=3, base_delay=0)
+
+    outcomes = [worker.run_once() for _ in range(3)]
+
+    assert [counts['retried'] for counts in outcomes] == [1, 1, 0]
+    assert outcomes[-1]['failed'] == 1
+    row = outbox_rows(db)['bad@example.com']
+    assert row['status'] == 'failed' and row['attempts'] == 3
+    assert email_log_statuses(db) == [('bad@example.com', 'failed')]
+    assert worker.run_once() == {'sent': 0, 'retried': 0, 'failed': 0}
+
+
+def test_claimed_emails_are_leased(db):
+    enqueue(db, 'a@example.com')
+
+    claimed = db.claim_outbox_batch(lease_seconds=300)
+
+    assert [email['recipient_email'] for email in claimed] == ['a@example.com']
+    assert outbox_rows(db)['a@example.com']['status'] == 'sending'
+    # Another worker cannot take it while the lease runs
+    assert db.claim_outbox_batch(lease_seconds=300) == []
+
+
+def test_expired_lease_is_claimed_again(db):
+    # A worker that died after claiming leaves the email 'sending'; it is due again once the lease runs out
+    enqueue(db, 'a@example.com')
+    assert len(db.claim_outbox_batch(lease_seconds=0)) == 1
+
+    counts = OutboxWorker(db, RecordingSender()).run_once()
+
+    assert counts['sent'] == 1
+    assert outbox_rows(db)['a@example.com']['status'] == 'sent'
+
+
+def test_unrecorded_result_stays_leased(db, monkeypatch):
+    enqueue(db, 'a@example.com', 'b@example.com')
+    mark_sent = db.mark_outbox_sent
+    a_id = outbox_rows(db)['a@example.com']['id']
+
+    def flaky_mark_sent(outbox_id):
+        if outbox_id == a_id:
+            raise Exception("Error marking email sent: database is locked")
+        mark_sent(outbox_id)
+
+    monkeypatch.setattr(db, 'mark_outbox_sent', flaky_mark_sent)
+    counts = OutboxWorker(db, RecordingSender()).run_once()
+
+    # The other result is still recorded; the unrecorded one waits for its lease to expire
+    assert counts['sent'] == 1
+    rows = outbox_rows(db)
+    assert rows['b@example.com']['status'] == 'sent'
+    assert rows['a@example.com']['status'] == 'sending'
+    assert rows['a@example.com']['next_attempt_at'] > time.time()
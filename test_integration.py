@@ -71,6 +71,10 @@ if candidate:
 else:
     print("❌ Token not found!")
 
+print("\n6️⃣ Checking query plans for key lookups...")
+for query_name, plan in db.check_query_plans().items():
+    print(f"✅ {query_name}: {'; '.join(plan)}")
+
 print("\n" + "="*60)
 print(f"🔗 Test URL: http://localhost:5173?token={test_token}")
 print(f"🧪 API Test: http://localhost:5000/api/test/verify/{test_token}")
@@ -0,0 +1,104 @@
+"""Schema migrations: replaying them on a fresh, legacy or already migrated database"""
+
+import hashlib
+import sqlite3
+
+from utils.database_manager import DatabaseManager
+from utils.migrations import MIGRATIONS, MigrationRunner, read_only_connection, table_columns
+
+LATEST = MIGRATIONS[-1].version
+
+LEGACY_RESUMES_SQL = '''
+    CREATE TABLE resumes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        candidate_id TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        file_content BLOB NOT NULL,
+        file_type TEXT NOT NULL,
+        extracted_text TEXT,
+        uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+def user_version(db_path) -> int:
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_fresh_database_is_at_latest_version(db):
+    assert user_version(db.db_path) == LATEST
+    assert MigrationRunner(db).plan() == []
+
+
+def test_run_is_idempotent(db):
+    assert MigrationRunner(db).run() == LATEST
+    assert MigrationRunner(db).run() == LATEST
+
+
+def test_replay_from_version_zero(db):
+    # Statements that already took effect (ADD COLUMN, CREATE ... IF NOT EXISTS) are skipped
+    conn = sqlite3.connect(db.db_path)
+    conn.execute('PRAGMA user_version = 0')
+    conn.close()
+
+    assert [step['version'] for step in MigrationRunner(db).plan()] == [m.version for m in MIGRATIONS]
+    assert MigrationRunner(db).run() == LATEST
+    conn = sqlite3.connect(db.db_path)
+    assert 'scoring_version' in table_columns(conn, 'personality_tests')
+    assert 'rule_version' in table_columns(conn, 'fitment_scores')
+    conn.close()
+
+
+def test_legacy_resume_blobs_move_to_blob_store(tmp_path):
+    db_path = tmp_path / 'legacy.db'
+    contents = [b'%PDF resume one', b'%PDF resume two', b'%PDF resume one']
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(LEGACY_RESUMES_SQL)
+    conn.executemany(
+        "INSERT INTO resumes (candidate_id, filename, file_content, file_type) VALUES (?, ?, ?, 'pdf')",
+        [(f'CAND{i}', f'resume_{i}.pdf', content) for i, content in enumerate(contents)]
+    )
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(str(db_path))
+    try:
+        conn = sqlite3.connect(str(db_path))
+        assert 'file_content' not in table_columns(conn, 'resumes')
+        conn.close()
+        for resume_id, content in enumerate(contents, start=1):
+            resume = db.get_resume(resume_id)
+            assert resume['content_hash'] == hashlib.sha256(content).hexdigest()
+            assert resume['file_size'] == len(content)
+            with db.open_resume_file(resume_id) as f:
+                assert f.read() == content
+        # Identical files share one blob
+        assert len(list(db.blob_store.iter_hashes())) == 2
+        assert user_version(db_path) == LATEST
+    finally:
+        db.close()
+
+
+def test_dry_run_does_not_write(tmp_path):
+    db_path = tmp_path / 'legacy.db'
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(LEGACY_RESUMES_SQL)
+    conn.execute("INSERT INTO resumes (candidate_id, filename, file_content, file_type) "
+                 "VALUES ('CAND0', 'resume.pdf', X'00', 'pdf')")
+    conn.commit()
+    conn.close()
+    before = db_path.read_bytes()
+
+    conn = read_only_connection(str(db_path))
+    try:
+        plan = MigrationRunner(None).plan(conn)
+    finally:
+        conn.close()
+
+    assert [step['version'] for step in plan] == [m.version for m in MIGRATIONS]
+    assert next(step for step in plan if step['version'] == 2)['rows'] == 1
+    assert db_path.read_bytes() == before
@@ -0,0 +1,137 @@
+"""Circuit breaker states and ResilientCaller retries around it"""
+
+import asyncio
+import time
+
+import pytest
+
+from utils.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, TransientError
+
+RESET = 0.05
+
+
+def open_breaker(threshold: int = 2) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=threshold, reset_timeout=RESET)
+    for _ in range(threshold):
+        breaker.before_call()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=RESET)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_half_open_trial_success_closes():
+    breaker = open_breaker()
+    time.sleep(RESET)
+
+    assert breaker.state == 'half_open'
+    assert breaker.before_call() is True
+    # Only one trial at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+
+    assert breaker.state == 'closed'
+    assert breaker.before_call() is False
+
+
+def test_half_open_trial_failure_reopens():
+    breaker = open_breaker(threshold=5)
+    time.sleep(RESET)
+
+    assert breaker.before_call() is True
+    breaker.record_failure()
+
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_ended_trial_frees_the_slot():
+    breaker = open_breaker()
+    time.sleep(RESET)
+
+    assert breaker.before_call() is True
+    breaker.end_trial()
+
+    assert breaker.before_call() is True
+
+
+def caller(breaker: CircuitBreaker, **kwargs) -> ResilientCaller:
+    return ResilientCaller(timeout=1.0, attempts=3, base_delay=0.001, max_delay=0.001, breaker=breaker, **kwargs)
+
+
+def test_caller_recovers_through_half_open_trial():
+    breaker = open_breaker()
+    resilient = caller(breaker)
+
+    async def ok():
+        return 'parsed'
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilient.call(ok))
+    time.sleep(RESET)
+
+    assert asyncio.run(resilient.call(ok)) == 'parsed'
+    assert breaker.state == 'closed'
+
+
+def test_caller_retries_transient_errors():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=RESET)
+    resilient = caller(breaker)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TransientError("503")
+        return 'parsed'
+
+    assert asyncio.run(resilient.call(flaky)) == 'parsed'
+    assert len(calls) == 3 and resilient.retries == 2
+    assert breaker.state == 'closed'
+
+
+def test_caller_does_not_retry_or_trip_on_bad_requests():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=RESET)
+    resilient = caller(breaker)
+    calls = []
+
+    async def bad_request():
+        calls.append(1)
+        raise ValueError("400 invalid argument")
+
+    with pytest.raises(ValueError):
+        asyncio.run(resilient.call(bad_request))
+    assert len(calls) == 1
+    assert breaker.state == 'closed'
+
+
+def test_cancelled_trial_frees_the_slot():
+    breaker = open_breaker()
+    resilient = caller(breaker)
+    time.sleep(RESET)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def cancel_trial():
+        task = asyncio.ensure_future(resilient.call(hang))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_trial())
+
+    assert breaker.state == 'half_open'
+    assert breaker.before_call() is True
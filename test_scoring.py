@@ -0,0 +1,120 @@
+"""Batch scoring paths give the same results as the per-candidate ones"""
+
+import json
+import random
+
+import numpy as np
+import pandas as pd
+
+from utils.big5_scoring import BIG5_QUESTIONS, TRAITS, answer_matrix, calculate_big5_scores, decode_answers
+from utils.fitment_scorer import FitmentScorer
+from utils.retention_scorer import RetentionScorer
+from utils.scoring_rules import load_rules
+
+FEATURES = load_rules().dataset
+
+
+def random_candidates(n: int, seed: int = 7):
+    """Candidates whose features are often exactly on a breakpoint, where the bins can disagree"""
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(n):
+        candidate = {}
+        for rule in FEATURES:
+            edges = list(rule.breakpoints) or [rule.equals]
+            candidate[rule.name] = rng.choice([rng.choice(edges), rng.uniform(0, 15), rng.randint(0, 2)])
+        candidate.update({trait: rng.randint(0, 40) for trait in TRAITS})
+        candidates.append(candidate)
+    return candidates
+
+
+def test_fitment_batch_matches_scalar():
+    scorer = FitmentScorer()
+    candidates = random_candidates(2000)
+
+    batch = scorer.score_batch(pd.DataFrame(candidates))
+
+    for i, candidate in enumerate(candidates):
+        expected = scorer.calculate_overall_fitment(candidate, {trait: candidate[trait] for trait in TRAITS})
+        row = batch.iloc[i]
+        assert row['category'] == expected['category']
+        for column in ('raw_dataset_score', 'fitment_score', 'big5_score', 'overall_fitment_score'):
+            assert row[column] == expected[column], (i, column)
+        for trait, key in zip(TRAITS, 'OCEAN'):
+            assert row[f'{trait}_score'] == expected['big5_trait_scores'][key]
+        assert row['rule_version'] == expected['rule_version']
+
+
+def test_fitment_batch_without_big5_uses_neutral_traits():
+    scorer = FitmentScorer()
+    candidates = [{rule.name: candidate[rule.name] for rule in FEATURES} for candidate in random_candidates(200)]
+
+    batch = scorer.score_batch(pd.DataFrame(candidates))
+
+    expected = [scorer.calculate_overall_fitment(candidate)['overall_fitment_score'] for candidate in candidates]
+    assert batch['overall_fitment_score'].tolist() == expected
+
+
+def test_fitment_batch_scores_answer_matrix():
+    scorer = FitmentScorer()
+    rng = random.Random(3)
+    candidates = random_candidates(300)
+    stored = [json.dumps([[q['id'], rng.randint(1, 5)] for q in BIG5_QUESTIONS]) for _ in candidates]
+
+    batch = scorer.score_batch(pd.DataFrame(candidates), answers=answer_matrix(stored))
+
+    for i, candidate in enumerate(candidates):
+        big5 = calculate_big5_scores(json.loads(stored[i]))
+        assert batch['overall_fitment_score'].iat[i] == scorer.calculate_overall_fitment(candidate, big5)[
+            'overall_fitment_score']
+
+
+def test_answer_matrix_matches_row_decoding():
+    stored = [
+        json.dumps([[q['id'], (q['id'] % 5) + 1] for q in BIG5_QUESTIONS]),
+        json.dumps([[1, 5], [2, 3]]),
+        None,
+        '',
+        '[[1, 5], [2,',
+        '[["3", "4"]]',
+    ]
+
+    matrix = answer_matrix(stored)
+
+    assert matrix.shape == (len(stored), len(BIG5_QUESTIONS))
+    for row, value in zip(matrix, stored):
+        assert np.array_equal(row, decode_answers(value))
+
+
+def test_retention_batch_matches_scalar():
+    scorer = RetentionScorer()
+    rng = np.random.default_rng(13)
+    n = 2000
+    df = pd.DataFrame({
+        'longevity_years': rng.choice([0, 1, 2, 3, 5, rng.uniform(0, 12)], n),
+        'number_of_unique_designations': rng.integers(0, 7, n),
+        'average_experience': rng.uniform(0, 15, n),
+        'workshops': rng.integers(0, 15, n),
+        'trainings': rng.integers(0, 15, n),
+        'total_papers': rng.integers(0, 5, n),
+        'total_patents': rng.integers(0, 2, n),
+        'achievements': rng.integers(0, 9, n),
+        **{trait: rng.integers(0, 41, n) for trait in TRAITS},
+        'fitment_score': rng.choice([40, 50, 60, 70, rng.uniform(20, 95)], n),
+        'category': rng.choice(['Experienced', 'Inexperienced', 'Fresher'], n),
+    })
+
+    batch = scorer.calculate_retention_risk_batch(df)
+
+    for i, record in enumerate(df.to_dict('records')):
+        expected = scorer.calculate_retention_risk(record, record['fitment_score'], record, record['category'])
+        assert scorer.retention_details(batch.iloc[i]) == expected, i
+
+
+def test_static_helpers_follow_default_rules():
+    scorer = FitmentScorer()
+    assert FitmentScorer.categorize_candidate(5, 3) == scorer.rules.categorize(5, 3) == 'Experienced'
+    assert FitmentScorer.categorize_candidate(2, 2) == 'Inexperienced'
+    assert FitmentScorer.categorize_candidate(1, 3) == 'Fresher'
+    assert [FitmentScorer.score_longevity(value) for value in (0.5, 1, 4, 6)] == [20, 50, 75, 100]
+    assert FitmentScorer.score_institute(1) == 100 and FitmentScorer.score_institute(0) == 0
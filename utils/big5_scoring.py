@@ -0,0 +1,246 @@
+"""
+Big Five personality test scoring
+The question bank and its scoring key, precomputed as NumPy arrays: a trait index
+and a reverse-key mask per question. One answer vector or a whole matrix of test
+submissions (one row per test) is keyed and summed per trait in one operation,
+so bulk rescoring doesn't loop over questions.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+TRAITS: Tuple[str, ...] = ('openness', 'conscientiousness', 'extraversion', 'agreeableness', 'neuroticism')
+
+# Big Five Questions (50 total - 10 per trait)
+BIG5_QUESTIONS = [
+    # Openness (10 questions)
+    {"id": 1, "text": "I have a vivid imagination", "trait": "openness", "reverse": False},
+    {"id": 2, "text": "I am interested in abstract ideas", "trait": "openness", "reverse": False},
+    {"id": 3, "text": "I have difficulty understanding abstract ideas", "trait": "openness", "reverse": True},
+    {"id": 4, "text": "I have a rich vocabulary", "trait": "openness", "reverse": False},
+    {"id": 5, "text": "I enjoy thinking about complex topics", "trait": "openness", "reverse": False},
+    {"id": 6, "text": "I am not interested in theoretical discussions", "trait": "openness", "reverse": True},
+    {"id": 7, "text": "I enjoy hearing new ideas", "trait": "openness", "reverse": False},
+    {"id": 8, "text": "I prefer routine to variety", "trait": "openness", "reverse": True},
+    {"id": 9, "text": "I am curious about many different things", "trait": "openness", "reverse": False},
+    {"id": 10, "text": "I avoid philosophical discussions", "trait": "openness", "reverse": True},
+    
+    # Conscientiousness (10 questions)
+    {"id": 11, "text": "I am always prepared", "trait": "conscientiousness", "reverse": False},
+    {"id": 12, "text": "I pay attention to details", "trait": "conscientiousness", "reverse": False},
+    {"id": 13, "text": "I make a mess of things", "trait": "conscientiousness", "reverse": True},
+    {"id": 14, "text": "I get chores done right away", "trait": "conscientiousness", "reverse": False},
+    {"id": 15, "text": "I often forget to put things back", "trait": "conscientiousness", "reverse": True},
+    {"id": 16, "text": "I like order", "trait": "conscientiousness", "reverse": False},
+    {"id": 17, "text": "I shirk my duties", "trait": "conscientiousness", "reverse": True},
+    {"id": 18, "text": "I follow a schedule", "trait": "conscientiousness", "reverse": False},
+    {"id": 19, "text": "I am exacting in my work", "trait": "conscientiousness", "reverse": False},
+    {"id": 20, "text": "I leave my belongings around", "trait": "conscientiousness", "reverse": True},
+    
+    # Extraversion (10 questions)
+    {"id": 21, "text": "I am the life of the party", "trait": "extraversion", "reverse": False},
+    {"id": 22, "text": "I don't talk a lot", "trait": "extraversion", "reverse": True},
+    {"id": 23, "text": "I feel comfortable around people", "trait": "extraversion", "reverse": False},
+    {"id": 24, "text": "I keep in the background", "trait": "extraversion", "reverse": True},
+    {"id": 25, "text": "I start conversations", "trait": "extraversion", "reverse": False},
+    {"id": 26, "text": "I have little to say", "trait": "extraversion", "reverse": True},
+    {"id": 27, "text": "I talk to a lot of different people at parties", "trait": "extraversion", "reverse": False},
+    {"id": 28, "text": "I don't like to draw attention to myself", "trait": "extraversion", "reverse": True},
+    {"id": 29, "text": "I don't mind being the center of attention", "trait": "extraversion", "reverse": False},
+    {"id": 30, "text": "I am quiet around strangers", "trait": "extraversion", "reverse": True},
+    
+    # Agreeableness (10 questions)
+    {"id": 31, "text": "I feel others' emotions", "trait": "agreeableness", "reverse": False},
+    {"id": 32, "text": "I am not really interested in others", "trait": "agreeableness", "reverse": True},
+    {"id": 33, "text": "I make people feel at ease", "trait": "agreeableness", "reverse": False},
+    {"id": 34, "text": "I insult people", "trait": "agreeableness", "reverse": True},
+    {"id": 35, "text": "I sympathize with others' feelings", "trait": "agreeableness", "reverse": False},
+    {"id": 36, "text": "I am not interested in other people's problems", "trait": "agreeableness", "reverse": True},
+    {"id": 37, "text": "I have a soft heart", "trait": "agreeableness", "reverse": False},
+    {"id": 38, "text": "I take time out for others", "trait": "agreeableness", "reverse": False},
+    {"id": 39, "text": "I feel little concern for others", "trait": "agreeableness", "reverse": True},
+    {"id": 40, "text": "I make people feel welcome", "trait": "agreeableness", "reverse": False},
+    
+    # Neuroticism (10 questions)
+    {"id": 41, "text": "I get stressed out easily", "trait": "neuroticism", "reverse": False},
+    {"id": 42, "text": "I am relaxed most of the time", "trait": "neuroticism", "reverse": True},
+    {"id": 43, "text": "I worry about things", "trait": "neuroticism", "reverse": False},
+    {"id": 44, "text": "I seldom feel blue", "trait": "neuroticism", "reverse": True},
+    {"id": 45, "text": "I am easily disturbed", "trait": "neuroticism", "reverse": False},
+    {"id": 46, "text": "I get upset easily", "trait": "neuroticism", "reverse": False},
+    {"id": 47, "text": "I change my mood a lot", "trait": "neuroticism", "reverse": False},
+    {"id": 48, "text": "I have frequent mood swings", "trait": "neuroticism", "reverse": False},
+    {"id": 49, "text": "I get irritated easily", "trait": "neuroticism", "reverse": False},
+    {"id": 50, "text": "I often feel blue", "trait": "neuroticism", "reverse": False},
+]
+
+# Scoring key - column j of an answer vector is BIG5_QUESTIONS[j]
+QUESTION_IDS = np.array([q['id'] for q in BIG5_QUESTIONS], dtype=np.int64)
+QUESTION_POSITION: Dict[int, int] = {q['id']: j for j, q in enumerate(BIG5_QUESTIONS)}
+TRAIT_POSITION: Dict[str, int] = {trait: k for k, trait in enumerate(TRAITS)}
+TRAIT_INDEX = np.array([TRAIT_POSITION[q['trait']] for q in BIG5_QUESTIONS], dtype=np.int64)
+REVERSE_MASK = np.array([q['reverse'] for q in BIG5_QUESTIONS], dtype=bool)
+# questions x traits one-hot, so keyed answers @ TRAIT_MATRIX sums each trait
+TRAIT_MATRIX = np.eye(len(TRAITS), dtype=np.int64)[TRAIT_INDEX]
+# question id -> column, -1 for ids not in the bank
+ID_TO_COLUMN = np.full(QUESTION_IDS.max() + 1, -1, dtype=np.int64)
+ID_TO_COLUMN[QUESTION_IDS] = np.arange(len(QUESTION_IDS))
+
+# Stored with each test's trait scores - bump when questions or the scoring key change,
+# then run rescore_personality.py
+SCORING_VERSION = '1'
+
+LIKERT_MAX = 5
+QUESTIONS_PER_TRAIT = 10
+
+AnswerInput = Union[Mapping[Any, Any], Iterable[Tuple[Any, Any]]]
+
+
+def answer_vector(answers: AnswerInput) -> np.ndarray:
+    """
+    Answers as a vector in question order, 0 for unanswered
+
+    Accepts the session's {question_id: answer} dict or the [[question_id, answer], ...]
+    pairs stored in personality_tests.test_answers (ids may be strings after JSON).
+    Unknown question ids are ignored.
+    """
+    vector = np.zeros(len(BIG5_QUESTIONS), dtype=np.int64)
+    items = answers.items() if isinstance(answers, Mapping) else answers
+    for q_id, value in items:
+        position = QUESTION_POSITION.get(int(q_id))
+        if position is not None:
+            vector[position] = int(value)
+    return vector
+
+
+def decode_answers(test_answers: str) -> np.ndarray:
+    """answer_vector for a test_answers JSON column value (empty/NULL/malformed -> all unanswered)"""
+    return answer_vector(_loads_pairs(test_answers))
+
+
+# Values the fast scan reads: exactly what save_personality_test_results writes
+# (json.dumps of [[id, answer], ...]), every entry two integers; NULL/'' rows are empty
+_PAIRS_ROW = r'(?:\[(?:\[[0-9]+, [0-9]+\](?:, \[[0-9]+, [0-9]+\])*)?\])?'
+_PAIRS_CHUNK = re.compile(rf'{_PAIRS_ROW}(?:\n{_PAIRS_ROW})*')
+
+Pairs = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _scan_pairs(test_answers: Sequence[Optional[str]]) -> Optional[Pairs]:
+    """
+    (row, question id, answer) arrays read straight off the bytes of the values
+
+    Every run of digits is an integer, and consecutive integers of a row pair up as
+    [id, answer] - which only holds once the whole chunk has matched the stored
+    [[id, answer], ...] format, entry by entry. Returns None when any value holds
+    anything else ({"1": 4} objects, floats, an entry of three numbers), so the
+    caller decodes them as JSON.
+    """
+    text = '\n'.join(value or '' for value in test_answers)
+    if _PAIRS_CHUNK.fullmatch(text) is None:
+        return None
+    data = np.frombuffer(text.encode(), dtype=np.uint8)
+    row_breaks = np.flatnonzero(data == ord('\n'))
+    if len(row_breaks) != len(test_answers) - 1:
+        return None
+
+    positions = np.flatnonzero((data >= ord('0')) & (data <= ord('9')))
+    if not len(positions):
+        return _empty_pairs()
+    starts = np.empty(len(positions), dtype=bool)
+    starts[0] = True
+    starts[1:] = positions[1:] != positions[:-1] + 1
+    run = np.cumsum(starts) - 1
+    lengths = np.bincount(run)
+    if lengths.max() > 9:
+        return None
+    place = (np.cumsum(lengths) - 1)[run] - np.arange(len(positions))
+    numbers = np.bincount(run, weights=(data[positions] - ord('0')) * 10.0 ** place).astype(np.int64)
+
+    rows = np.searchsorted(row_breaks, positions[starts])
+    return rows[0::2], numbers[0::2], numbers[1::2]
+
+
+def _empty_pairs() -> Pairs:
+    empty = np.zeros(0, dtype=np.int64)
+    return empty, empty, empty
+
+
+def _loads_pairs(test_answers: Optional[str]) -> List[Tuple[int, int]]:
+    """(question id, answer) pairs of one stored value - malformed values and entries are dropped"""
+    try:
+        answers = json.loads(test_answers) if test_answers else []
+    except json.JSONDecodeError:
+        return []
+    if isinstance(answers, dict):
+        answers = answers.items()
+    elif not isinstance(answers, list):
+        return []
+    pairs = []
+    for pair in answers:
+        try:
+            q_id, value = pair
+            pairs.append((int(q_id), int(value)))
+        except (TypeError, ValueError):
+            continue
+    return pairs
+
+
+def _json_pairs(test_answers: Sequence[Optional[str]]) -> Pairs:
+    """_scan_pairs via json.loads - row by row, so a malformed value only loses its own row"""
+    decoded = [_loads_pairs(text) for text in test_answers]
+    lengths = np.fromiter((len(answers) for answers in decoded), dtype=np.int64, count=len(decoded))
+    if not lengths.sum():
+        return _empty_pairs()
+    pairs = np.array([pair for answers in decoded for pair in answers], dtype=np.int64)
+    return np.repeat(np.arange(len(decoded)), lengths), pairs[:, 0], pairs[:, 1]
+
+
+def answer_matrix(test_answers: Sequence[Optional[str]]) -> np.ndarray:
+    """
+    decode_answers for many test_answers values at once -> (n, 50) matrix
+
+    Values in the stored [[id, answer], ...] format are read with a vectorized scan
+    over the chunk's bytes instead of json.loads per row, then scattered into the
+    matrix with one fancy-indexing assignment. Anything else goes through JSON;
+    malformed rows are left unanswered (all zeros).
+    """
+    matrix = np.zeros((len(test_answers), len(BIG5_QUESTIONS)), dtype=np.int64)
+    if not len(test_answers):
+        return matrix
+    pairs = _scan_pairs(test_answers)
+    rows, ids, values = pairs if pairs is not None else _json_pairs(test_answers)
+
+    known = (ids >= 0) & (ids < len(ID_TO_COLUMN))
+    columns = np.full(len(ids), -1, dtype=np.int64)
+    columns[known] = ID_TO_COLUMN[ids[known]]
+    known = columns >= 0
+    matrix[rows[known], columns[known]] = values[known]
+    return matrix
+
+
+def score_answers(answers: np.ndarray) -> np.ndarray:
+    """
+    Trait scores (0-40 each, in TRAITS order) for an answer vector or matrix
+
+    answers is (50,) or (n, 50) with values 1-5 and 0 for unanswered. Reverse-keyed
+    answers count as 6 - answer, each trait's ten answers are summed and shifted
+    from 10-50 to 0-40. An unanswered question adds nothing.
+    """
+    answers = np.asarray(answers, dtype=np.int64)
+    keyed = np.where(REVERSE_MASK, LIKERT_MAX + 1 - answers, answers)
+    keyed = np.where(answers > 0, keyed, 0)
+    return keyed @ TRAIT_MATRIX - QUESTIONS_PER_TRAIT
+
+
+def trait_scores(scores: np.ndarray) -> Dict[str, int]:
+    """One row of score_answers as the {trait: score} dict the scorers take"""
+    return {trait: int(score) for trait, score in zip(TRAITS, scores)}
+
+
+def calculate_big5_scores(answers: AnswerInput) -> Dict[str, int]:
+    """Trait scores (0-40) for one completed test"""
+    return trait_scores(score_answers(answer_vector(answers)))
@@ -0,0 +1,134 @@
+"""
+Content-addressed storage for resume files
+Keeps uploaded file bytes out of SQLite - the resumes table only stores the hash
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+from typing import BinaryIO, Iterator
+
+
+class BlobStore:
+    """Interface for resume file storage backends, addressed by SHA-256 of the content"""
+
+    @staticmethod
+    def hash_content(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def put(self, data: bytes) -> str:
+        """
+        Store bytes, returns the content hash
+
+        Storing a blob that is already present only refreshes its modification time,
+        so a pending save isn't garbage-collected as an old orphan.
+        """
+        raise NotImplementedError
+
+    def open(self, content_hash: str) -> BinaryIO:
+        """Open a stored blob for streaming reads"""
+        raise NotImplementedError
+
+    def read(self, content_hash: str) -> bytes:
+        with self.open(content_hash) as f:
+            return f.read()
+
+    def exists(self, content_hash: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, content_hash: str):
+        raise NotImplementedError
+
+    def delete_if_stored_before(self, content_hash: str, cutoff: float) -> bool:
+        """Delete the blob unless it was stored (or re-stored) at or after the cutoff Unix time"""
+        raise NotImplementedError
+
+    def iter_hashes(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blobs as files on local disk, sharded two levels deep by hash prefix
+    (resume_store/ab/cd/abcd...) so no directory grows too large
+    """
+
+    def __init__(self, root: str = "resume_store"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, content_hash: str) -> str:
+        return os.path.join(self.root, content_hash[:2], content_hash[2:4], content_hash)
+
+    def put(self, data: bytes) -> str:
+        content_hash = self.hash_content(data)
+        path = self.path_for(content_hash)
+
+        # Re-uploads of the same file are deduplicated
+        if os.path.exists(path):
+            try:
+                os.utime(path)
+                return content_hash
+            except FileNotFoundError:
+                # Collected as an orphan just now - store it again
+                pass
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return content_hash
+
+    def open(self, content_hash: str) -> BinaryIO:
+        return open(self.path_for(content_hash), 'rb')
+
+    def mmap(self, content_hash: str) -> mmap.mmap:
+        """Memory-map a blob read-only - avoids copying large files into Python memory"""
+        with self.open(content_hash) as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def exists(self, content_hash: str) -> bool:
+        return os.path.exists(self.path_for(content_hash))
+
+    def delete(self, content_hash: str):
+        path = self.path_for(content_hash)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def delete_if_stored_before(self, content_hash: str, cutoff: float) -> bool:
+        path = self.path_for(content_hash)
+        # Move it aside first: a put from now on writes a fresh copy, and one that
+        # refreshed the old copy just before shows up in its modification time
+        fd, tomb = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        os.close(fd)
+        try:
+            os.replace(path, tomb)
+        except FileNotFoundError:
+            os.remove(tomb)
+            return False
+        if os.path.getmtime(tomb) >= cutoff:
+            # Still wanted - put it back unless a put already stored it again
+            if os.path.exists(path):
+                os.remove(tomb)
+            else:
+                os.replace(tomb, path)
+            return False
+        os.remove(tomb)
+        return True
+
+    def iter_hashes(self) -> Iterator[str]:
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if not name.startswith('.tmp-'):
+                    yield name
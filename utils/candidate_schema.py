@@ -0,0 +1,210 @@
+"""
+Fields of a parsed candidate
+Single definition of what ResumeParser extracts: the prompt's field list, the
+structured-output schema sent to Gemini, the validator for its answers and the
+candidates columns DatabaseManager writes are all built from CANDIDATE_FIELDS.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+
+class CandidateField(NamedTuple):
+    name: str
+    type: str           # 'string', 'number' or 'array'
+    default: Any
+    description: str
+    group: str
+
+
+CANDIDATE_FIELDS: List[CandidateField] = [
+    CandidateField('name', 'string', '', 'full name', 'REQUIRED FIELDS'),
+    CandidateField('email', 'string', '', '', 'REQUIRED FIELDS'),
+    CandidateField('phone', 'string', '', '', 'REQUIRED FIELDS'),
+    CandidateField('address', 'string', '', '', 'REQUIRED FIELDS'),
+    CandidateField('summary', 'string', '', 'professional summary', 'REQUIRED FIELDS'),
+
+    CandidateField('ug_institute_name', 'string', '', 'undergraduate institution full name', 'EDUCATION'),
+    CandidateField('ug_institute_code', 'string', '', 'UG institution abbreviation/code if mentioned', 'EDUCATION'),
+    CandidateField('pg_institute_name', 'string', 'None',
+                   'postgraduate institution, "None" if not applicable', 'EDUCATION'),
+    CandidateField('pg_institute_code', 'string', 'None',
+                   'PG institution abbreviation/code, "None" if not applicable', 'EDUCATION'),
+    CandidateField('phd_institute_name', 'string', 'None', 'PhD institution, "None" if not applicable', 'EDUCATION'),
+    CandidateField('phd_institute_code', 'string', 'None',
+                   'PhD institution abbreviation/code, "None" if not applicable', 'EDUCATION'),
+    CandidateField('ug_institute', 'number', 0, '1 if IIT/NIT/IIIT/Tier-1 institution, else 0', 'EDUCATION'),
+    CandidateField('pg_institute', 'number', 0, '1 if IIT/NIT/IIIT/Tier-1 institution, else 0', 'EDUCATION'),
+    CandidateField('phd_institute', 'number', 0, '1 if IIT/NIT/IIIT/Tier-1 institution, else 0', 'EDUCATION'),
+
+    CandidateField('longevity_years', 'number', 0.0,
+                   'average tenure at each job in years - calculate by total years / number of jobs', 'EXPERIENCE'),
+    CandidateField('average_experience', 'number', 0.0, 'total professional work experience in years', 'EXPERIENCE'),
+    CandidateField('number_of_unique_designations', 'number', 0,
+                   'count of unique job titles/positions held', 'EXPERIENCE'),
+
+    CandidateField('workshops', 'number', 0, 'count of workshops attended', 'PROFESSIONAL DEVELOPMENT'),
+    CandidateField('trainings', 'number', 0, 'count of training programs completed', 'PROFESSIONAL DEVELOPMENT'),
+    CandidateField('workshops_list', 'array', [], 'list workshop names', 'PROFESSIONAL DEVELOPMENT'),
+    CandidateField('trainings_list', 'array', [], 'list training program names', 'PROFESSIONAL DEVELOPMENT'),
+
+    CandidateField('total_papers', 'number', 0, 'research papers published', 'RESEARCH & PUBLICATIONS'),
+    CandidateField('total_patents', 'number', 0, 'patents filed/granted', 'RESEARCH & PUBLICATIONS'),
+    CandidateField('books', 'number', 0, 'books authored/co-authored', 'RESEARCH & PUBLICATIONS'),
+    CandidateField('research_papers_list', 'array', [], 'list paper titles', 'RESEARCH & PUBLICATIONS'),
+    CandidateField('patents_list', 'array', [], 'list patent titles', 'RESEARCH & PUBLICATIONS'),
+    CandidateField('books_list', 'array', [], 'list book titles', 'RESEARCH & PUBLICATIONS'),
+
+    CandidateField('achievements', 'number', 0, 'count of awards/achievements', 'ACHIEVEMENTS'),
+    CandidateField('achievements_list', 'array', [], 'list achievement descriptions', 'ACHIEVEMENTS'),
+
+    CandidateField('state_jk', 'number', 0, '1 if from Jammu & Kashmir or mentions J&K, else 0', 'LOCATION'),
+
+    CandidateField('skills', 'array', [], 'technical and soft skills', 'SKILLS'),
+    CandidateField('skills_count', 'number', 0, 'count of skills', 'SKILLS'),
+
+    CandidateField('projects', 'array', [], 'project names/descriptions', 'PROJECTS'),
+    CandidateField('projects_count', 'number', 0, 'count of projects', 'PROJECTS'),
+
+    CandidateField('best_fit_for', 'string', '', 'suggest 1-2 suitable job roles based on profile', 'ADDITIONAL'),
+]
+
+FIELDS_BY_NAME: Dict[str, CandidateField] = {field.name: field for field in CANDIDATE_FIELDS}
+
+
+def default_values() -> Dict[str, Any]:
+    """Fresh defaults for every field (lists are new objects each call)"""
+    return {field.name: list(field.default) if field.type == 'array' else field.default
+            for field in CANDIDATE_FIELDS}
+
+
+def prompt_field_list(exclude: Iterable[str] = ()) -> str:
+    """Field list for the extraction prompt, grouped as in the original prompt, minus excluded fields"""
+    excluded = set(exclude)
+    lines = []
+    group = None
+    for field in CANDIDATE_FIELDS:
+        if field.name in excluded:
+            continue
+        if field.group != group:
+            if group is not None:
+                lines.append('')
+            lines.append(f"{field.group}:")
+            group = field.group
+        type_name = 'array of strings' if field.type == 'array' else field.type
+        description = f" ({field.description})" if field.description else ''
+        lines.append(f"- {field.name}: {type_name}{description}")
+    return '\n'.join(lines)
+
+
+_SCHEMA_TYPES = {'string': 'STRING', 'number': 'NUMBER', 'array': 'ARRAY'}
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def response_schema(exclude: Iterable[str] = ()) -> Dict[str, Any]:
+    """Gemini structured-output schema (response_schema) for the fields the prompt asks for"""
+    excluded = set(exclude)
+    properties = {}
+    for field in CANDIDATE_FIELDS:
+        if field.name in excluded:
+            continue
+        prop = {'type': _SCHEMA_TYPES[field.type]}
+        if field.type == 'array':
+            prop['items'] = {'type': 'STRING'}
+        if field.description:
+            prop['description'] = field.description
+        properties[field.name] = prop
+    return {'type': 'OBJECT', 'properties': properties, 'required': list(properties)}
+
+
+def batch_response_schema(exclude: Iterable[str] = ()) -> Dict[str, Any]:
+    """Schema for a multi-resume answer: {"results": [candidate + doc_id, ...]}"""
+    item = response_schema(exclude)
+    item['properties'] = {'doc_id': {'type': 'STRING', 'description': 'id from the resume delimiter line'},
+                          **item['properties']}
+    item['required'] = ['doc_id'] + item['required']
+    return {'type': 'OBJECT', 'properties': {'results': {'type': 'ARRAY', 'items': item}}, 'required': ['results']}
+
+
+def _coerce_number(value: Any, default: Any) -> Any:
+    if isinstance(value, bool):
+        number = float(value)
+    elif isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        # "3", "3 years", "approx. 2.5"
+        match = _NUMBER.search(str(value)) if value is not None else None
+        if match is None:
+            return default
+        number = float(match.group(0))
+    # Integer fields (default 0) stay integers; 0.0 defaults mark real-valued fields
+    return int(round(number)) if isinstance(default, int) else number
+
+
+def _coerce_string(value: Any, default: str) -> str:
+    if value is None:
+        return default
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value if item is not None)
+    return str(value).strip()
+
+
+def _coerce_array(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [item.strip() if isinstance(item, str) else json.dumps(item) for item in value
+                if item not in (None, '')]
+    text = str(value).strip()
+    if not text:
+        return []
+    # A list flattened into one string - "Python; SQL" or one entry per line
+    return [part.strip() for part in re.split(r'\n|;', text) if part.strip()]
+
+
+def coerce_candidate(data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """
+    Validate a parsed candidate against CANDIDATE_FIELDS
+
+    Every field is present and of its schema type afterwards: missing fields get
+    their default, numbers are read out of strings, lists are split out of strings.
+    Returns (candidate, number of fields that had to be fixed). Lossless int/float
+    conversions (5 -> 5.0) are applied but not counted as fixes. Extra keys are kept.
+    """
+    candidate = dict(data)
+    fixed = 0
+    for field in CANDIDATE_FIELDS:
+        value = data.get(field.name)
+        if field.type == 'number':
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if isinstance(value, int) != isinstance(field.default, int):
+                    candidate[field.name] = _coerce_number(value, field.default)
+                    # Only rounding 2.5 years down to 2 loses anything
+                    fixed += candidate[field.name] != value
+                continue
+            coerced = _coerce_number(value, field.default)
+        elif field.type == 'array':
+            if isinstance(value, list) and all(isinstance(item, str) for item in value):
+                continue
+            coerced = _coerce_array(value)
+        else:
+            if isinstance(value, str):
+                continue
+            coerced = _coerce_string(value, field.default)
+        candidate[field.name] = coerced
+        fixed += 1
+    return candidate, fixed
+
+
+# candidates table columns filled from the schema, in schema order
+CANDIDATE_COLUMNS: List[str] = [field.name for field in CANDIDATE_FIELDS]
+
+
+def candidate_row(candidate_data: Dict[str, Any]) -> List[Any]:
+    """Values for CANDIDATE_COLUMNS - lists stored as JSON text, missing fields as their default"""
+    row = []
+    for field in CANDIDATE_FIELDS:
+        value = candidate_data.get(field.name, field.default)
+        row.append(json.dumps(value if value is not None else []) if field.type == 'array' else value)
+    return row
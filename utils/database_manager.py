@@ -7,20 +7,197 @@ import sqlite3
 import json
 import os
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Tuple
 import hashlib
+import logging
+import mimetypes
+import queue
+import threading
+import time
+import pandas as pd
+from utils.big5_scoring import SCORING_VERSION, TRAIT_POSITION, answer_matrix, score_answers
+from utils.blob_store import BlobStore, LocalBlobStore
+from utils.candidate_schema import CANDIDATE_COLUMNS, candidate_row
+from utils.migrations import MigrationRunner
+from utils.retention_scorer import risk_flag_mask
+from utils.token_resolver import TokenResolver
+
+logger = logging.getLogger(__name__)
+
+# Candidate columns needed to recompute a fitment score
+SCORING_COLUMNS = [
+    'longevity_years', 'average_experience', 'workshops', 'trainings',
+    'total_papers', 'total_patents', 'achievements', 'books', 'state_jk',
+    'number_of_unique_designations', 'ug_institute', 'pg_institute', 'phd_institute'
+]
+
+CANDIDATE_UPSERT_SQL = (
+    f"INSERT OR REPLACE INTO candidates (candidate_id, {', '.join(CANDIDATE_COLUMNS)}, updated_at) "
+    f"VALUES ({', '.join('?' * (len(CANDIDATE_COLUMNS) + 2))})"
+)
+
+BIG5_COLUMNS = ['openness', 'conscientiousness', 'extraversion', 'agreeableness', 'neuroticism']
+
+RESUMES_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        candidate_id TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        file_size INTEGER NOT NULL,
+        mime_type TEXT,
+        file_type TEXT NOT NULL,
+        extracted_text TEXT,
+        uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (candidate_id) REFERENCES candidates(candidate_id)
+    )
+'''
+
+# Lookups that must stay index-backed as tables grow - checked by check_query_plans()
+TOKEN_LOOKUP_SQL = '''
+    SELECT c.*, p.test_status FROM candidates c
+    JOIN personality_tests p ON c.candidate_id = p.candidate_id
+    WHERE p.test_token = ?
+'''
+
+LATEST_FITMENT_SCORE_SQL = '''
+    SELECT * FROM fitment_scores
+    WHERE candidate_id = ?
+    ORDER BY calculated_at DESC, id DESC
+    LIMIT 1
+'''
+
+LATEST_RETENTION_SCORE_SQL = '''
+    SELECT * FROM retention_scores
+    WHERE candidate_id = ? AND is_current = 1
+'''
+
+EMAIL_LOGS_SQL = '''
+    SELECT * FROM email_logs
+    WHERE candidate_id = ?
+    ORDER BY sent_at DESC
+'''
+
+KEY_QUERIES = {
+    'token_lookup': (TOKEN_LOOKUP_SQL, ('token',)),
+    'latest_fitment_score': (LATEST_FITMENT_SCORE_SQL, ('CAND_ID',)),
+    'latest_retention_score': (LATEST_RETENTION_SCORE_SQL, ('CAND_ID',)),
+    'email_logs_by_candidate': (EMAIL_LOGS_SQL, ('CAND_ID',)),
+    'tests_by_candidate': ('SELECT * FROM personality_tests WHERE candidate_id = ?', ('CAND_ID',)),
+    'resumes_by_candidate': ('SELECT * FROM resumes WHERE candidate_id = ?', ('CAND_ID',)),
+}
+
+
+class PooledConnection:
+    """
+    sqlite3 connection borrowed from a ConnectionPool
+    
+    Behaves like the underlying connection, except close() hands it back to the
+    pool (rolling back anything uncommitted) instead of closing the file.
+    """
+    
+    def __init__(self, pool: 'ConnectionPool', conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn = conn
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+    
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections tuned for concurrent writers"""
+    
+    def __init__(self, db_path: str, max_idle: int = 8, busy_timeout: float = 30.0,
+                 cache_size_kb: int = 16384, cached_statements: int = 256):
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.cache_size_kb = cache_size_kb
+        self.cached_statements = cached_statements
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+    
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread=False: a connection is only ever used by one borrower at a time,
+        # but Streamlit may return it from a different script thread than the one that opened it
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        # WAL lets readers and a writer proceed concurrently; NORMAL skips the fsync per commit
+        self._enable_wal(conn)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size=-{self.cache_size_kb}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
+    def _enable_wal(self, conn: sqlite3.Connection):
+        """
+        Switch to WAL, retrying while locked - the switch needs an exclusive lock and SQLite
+        doesn't apply the busy timeout to it, so processes opening a new database together
+        would otherwise fail with "database is locked". WAL persists, so this is a no-op after.
+        """
+        give_up_at = time.monotonic() + self.busy_timeout
+        while True:
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+                return
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) or time.monotonic() >= give_up_at:
+                    conn.close()
+                    raise
+                time.sleep(0.05)
+    
+    def acquire(self) -> PooledConnection:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        return PooledConnection(self, conn)
+    
+    def release(self, conn: sqlite3.Connection):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.close()
+    
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "database.db"):
+    def __init__(self, db_path: str = "database.db", pool_size: int = 8,
+                 blob_store: BlobStore = None, auto_migrate: bool = True):
         self.db_path = db_path
-        self.init_database()
+        self.pool = ConnectionPool(db_path, max_idle=pool_size)
+        # Resume files live next to the database, not inside it
+        self.blob_store = blob_store or LocalBlobStore(
+            os.path.join(os.path.dirname(os.path.abspath(db_path)), 'resume_store')
+        )
+        self.token_resolver = TokenResolver(self.get_candidate_by_token)
+        self.init_database(migrate=auto_migrate)
     
     def get_connection(self):
-        """Create database connection"""
-        return sqlite3.connect(self.db_path)
+        """Borrow a pooled database connection - close() returns it to the pool"""
+        return self.pool.acquire()
+    
+    def close(self):
+        """Close all idle pooled connections"""
+        self.pool.close_all()
     
-    def init_database(self):
-        """Initialize database tables"""
+    def init_database(self, migrate: bool = True):
+        """Create the baseline tables, then apply pending versioned migrations (utils/migrations.py)"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
@@ -82,19 +259,8 @@ class DatabaseManager:
             )
         ''')
         
-        # Resume files table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS resumes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                candidate_id TEXT NOT NULL,
-                filename TEXT NOT NULL,
-                file_content BLOB NOT NULL,
-                file_type TEXT NOT NULL,
-                extracted_text TEXT,
-                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (candidate_id) REFERENCES candidates(candidate_id)
-            )
-        ''')
+        # Resume files table - file bytes are kept in the blob store, keyed by content_hash
+        cursor.execute(RESUMES_TABLE_SQL.format(table='resumes'))
         
         # Fitment scores table
         cursor.execute('''
@@ -162,6 +328,10 @@ class DatabaseManager:
         
         conn.commit()
         conn.close()
+        
+        # Bring existing databases up to the current schema version
+        if migrate:
+            MigrationRunner(self).run()
         print("✅ Database initialized successfully")
     
     def generate_candidate_id(self, email: str) -> str:
@@ -176,55 +346,123 @@ class DatabaseManager:
         hash_object = hashlib.sha256(hash_input.encode())
         return hash_object.hexdigest()[:32]
     
+    def _insert_candidate(self, cursor, candidate_data: Dict[str, Any]) -> str:
+        """Insert or replace a candidate row on an open cursor, returns candidate ID"""
+        email = candidate_data['email']
+        candidate_id = self.generate_candidate_id(email)
+        
+        # Columns and list-to-JSON conversion come from the same schema the parser validates against
+        cursor.execute(CANDIDATE_UPSERT_SQL, [candidate_id, *candidate_row(candidate_data), datetime.now()])
+        
+        return candidate_id
+    
+    @staticmethod
+    def guess_mime_type(filename: str) -> str:
+        return mimetypes.guess_type(filename or '')[0] or 'application/octet-stream'
+    
+    def _insert_resume(self, cursor, candidate_id: str, filename: str, file_content: bytes,
+                       file_type: str, extracted_text: str) -> int:
+        """Store the file in the blob store and insert its resume row on an open cursor"""
+        content_hash = self.blob_store.put(file_content)
+        
+        cursor.execute('''
+            INSERT INTO resumes (candidate_id, filename, content_hash, file_size, mime_type,
+                                 file_type, extracted_text)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (candidate_id, filename, content_hash, len(file_content),
+              self.guess_mime_type(filename), file_type, extracted_text))
+        return cursor.lastrowid
+    
+    def _insert_fitment_score(self, cursor, candidate_id: str, score_data: Dict[str, Any]) -> int:
+        """Insert a fitment score row on an open cursor, returns score ID"""
+        traits = score_data.get('big5_trait_scores', {})
+        
+        cursor.execute('''
+            INSERT INTO fitment_scores (
+                candidate_id, category, raw_dataset_score, fitment_score, big5_score,
+                overall_fitment_score, openness_score, conscientiousness_score,
+                extraversion_score, agreeableness_score, neuroticism_score, rule_version
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            candidate_id, score_data['category'], score_data['raw_dataset_score'],
+            score_data['fitment_score'], score_data['big5_score'],
+            score_data['overall_fitment_score'],
+            traits.get('O', 0), traits.get('C', 0), traits.get('E', 0),
+            traits.get('A', 0), traits.get('N', 0), score_data.get('rule_version')
+        ))
+        return cursor.lastrowid
+    
+    @staticmethod
+    def _insert_retention_rows(cursor, candidate_ids: List[str], categories: List[str],
+                               fitment_scores: List[float], retention: pd.DataFrame):
+        """
+        Insert retention scores (RetentionScorer.calculate_retention_risk_batch output) as
+        each candidate's current one; the retention_summary triggers move the counts
+        """
+        cursor.executemany(
+            'UPDATE retention_scores SET is_current = 0 WHERE candidate_id = ? AND is_current = 1',
+            ((candidate_id,) for candidate_id in candidate_ids)
+        )
+        cursor.executemany('''
+            INSERT INTO retention_scores (
+                candidate_id, category, fitment_score, retention_score, retention_risk,
+                stability_score, personality_score, engagement_score, fitment_factor,
+                risk_flags, flag_count
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', zip(
+            candidate_ids,
+            categories,
+            fitment_scores,
+            retention['retention_score'].tolist(),
+            retention['retention_risk'].tolist(),
+            retention['stability'].tolist(),
+            retention['personality'].tolist(),
+            retention['engagement'].tolist(),
+            retention['fitment_factor'].tolist(),
+            retention['risk_flags'].tolist(),
+            retention['flag_count'].tolist()
+        ))
+    
+    def _insert_retention_score(self, cursor, candidate_id: str, category: str, fitment_score: float,
+                                retention_result: Dict[str, Any]) -> int:
+        """Insert a calculate_retention_risk result on an open cursor as the candidate's current score"""
+        components = retention_result['component_scores']
+        
+        cursor.execute(
+            'UPDATE retention_scores SET is_current = 0 WHERE candidate_id = ? AND is_current = 1',
+            (candidate_id,)
+        )
+        cursor.execute('''
+            INSERT INTO retention_scores (
+                candidate_id, category, fitment_score, retention_score, retention_risk,
+                stability_score, personality_score, engagement_score, fitment_factor,
+                risk_flags, flag_count
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            candidate_id, category, fitment_score, retention_result['retention_score'],
+            retention_result['retention_risk'], components['stability'], components['personality'],
+            components['engagement'], components['fitment_factor'],
+            risk_flag_mask(retention_result['risk_flags']), retention_result['flag_count']
+        ))
+        return cursor.lastrowid
+    
+    def _insert_personality_test(self, cursor, candidate_id: str) -> str:
+        """Insert a pending personality test on an open cursor, returns its token"""
+        test_token = self.generate_test_token(candidate_id)
+        
+        cursor.execute('''
+            INSERT INTO personality_tests (candidate_id, test_token, test_started_at)
+            VALUES (?, ?, ?)
+        ''', (candidate_id, test_token, datetime.now()))
+        return test_token
+    
     def save_candidate(self, candidate_data: Dict[str, Any]) -> str:
         """Save or update candidate information"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        email = candidate_data['email']
-        candidate_id = self.generate_candidate_id(email)
-        
-        # Convert lists to JSON strings
-        workshops_list = json.dumps(candidate_data.get('workshops_list', []))
-        trainings_list = json.dumps(candidate_data.get('trainings_list', []))
-        papers_list = json.dumps(candidate_data.get('research_papers_list', []))
-        patents_list = json.dumps(candidate_data.get('patents_list', []))
-        books_list = json.dumps(candidate_data.get('books_list', []))
-        achievements_list = json.dumps(candidate_data.get('achievements_list', []))
-        skills = json.dumps(candidate_data.get('skills', []))
-        projects = json.dumps(candidate_data.get('projects', []))
-        
         try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO candidates (
-                    candidate_id, name, email, phone, address, summary,
-                    ug_institute_name, ug_institute_code, pg_institute_name, pg_institute_code,
-                    phd_institute_name, phd_institute_code, ug_institute, pg_institute, phd_institute,
-                    longevity_years, average_experience, number_of_unique_designations,
-                    workshops, trainings, workshops_list, trainings_list,
-                    total_papers, total_patents, books, achievements,
-                    research_papers_list, patents_list, books_list, achievements_list,
-                    state_jk, skills, skills_count, projects, projects_count, best_fit_for,
-                    updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                candidate_id, candidate_data['name'], email, candidate_data.get('phone', ''),
-                candidate_data.get('address', ''), candidate_data.get('summary', ''),
-                candidate_data['ug_institute_name'], candidate_data.get('ug_institute_code', ''),
-                candidate_data['pg_institute_name'], candidate_data.get('pg_institute_code', ''),
-                candidate_data['phd_institute_name'], candidate_data.get('phd_institute_code', ''),
-                candidate_data['ug_institute'], candidate_data['pg_institute'], candidate_data['phd_institute'],
-                candidate_data['longevity_years'], candidate_data['average_experience'],
-                candidate_data['number_of_unique_designations'],
-                candidate_data['workshops'], candidate_data['trainings'],
-                workshops_list, trainings_list,
-                candidate_data['total_papers'], candidate_data['total_patents'],
-                candidate_data['books'], candidate_data['achievements'],
-                papers_list, patents_list, books_list, achievements_list,
-                candidate_data['state_jk'], skills, candidate_data.get('skills_count', 0),
-                projects, candidate_data.get('projects_count', 0), candidate_data.get('best_fit_for', ''),
-                datetime.now()
-            ))
+            candidate_id = self._insert_candidate(cursor, candidate_data)
             
             conn.commit()
             print(f"✅ Candidate {candidate_id} saved successfully")
@@ -243,12 +481,8 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
-            cursor.execute('''
-                INSERT INTO resumes (candidate_id, filename, file_content, file_type, extracted_text)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (candidate_id, filename, file_content, file_type, extracted_text))
-            
-            resume_id = cursor.lastrowid
+            resume_id = self._insert_resume(cursor, candidate_id, filename, file_content,
+                                            file_type, extracted_text)
             conn.commit()
             print(f"✅ Resume saved for candidate {candidate_id}")
             return resume_id
@@ -265,23 +499,7 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
-            traits = score_data.get('big5_trait_scores', {})
-            
-            cursor.execute('''
-                INSERT INTO fitment_scores (
-                    candidate_id, category, raw_dataset_score, fitment_score, big5_score,
-                    overall_fitment_score, openness_score, conscientiousness_score,
-                    extraversion_score, agreeableness_score, neuroticism_score
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                candidate_id, score_data['category'], score_data['raw_dataset_score'],
-                score_data['fitment_score'], score_data['big5_score'],
-                score_data['overall_fitment_score'],
-                traits.get('O', 0), traits.get('C', 0), traits.get('E', 0),
-                traits.get('A', 0), traits.get('N', 0)
-            ))
-            
-            score_id = cursor.lastrowid
+            score_id = self._insert_fitment_score(cursor, candidate_id, score_data)
             conn.commit()
             print(f"✅ Fitment score saved for candidate {candidate_id}")
             return score_id
@@ -292,18 +510,311 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def save_final_scores(self, candidate_id: str, fitment_result: Dict[str, Any],
+                          retention_result: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        Save the post-test fitment score and retention assessment in one transaction
+        
+        Returns:
+            (fitment score ID, retention score ID)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            score_id = self._insert_fitment_score(cursor, candidate_id, fitment_result)
+            retention_id = self._insert_retention_score(
+                cursor, candidate_id, fitment_result['category'], fitment_result['overall_fitment_score'],
+                retention_result
+            )
+            conn.commit()
+            print(f"✅ Final fitment and retention scores saved for candidate {candidate_id}")
+            return score_id, retention_id
+            
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error saving final scores: {str(e)}")
+        finally:
+            conn.close()
+    
+    def submit_application(self, candidate_data: Dict[str, Any], fitment_result: Dict[str, Any],
+                           filename: str = None, file_content: bytes = None,
+                           file_type: str = None, extracted_text: str = None) -> Tuple[str, str]:
+        """
+        Save a complete application as one unit of work
+        
+        Writes the candidate, the resume (if file_content is given), the initial
+        fitment score and a pending personality test in a single transaction, so
+        a submission is either fully stored or not at all.
+        
+        Returns:
+            (candidate_id, test_token)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            candidate_id = self._insert_candidate(cursor, candidate_data)
+            if file_content is not None:
+                self._insert_resume(cursor, candidate_id, filename, file_content,
+                                    file_type, extracted_text)
+            self._insert_fitment_score(cursor, candidate_id, fitment_result)
+            test_token = self._insert_personality_test(cursor, candidate_id)
+            
+            conn.commit()
+            print(f"✅ Application submitted for candidate {candidate_id}")
+            return candidate_id, test_token
+            
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error submitting application: {str(e)}")
+        finally:
+            conn.close()
+    
+    def save_applications_batch(self, applications: List[Dict[str, Any]]
+                                ) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+        """
+        Save many parsed applications in a single transaction
+        
+        Each application is a dict with 'candidate_data' and 'fitment_result', plus
+        optional resume fields 'filename', 'file_content', 'file_type', 'extracted_text'.
+        Every application is written under its own SAVEPOINT, so one bad row (a
+        constraint violation, an oversized field) is rolled back on its own and the
+        rest of the batch is still committed.
+        
+        Returns:
+            (candidate_ids, errors) in the same order as applications - the candidate ID
+            and None if saved, otherwise None and the error
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            candidate_ids, errors = [], []
+            cursor.execute('BEGIN')
+            for app in applications:
+                cursor.execute('SAVEPOINT application')
+                try:
+                    candidate_id = self._insert_candidate(cursor, app['candidate_data'])
+                    if app.get('file_content') is not None:
+                        self._insert_resume(cursor, candidate_id, app['filename'], app['file_content'],
+                                            app['file_type'], app.get('extracted_text', ''))
+                    self._insert_fitment_score(cursor, candidate_id, app['fitment_result'])
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO application')
+                    cursor.execute('RELEASE application')
+                    candidate_ids.append(None)
+                    errors.append(f"Error saving application: {str(e)}")
+                    continue
+                cursor.execute('RELEASE application')
+                candidate_ids.append(candidate_id)
+                errors.append(None)
+            
+            conn.commit()
+            saved = len(applications) - sum(error is not None for error in errors)
+            print(f"✅ Saved batch of {saved} applications")
+            return candidate_ids, errors
+            
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error saving application batch: {str(e)}")
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _insert_fitment_rows(cursor, candidate_ids: List[str], scores: pd.DataFrame):
+        """Insert one fitment score row per candidate from FitmentScorer.score_batch output"""
+        cursor.executemany('''
+            INSERT INTO fitment_scores (
+                candidate_id, category, raw_dataset_score, fitment_score, big5_score,
+                overall_fitment_score, openness_score, conscientiousness_score,
+                extraversion_score, agreeableness_score, neuroticism_score, rule_version
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', zip(
+            candidate_ids,
+            scores['category'].tolist(),
+            scores['raw_dataset_score'].tolist(),
+            scores['fitment_score'].tolist(),
+            scores['big5_score'].tolist(),
+            scores['overall_fitment_score'].tolist(),
+            scores['openness_score'].tolist(),
+            scores['conscientiousness_score'].tolist(),
+            scores['extraversion_score'].tolist(),
+            scores['agreeableness_score'].tolist(),
+            scores['neuroticism_score'].tolist(),
+            scores['rule_version'].tolist() if 'rule_version' in scores else [None] * len(candidate_ids)
+        ))
+    
+    def rescore_fitment_scores(self, score_batch: Callable[[pd.DataFrame], pd.DataFrame],
+                               chunk_size: int = 10000, completed_only: bool = False,
+                               on_chunk: Callable[[int], None] = None) -> int:
+        """
+        Recompute fitment scores for every candidate in bulk
+        
+        Streams candidates joined with their latest completed personality test in
+        chunks, scores each chunk with score_batch (e.g. FitmentScorer.score_batch)
+        and inserts the new fitment_scores rows with executemany - one transaction
+        per chunk. Candidates without a completed test get the neutral Big5
+        placeholder unless completed_only is set.
+        
+        Returns:
+            Number of candidates rescored
+        """
+        conn = self.get_connection()
+        read_cursor = conn.cursor()
+        write_cursor = conn.cursor()
+        
+        join = 'JOIN' if completed_only else 'LEFT JOIN'
+        candidate_columns = ', '.join(f'c.{col}' for col in SCORING_COLUMNS)
+        big5_columns = ', '.join(f'p.{col}' for col in BIG5_COLUMNS)
+        
+        try:
+            read_cursor.execute(f'''
+                SELECT c.candidate_id, {candidate_columns}, {big5_columns}
+                FROM candidates c
+                {join} (
+                    SELECT candidate_id, MAX(id) AS test_id
+                    FROM personality_tests
+                    WHERE test_status = 'completed'
+                    GROUP BY candidate_id
+                ) latest ON latest.candidate_id = c.candidate_id
+                LEFT JOIN personality_tests p ON p.id = latest.test_id
+                ORDER BY c.id
+            ''')
+            columns = [desc[0] for desc in read_cursor.description]
+            
+            total = 0
+            while True:
+                rows = read_cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                
+                chunk = pd.DataFrame.from_records(rows, columns=columns)
+                scores = score_batch(chunk)
+                
+                self._insert_fitment_rows(write_cursor, chunk['candidate_id'].tolist(), scores)
+                conn.commit()
+                
+                total += len(chunk)
+                if on_chunk:
+                    on_chunk(total)
+            
+            return total
+            
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error rescoring fitment scores: {str(e)}")
+        finally:
+            conn.close()
+    
+    def rescore_personality_tests(self, score_batch: Callable[..., pd.DataFrame], chunk_size: int = 10000,
+                                  on_chunk: Callable[[int], None] = None,
+                                  retention_batch: Callable[[pd.DataFrame], pd.DataFrame] = None,
+                                  scoring_version: str = SCORING_VERSION, redo: bool = False) -> int:
+        """
+        Recompute Big5 trait scores of every completed test from its stored answers
+        
+        Walks completed personality_tests in id order, one chunk at a time: each chunk
+        is read (with its candidates' scoring columns) and written back in its own
+        transaction, keyed on the last test id, so no read cursor stays open over the
+        rows being updated. Each chunk's test_answers are decoded into one answer
+        matrix (big5_scoring.answer_matrix) and scored with one matrix product; the
+        trait columns and scoring_version are updated in place, and each candidate's
+        latest test also gets a new fitment_scores row from score_batch(chunk, answers=...)
+        (FitmentScorer.score_batch) and, with retention_batch
+        (RetentionScorer.calculate_retention_risk_batch), a new current retention_scores
+        row. Tests with no stored answers are left as they are.
+        
+        Tests already at scoring_version are skipped unless redo is set, so a run that
+        was interrupted picks up where it stopped.
+        
+        Returns:
+            Number of tests rescored
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        candidate_columns = ', '.join(f'c.{col}' for col in SCORING_COLUMNS)
+        pending = '' if redo else 'AND p.scoring_version IS NOT :version'
+        chunk_sql = f'''
+            SELECT p.id AS test_id, p.candidate_id, p.test_answers,
+                   NOT EXISTS (
+                       SELECT 1 FROM personality_tests later
+                       WHERE later.candidate_id = p.candidate_id
+                         AND later.test_status = 'completed' AND later.id > p.id
+                   ) AS is_latest,
+                   {candidate_columns}
+            FROM personality_tests p
+            JOIN candidates c ON c.candidate_id = p.candidate_id
+            WHERE p.test_status = 'completed' AND p.id > :after {pending}
+            ORDER BY p.id
+            LIMIT :limit
+        '''
+        
+        try:
+            total = 0
+            after = 0
+            while True:
+                # Read and write the chunk under one write lock
+                conn.execute('BEGIN IMMEDIATE')
+                rows = cursor.execute(chunk_sql, {'after': after, 'version': scoring_version,
+                                                  'limit': chunk_size}).fetchall()
+                if not rows:
+                    conn.commit()
+                    break
+                columns = [desc[0] for desc in cursor.description]
+                after = rows[-1][columns.index('test_id')]
+                
+                # Raw strings, before pandas turns NULLs into NaN
+                answers = answer_matrix([row[columns.index('test_answers')] for row in rows])
+                chunk = pd.DataFrame.from_records(rows, columns=columns)
+                answered = answers.any(axis=1)
+                chunk, answers = chunk[answered], answers[answered]
+                traits = score_answers(answers)
+                
+                cursor.executemany(f'''
+                    UPDATE personality_tests
+                    SET {', '.join(f'{col} = ?' for col in BIG5_COLUMNS)}, scoring_version = ?
+                    WHERE id = ?
+                ''', zip(*(traits[:, TRAIT_POSITION[col]].tolist() for col in BIG5_COLUMNS),
+                          [scoring_version] * len(chunk), chunk['test_id'].tolist()))
+                
+                latest = (chunk['is_latest'] == 1).to_numpy()
+                if latest.any():
+                    candidates = chunk[latest]
+                    scores = score_batch(candidates, answers=answers[latest])
+                    candidate_ids = candidates['candidate_id'].tolist()
+                    self._insert_fitment_rows(cursor, candidate_ids, scores)
+                    if retention_batch is not None:
+                        retention_input = candidates.assign(
+                            **{col: traits[latest, TRAIT_POSITION[col]] for col in BIG5_COLUMNS},
+                            fitment_score=scores['overall_fitment_score'].to_numpy(),
+                            category=scores['category'].to_numpy()
+                        )
+                        self._insert_retention_rows(cursor, candidate_ids, scores['category'].tolist(),
+                                                    scores['overall_fitment_score'].tolist(),
+                                                    retention_batch(retention_input))
+                conn.commit()
+                
+                total += len(chunk)
+                if on_chunk:
+                    on_chunk(total)
+            
+            return total
+            
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error rescoring personality tests: {str(e)}")
+        finally:
+            conn.close()
+    
     def create_personality_test(self, candidate_id: str) -> str:
         """Create personality test entry and return token"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         try:
-            test_token = self.generate_test_token(candidate_id)
-            
-            cursor.execute('''
-                INSERT INTO personality_tests (candidate_id, test_token, test_started_at)
-                VALUES (?, ?, ?)
-            ''', (candidate_id, test_token, datetime.now()))
+            test_token = self._insert_personality_test(cursor, candidate_id)
             
             conn.commit()
             print(f"✅ Personality test created for candidate {candidate_id}")
@@ -331,7 +842,8 @@ class DatabaseManager:
                     neuroticism = ?,
                     test_completed_at = ?,
                     test_duration_seconds = ?,
-                    test_answers = ?
+                    test_answers = ?,
+                    scoring_version = ?
                 WHERE test_token = ?
             ''', (
                 test_results.get('openness', 0),
@@ -342,10 +854,12 @@ class DatabaseManager:
                 datetime.now(),
                 test_results.get('duration', 0),
                 json.dumps(test_results.get('answers', [])),
+                SCORING_VERSION,
                 test_token
             ))
             
             conn.commit()
+            self.token_resolver.invalidate(test_token)
             print(f"✅ Personality test results saved for token {test_token}")
             return True
             
@@ -356,40 +870,32 @@ class DatabaseManager:
             conn.close()
     
     def get_candidate_by_token(self, test_token: str) -> Optional[Dict[str, Any]]:
-        """Get candidate information by test token"""
+        """Get candidate information and the test's test_status by token (one indexed read, uncached)"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         try:
-            print(f"🔍 Searching for token: {test_token}")
-            # First, let's see what tokens we have
-            cursor.execute('SELECT test_token FROM personality_tests LIMIT 5')
-            existing_tokens = cursor.fetchall()
-            print(f"📋 Existing tokens in DB: {existing_tokens}")
-            
-            cursor.execute('''
-                SELECT c.* FROM candidates c
-                JOIN personality_tests p ON c.candidate_id = p.candidate_id
-                WHERE p.test_token = ?
-            ''', (test_token,))
+            cursor.execute(TOKEN_LOOKUP_SQL, (test_token,))
             
             row = cursor.fetchone()
-            if row:
-                columns = [desc[0] for desc in cursor.description]
-                result = dict(zip(columns, row))
-                print(f"✅ Found candidate: {result['name']}")
-                return result
-            else:
-                print(f"❌ No candidate found for token: {test_token}")
+            if row is None:
+                logger.warning("token not found", extra={'token_prefix': test_token[:8]})
                 return None
             
-        except Exception as e:
-            print(f"❌ Error in get_candidate_by_token: {str(e)}")
-            return None  
+            columns = [desc[0] for desc in cursor.description]
+            return dict(zip(columns, row))
+            
+        except Exception:
+            logger.exception("token lookup failed", extra={'token_prefix': test_token[:8]})
+            return None
       
         finally:
             conn.close()
     
+    def resolve_token(self, test_token: str) -> Optional[Dict[str, Any]]:
+        """Get candidate information by test token, served from the in-process cache when fresh"""
+        return self.token_resolver.resolve(test_token)
+    
     def log_email(self, candidate_id: str, email_type: str, recipient: str, 
                    subject: str, status: str, error: str = None):
         """Log email sending activity"""
@@ -409,6 +915,270 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def get_latest_fitment_score(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent fitment score for a candidate"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(LATEST_FITMENT_SCORE_SQL, (candidate_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            columns = [desc[0] for desc in cursor.description]
+            return dict(zip(columns, row))
+            
+        finally:
+            conn.close()
+    
+    def get_latest_retention_score(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        """Get the current retention score for a candidate (risk_flags is a RISK_FLAGS bitmask)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(LATEST_RETENTION_SCORE_SQL, (candidate_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            columns = [desc[0] for desc in cursor.description]
+            return dict(zip(columns, row))
+            
+        finally:
+            conn.close()
+    
+    def get_retention_summary(self) -> List[Dict[str, Any]]:
+        """
+        Candidates per retention risk level and category, from the trigger-maintained
+        retention_summary table - one row per group, no rescoring or aggregation
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                SELECT retention_risk, category, candidates,
+                       total_retention_score / candidates AS average_retention_score
+                FROM retention_summary
+                WHERE candidates > 0
+                ORDER BY retention_risk, category
+            ''')
+            rows = cursor.fetchall()
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in rows]
+            
+        finally:
+            conn.close()
+    
+    def get_email_logs(self, candidate_id: str) -> List[Dict[str, Any]]:
+        """Get all emails sent to a candidate, newest first"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(EMAIL_LOGS_SQL, (candidate_id,))
+            rows = cursor.fetchall()
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in rows]
+            
+        finally:
+            conn.close()
+    
+    def explain_query_plan(self, sql: str, params: tuple = ()) -> List[str]:
+        """Return the EXPLAIN QUERY PLAN detail lines for a query"""
+        conn = self.get_connection()
+        
+        try:
+            return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()]
+        finally:
+            conn.close()
+    
+    def check_query_plans(self) -> Dict[str, List[str]]:
+        """
+        Verify every KEY_QUERIES lookup is served by an index
+        
+        Raises if any plan contains a full table scan; returns the plans otherwise.
+        """
+        plans = {}
+        problems = []
+        
+        for name, (sql, params) in KEY_QUERIES.items():
+            plan = self.explain_query_plan(sql, params)
+            plans[name] = plan
+            # "SCAN table" is a full scan; "SCAN table USING INDEX ..." is an ordered index walk
+            if any(step.startswith('SCAN') and 'USING' not in step for step in plan):
+                problems.append(f"{name}: {'; '.join(plan)}")
+        
+        if problems:
+            raise AssertionError("Full table scans in key queries:\n" + "\n".join(problems))
+        
+        return plans
+    
+    def enqueue_email(self, candidate_id: str, email_type: str, recipient: str,
+                      subject: str, body: str, text_body: Optional[str] = None) -> int:
+        """Queue a rendered email (HTML body plus optional plain-text part) for the outbox worker, returns outbox ID"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                INSERT INTO email_outbox (
+                    candidate_id, email_type, recipient_email, subject, body, text_body, next_attempt_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (candidate_id, email_type, recipient, subject, body, text_body, time.time()))
+            
+            outbox_id = cursor.lastrowid
+            conn.commit()
+            return outbox_id
+            
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error queueing email: {str(e)}")
+        finally:
+            conn.close()
+    
+    def claim_outbox_batch(self, limit: int = 20, lease_seconds: float = 300) -> List[Dict[str, Any]]:
+        """
+        Claim due outbox emails for delivery
+        
+        Claimed rows move to 'sending' with a lease; if the worker dies mid-send
+        they become due again once the lease expires.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        now = time.time()
+        
+        try:
+            # IMMEDIATE takes the write lock up front so two workers never claim the same rows
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                SELECT * FROM email_outbox
+                WHERE status IN ('pending', 'sending') AND next_attempt_at <= ?
+                ORDER BY next_attempt_at
+                LIMIT ?
+            ''', (now, limit))
+            columns = [desc[0] for desc in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            
+            cursor.executemany('''
+                UPDATE email_outbox SET status = 'sending', next_attempt_at = ? WHERE id = ?
+            ''', [(now + lease_seconds, row['id']) for row in rows])
+            conn.commit()
+            return rows
+            
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error claiming outbox emails: {str(e)}")
+        finally:
+            conn.close()
+    
+    def mark_outbox_sent(self, outbox_id: int):
+        """Mark an outbox email delivered and record it in email_logs"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                UPDATE email_outbox
+                SET status = 'sent', attempts = attempts + 1, sent_at = ?, last_error = NULL
+                WHERE id = ?
+            ''', (datetime.now(), outbox_id))
+            cursor.execute('''
+                INSERT INTO email_logs (candidate_id, email_type, recipient_email, subject, status)
+                SELECT candidate_id, email_type, recipient_email, subject, 'sent'
+                FROM email_outbox WHERE id = ?
+            ''', (outbox_id,))
+            conn.commit()
+            
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error marking email sent: {str(e)}")
+        finally:
+            conn.close()
+    
+    def mark_outbox_failed(self, outbox_id: int, error: str, retry_at: Optional[float]):
+        """
+        Record a failed delivery attempt
+        
+        With retry_at the email is rescheduled; without it the email is given up
+        on and the failure is recorded in email_logs.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            if retry_at is not None:
+                cursor.execute('''
+                    UPDATE email_outbox
+                    SET status = 'pending', attempts = attempts + 1, next_attempt_at = ?, last_error = ?
+                    WHERE id = ?
+                ''', (retry_at, error, outbox_id))
+            else:
+                cursor.execute('''
+                    UPDATE email_outbox
+                    SET status = 'failed', attempts = attempts + 1, last_error = ?
+                    WHERE id = ?
+                ''', (error, outbox_id))
+                cursor.execute('''
+                    INSERT INTO email_logs (candidate_id, email_type, recipient_email, subject, status, error_message)
+                    SELECT candidate_id, email_type, recipient_email, subject, 'failed', ?
+                    FROM email_outbox WHERE id = ?
+                ''', (error, outbox_id))
+            conn.commit()
+            
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error marking email failed: {str(e)}")
+        finally:
+            conn.close()
+    
+    def get_resume(self, resume_id: int) -> Optional[Dict[str, Any]]:
+        """Get resume metadata (without file bytes)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('SELECT * FROM resumes WHERE id = ?', (resume_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            columns = [desc[0] for desc in cursor.description]
+            return dict(zip(columns, row))
+            
+        finally:
+            conn.close()
+    
+    def open_resume_file(self, resume_id: int):
+        """Open a resume's file for streaming reads, or None if not found"""
+        resume = self.get_resume(resume_id)
+        if resume is None:
+            return None
+        return self.blob_store.open(resume['content_hash'])
+    
+    def collect_orphan_blobs(self, min_age_seconds: float = 3600) -> int:
+        """
+        Delete stored files no resume row references, returns how many were deleted
+        
+        Files are stored before their resume row is committed, so a save that rolls
+        back leaves its file behind. Blobs stored (or re-stored) within min_age_seconds
+        are kept - their row may still be on its way.
+        """
+        conn = self.get_connection()
+        try:
+            referenced = {content_hash for (content_hash,) in conn.execute(
+                'SELECT DISTINCT content_hash FROM resumes WHERE content_hash IS NOT NULL'
+            )}
+        finally:
+            conn.close()
+        
+        cutoff = time.time() - min_age_seconds
+        deleted = 0
+        for content_hash in list(self.blob_store.iter_hashes()):
+            if content_hash not in referenced and self.blob_store.delete_if_stored_before(content_hash, cutoff):
+                deleted += 1
+        return deleted
+    
     def get_all_candidates(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get all candidates"""
         conn = self.get_connection()
@@ -0,0 +1,95 @@
+"""
+Background delivery for the email outbox
+The request path only queues rendered emails (DatabaseManager.enqueue_email);
+OutboxWorker sends them over SMTP, retrying failures with exponential backoff
+"""
+
+import logging
+import random
+import time
+from typing import Dict, Optional
+
+from utils.database_manager import DatabaseManager
+from utils.email_sender import EmailSender
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxWorker:
+    """Drains email_outbox and records results in email_logs"""
+
+    def __init__(self, db: DatabaseManager, sender: EmailSender, batch_size: int = 20,
+                 max_attempts: int = 6, base_delay: float = 30.0, max_delay: float = 3600.0,
+                 lease_seconds: float = 300.0):
+        """
+        Args:
+            max_attempts: Deliveries tried before an email is marked failed
+            base_delay: Delay before the first retry; doubles on each further attempt
+            max_delay: Upper bound on the retry delay
+            lease_seconds: How long a claimed email is reserved before another worker may retry it
+        """
+        self.db = db
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+
+    def backoff_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter for the retry after `attempts` failures"""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def retry_at(self, attempts: int) -> Optional[float]:
+        """When to retry after `attempts` failures, or None to give up"""
+        if attempts >= self.max_attempts:
+            return None
+        return time.time() + self.backoff_delay(attempts)
+
+    def run_once(self) -> Dict[str, int]:
+        """Deliver one batch of due emails, returns counts by outcome"""
+        counts = {'sent': 0, 'retried': 0, 'failed': 0}
+
+        emails = self.db.claim_outbox_batch(self.batch_size, self.lease_seconds)
+        if not emails:
+            return counts
+
+        # The whole batch goes out over one SMTP session
+        errors = self.sender.send_many([
+            (email['recipient_email'], email['subject'], email['body'], email['text_body']) for email in emails
+        ])
+
+        # Record every outcome even if one update fails (e.g. database is locked) - an
+        # unrecorded email stays leased and is retried once the lease expires
+        for email, error in zip(emails, errors):
+            try:
+                if error is None:
+                    self.db.mark_outbox_sent(email['id'])
+                    counts['sent'] += 1
+                    continue
+
+                retry_at = self.retry_at(email['attempts'] + 1)
+                self.db.mark_outbox_failed(email['id'], error, retry_at)
+                counts['retried' if retry_at is not None else 'failed'] += 1
+            except Exception:
+                logger.exception("could not record outbox result", extra={'outbox_id': email['id'],
+                                                                          'delivered': error is None})
+
+        return counts
+
+    def run_forever(self, poll_interval: float = 5.0):
+        """Poll the outbox until interrupted; drains back-to-back while batches are full"""
+        while True:
+            try:
+                counts = self.run_once()
+            except Exception:
+                # A transient database or SMTP error must not stop the worker
+                logger.exception("outbox poll failed, retrying in %ss", poll_interval)
+                time.sleep(poll_interval)
+                continue
+            if any(counts.values()):
+                logger.info("outbox: %d sent, %d retrying, %d failed",
+                            counts['sent'], counts['retried'], counts['failed'])
+            if sum(counts.values()) < self.batch_size:
+                time.sleep(poll_interval)
@@ -0,0 +1,601 @@
+"""
+Precompiled email templates
+Templates are written with $field placeholders and compiled once at import: CSS
+classes are inlined into style attributes (mail clients ignore <style> blocks)
+and the markup is pre-split around the placeholders, so a send only joins the
+static chunks with the per-candidate fields. Every email also has a plain-text alternative.
+"""
+
+import html
+import re
+from typing import Dict, Any, List, NamedTuple, Tuple
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    html: str
+    text: str
+
+
+STYLES = {
+    'body': 'font-family: Arial, sans-serif; line-height: 1.6; color: #333;',
+    'container': 'max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 10px;',
+    'container-wide': 'max-width: 700px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 10px;',
+    'brand': 'color: #667eea; text-align: center;',
+    'heading': 'color: #667eea;',
+    'divider': 'border: none; border-top: 1px solid #ddd; margin: 20px 0;',
+    'divider-accent': 'border: none; border-top: 2px solid #667eea; margin: 20px 0;',
+    'muted': 'color: #666;',
+    'muted-small': 'color: #666; font-size: 13px;',
+    'muted-note': 'color: #666; font-size: 14px;',
+    'footer': 'color: #888; font-size: 12px; text-align: center;',
+    'button-wrap': 'text-align: center; margin: 30px 0;',
+    'button': 'background-color: #667eea; color: white; padding: 15px 40px; text-decoration: none; '
+              'border-radius: 10px; display: inline-block; font-weight: 600; font-size: 16px;',
+    'callout': 'background-color: #f0f4ff; padding: 15px; border-radius: 8px; border-left: 4px solid #667eea;',
+    'callout-next': 'background-color: #EEF2FF; padding: 20px; border-radius: 10px; border-left: 4px solid #667eea;',
+    'callout-info': 'background-color: #DBEAFE; padding: 15px; border-radius: 10px;',
+    'callout-warning': 'background-color: #FEF3C7; padding: 15px; border-radius: 8px; margin: 15px 0;',
+    'callout-recommend': 'background-color: #EEF2FF; padding: 20px; border-radius: 10px; margin: 20px 0;',
+    'link-box': 'background-color: #f5f5f5; padding: 12px; border-radius: 5px; font-family: monospace; '
+                'word-break: break-all; font-size: 13px;',
+    'panel': 'background-color: #f9fafb; padding: 20px; border-radius: 10px; margin: 15px 0;',
+    'panel-tight': 'background-color: #f9fafb; padding: 15px; border-radius: 10px; margin: 15px 0;',
+    'hero': 'background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; border-radius: 15px; '
+            'text-align: center; color: white; margin: 20px 0;',
+    'table': 'width: 100%; border-collapse: collapse;',
+    'table-spaced': 'width: 100%; border-collapse: collapse; margin: 15px 0;',
+    'row': 'border-bottom: 1px solid #e5e7eb;',
+    'cell': 'padding: 10px 0;',
+    'cell-right': 'text-align: right; padding: 10px 0;',
+    'cell-note': 'padding: 10px 0; color: #666; font-size: 13px;',
+    'cell-note-right': 'text-align: right; padding: 10px 0; color: #666; font-size: 13px;',
+    'cell-padded': 'padding: 10px;',
+    'cell-padded-right': 'text-align: right; padding: 10px;',
+    'trait': 'margin: 10px 0;',
+    'trait-header': 'display: flex; justify-content: space-between; margin-bottom: 5px;',
+    'bar-track': 'background: #e5e7eb; height: 8px; border-radius: 4px;',
+    'list-item': 'margin: 5px 0;',
+    'list-flags': 'margin: 10px 0; color: #92400E;',
+    'list-recommend': 'margin: 0; color: #4338CA;',
+}
+
+_CLASS_ATTRIBUTE = re.compile(r'class="([^"]+)"')
+_PLACEHOLDER = re.compile(r'\$(?:(\w+)|\{(\w+)\})')
+
+
+def inline_css(markup: str, styles: Dict[str, str] = STYLES) -> str:
+    """Replace class="a b" attributes with the equivalent inline style attribute"""
+    def replace(match):
+        return 'style="{}"'.format(' '.join(styles[name] for name in match.group(1).split()))
+    return _CLASS_ATTRIBUTE.sub(replace, markup)
+
+
+class CompiledTemplate:
+    """
+    Template pre-split into literal chunks and field names
+
+    Rendering is a single join of the chunks with the field values - no parsing
+    or scanning of the (mostly static) markup per message.
+    """
+
+    def __init__(self, source: str):
+        pieces = _PLACEHOLDER.split(source)
+        # Literal chunks at even positions, field values fill the odd slots
+        self.parts = [piece if i % 3 == 0 else '' for i, piece in enumerate(pieces) if i % 3 != 2]
+        self.slots = [(2 * i + 1, name or braced)
+                      for i, (name, braced) in enumerate(zip(pieces[1::3], pieces[2::3]))]
+
+    def render(self, values: Dict[str, Any]) -> str:
+        parts = self.parts.copy()
+        for index, name in self.slots:
+            parts[index] = str(values[name])
+        return ''.join(parts)
+
+
+class EmailTemplate:
+    """Subject, HTML and plain-text templates compiled once and rendered by substitution"""
+
+    def __init__(self, subject: str, html_body: str, text_body: str):
+        self.subject = CompiledTemplate(subject)
+        self.html = CompiledTemplate(inline_css(html_body))
+        self.text = CompiledTemplate(text_body)
+
+    def render(self, html_fields: Dict[str, Any], text_fields: Dict[str, Any]) -> RenderedEmail:
+        return RenderedEmail(
+            self.subject.render(text_fields),
+            self.html.render(html_fields),
+            self.text.render(text_fields)
+        )
+
+
+def compile_fragment(markup: str) -> CompiledTemplate:
+    """Compile a repeated HTML fragment (table row, list item) with inlined CSS"""
+    return CompiledTemplate(inline_css(markup))
+
+
+# =========================
+# Shared presentation helpers
+# =========================
+
+# (minimum score, colour, label, emoji) - first matching band wins
+FITMENT_BANDS = [
+    (80, '#10B981', 'Excellent Fit! 🌟', '🏆'),
+    (60, '#F59E0B', 'Good Fit! 👍', '✨'),
+    (0, '#6B7280', 'Developing Profile', '📈'),
+]
+
+# Colour of the results banner uses softer thresholds than the label
+FITMENT_BANNER_COLORS = [(70, '#10B981'), (50, '#F59E0B'), (0, '#6B7280')]
+
+RISK_COLORS = {'Low': '#10B981', 'Medium': '#F59E0B'}
+HIGH_RISK_COLOR = '#EF4444'
+
+# (key in big5_trait_scores, key in big5 scores, label)
+TRAIT_LABELS = [
+    ('O', 'openness', '🎨 Openness'),
+    ('C', 'conscientiousness', '📋 Conscientiousness'),
+    ('E', 'extraversion', '🎤 Extraversion'),
+    ('A', 'agreeableness', '🤝 Agreeableness'),
+    ('N', 'neuroticism', '😌 Emotional Stability'),
+]
+
+
+def fitment_band(score: float) -> Tuple[str, str, str]:
+    """(colour, label, emoji) for a fitment score"""
+    for minimum, color, label, emoji in FITMENT_BANDS:
+        if score >= minimum:
+            return color, label, emoji
+    return FITMENT_BANDS[-1][1:]
+
+
+def fitment_banner_color(score: float) -> str:
+    for minimum, color in FITMENT_BANNER_COLORS:
+        if score >= minimum:
+            return color
+    return FITMENT_BANNER_COLORS[-1][1]
+
+
+def risk_color(risk_level: str) -> str:
+    return RISK_COLORS.get(risk_level, HIGH_RISK_COLOR)
+
+
+def _escape_all(fields: Dict[str, Any]) -> Dict[str, str]:
+    return {key: html.escape(str(value)) for key, value in fields.items()}
+
+
+# =========================
+# Confirmation email
+# =========================
+
+CONFIRMATION = EmailTemplate(
+    "Application Received - Complete Your Personality Test | people.ai",
+    """
+        <html>
+        <body class="body">
+            <div class="container">
+                <h2 class="brand">people.ai</h2>
+                <h3>Hello $candidate_name,</h3>
+
+                <p>Thank you for submitting your application! We have successfully received and processed your resume.</p>
+
+                <p><strong>✅ Application Status:</strong> Preliminary review complete</p>
+
+                <hr class="divider">
+
+                <h3 class="heading">🧠 Next Step: Complete Your Personality Assessment</h3>
+
+                <p>To finalize your application, please complete our Big Five personality test:</p>
+
+                <ul style="color: #666; margin: 15px 0;">
+                    <li>📝 50 questions about your personality traits</li>
+                    <li>⏱️ Takes approximately 10 minutes</li>
+                    <li>🎯 No right or wrong answers - just be honest</li>
+                    <li>📊 Your final fitment score will be calculated automatically</li>
+                </ul>
+
+                <div class="button-wrap">
+                    <a href="$test_link" class="button">
+                        🧠 Start Personality Test
+                    </a>
+                </div>
+
+                <p class="callout">
+                    <strong>💡 Why This Test?</strong><br>
+                    The Big Five personality assessment helps us understand your work style, communication preferences,
+                    and how you might fit within our team culture. This ensures a better match for both you and us!
+                </p>
+
+                <hr class="divider">
+
+                <p><strong>🔗 Your Personal Test Link:</strong></p>
+                <p class="link-box">
+                    $test_link
+                </p>
+                <p class="muted-small">
+                    💾 Save this link - you can complete the test anytime within the next 7 days.
+                </p>
+
+                <hr class="divider">
+
+                <h4 class="heading">What Happens After?</h4>
+                <ol class="muted">
+                    <li>Complete the personality test</li>
+                    <li>Your final fitment score will be calculated</li>
+                    <li>Receive detailed results via email</li>
+                    <li>Our team reviews your complete profile</li>
+                    <li>We contact you if there's a match (5-7 business days)</li>
+                </ol>
+
+                <hr class="divider">
+
+                <p class="footer">
+                    This is an automated email from people.ai recruitment system.<br>
+                    Need help? Reply to this email and we'll assist you.<br><br>
+                    © 2025 people.ai - AI-Powered Recruitment
+                </p>
+            </div>
+        </body>
+        </html>
+    """,
+    """Hello $candidate_name,
+
+Thank you for submitting your application! We have successfully received and processed your resume.
+
+Application Status: Preliminary review complete
+
+NEXT STEP: COMPLETE YOUR PERSONALITY ASSESSMENT
+- 50 questions about your personality traits
+- Takes approximately 10 minutes
+- No right or wrong answers - just be honest
+- Your final fitment score will be calculated automatically
+
+Start the test here (valid for 7 days):
+$test_link
+
+What happens after?
+1. Complete the personality test
+2. Your final fitment score will be calculated
+3. Receive detailed results via email
+4. Our team reviews your complete profile
+5. We contact you if there's a match (5-7 business days)
+
+--
+people.ai - AI-Powered Recruitment
+Need help? Reply to this email and we'll assist you.
+"""
+)
+
+
+def render_confirmation(candidate_name: str, test_link: str) -> RenderedEmail:
+    fields = {'candidate_name': candidate_name, 'test_link': test_link}
+    return CONFIRMATION.render(_escape_all(fields), fields)
+
+
+# =========================
+# Fitment score email
+# =========================
+
+FITMENT_TRAIT_BAR = compile_fragment("""
+                    <div class="trait">
+                        <div class="trait-header">
+                            <span><strong>$label</strong></span>
+                            <span><strong>$percent%</strong></span>
+                        </div>
+                        <div class="bar-track">
+                            <div style="background: #667eea; width: $percent%; height: 8px; border-radius: 4px;"></div>
+                        </div>
+                    </div>
+""")
+
+FITMENT_SCORE = EmailTemplate(
+    "Your Final Fitment Score: $score/100 | people.ai",
+    """
+        <html>
+        <body class="body">
+            <div class="container">
+                <h2 class="brand">people.ai</h2>
+                <h3>Hello $candidate_name,</h3>
+
+                <p>Thank you for completing your personality assessment! 🎉</p>
+                <p>We've calculated your final fitment score based on your profile and personality traits.</p>
+
+                <hr class="divider-accent">
+
+                <div class="hero">
+                    <h2 style="margin: 0; opacity: 0.9; font-size: 18px;">Your Final Fitment Score</h2>
+                    <h1 style="font-size: 56px; margin: 15px 0; font-weight: 800;">$score_emoji $score/100</h1>
+                    <h3 style="margin: 0; font-size: 20px;">$score_label</h3>
+                    <p style="margin-top: 10px; opacity: 0.9;">Category: <strong>$category</strong></p>
+                </div>
+
+                <hr class="divider">
+
+                <h3 class="heading">📊 Score Breakdown</h3>
+
+                <div class="panel">
+                    <table class="table">
+                        <tr class="row">
+                            <td class="cell"><strong>Dataset Score:</strong></td>
+                            <td class="cell-right"><strong>$dataset_score/100</strong></td>
+                        </tr>
+                        <tr class="row">
+                            <td class="cell-note">
+                                Based on experience, education, research & achievements
+                            </td>
+                            <td class="cell-note-right">
+                                $dataset_contribution
+                            </td>
+                        </tr>
+                        <tr class="row">
+                            <td class="cell"><strong>Personality Score:</strong></td>
+                            <td class="cell-right"><strong>$big5_score/100</strong></td>
+                        </tr>
+                        <tr>
+                            <td class="cell-note">
+                                Based on Big Five personality traits
+                            </td>
+                            <td class="cell-note-right">
+                                $big5_contribution
+                            </td>
+                        </tr>
+                    </table>
+                </div>
+
+                <hr class="divider">
+
+                <h3 class="heading">🧬 Your Personality Profile</h3>
+                <p class="muted-note">Based on the Big Five personality model:</p>
+
+                <div class="panel-tight">$trait_bars</div>
+
+                <hr class="divider">
+
+                <div class="callout-next">
+                    <h4 style="margin: 0 0 10px 0; color: #667eea;">📬 What's Next?</h4>
+                    <p class="list-item">
+                        ✅ Your complete application has been received<br>
+                        📊 Our team will review your fitment score and profile<br>
+                        📞 If your profile matches our requirements, we'll contact you within <strong>5-7 business days</strong><br>
+                        💼 We'll discuss potential opportunities and next steps
+                    </p>
+                </div>
+
+                <p style="margin-top: 20px;">Thank you for your interest in joining our team. We appreciate the time you took to complete your application!</p>
+
+                <hr class="divider">
+
+                <p class="footer">
+                    This is an automated email from people.ai recruitment system.<br>
+                    Questions? Reply to this email and we'll be happy to help.<br><br>
+                    © 2025 people.ai - AI-Powered Recruitment
+                </p>
+            </div>
+        </body>
+        </html>
+    """,
+    """Hello $candidate_name,
+
+Thank you for completing your personality assessment!
+
+YOUR FINAL FITMENT SCORE: $score/100 - $score_label
+Category: $category
+
+Score breakdown
+- Dataset score: $dataset_score/100 ($dataset_contribution)
+- Personality score: $big5_score/100 ($big5_contribution)
+
+Your personality profile
+$trait_lines
+
+What's next?
+Our team will review your fitment score and profile. If your profile matches our
+requirements, we'll contact you within 5-7 business days.
+
+--
+people.ai - AI-Powered Recruitment
+Questions? Reply to this email and we'll be happy to help.
+"""
+)
+
+
+def render_fitment_score(candidate_name: str, score_data: Dict[str, Any]) -> RenderedEmail:
+    score = score_data['overall_fitment_score']
+    _, score_label, score_emoji = fitment_band(score)
+    traits = score_data['big5_trait_scores']
+    percents = [(label, f"{traits[key] * 100:.0f}") for key, _, label in TRAIT_LABELS]
+
+    fields = {
+        'candidate_name': candidate_name,
+        'score': f"{score:.0f}",
+        'score_label': score_label,
+        'score_emoji': score_emoji,
+        'category': score_data['category'],
+        'dataset_score': f"{score_data['fitment_score']:.2f}",
+        'dataset_contribution': score_data['breakdown']['dataset_contribution'],
+        'big5_score': f"{score_data['big5_score']:.2f}",
+        'big5_contribution': score_data['breakdown']['big5_contribution'],
+    }
+    html_fields = _escape_all(fields)
+    html_fields['trait_bars'] = ''.join(
+        FITMENT_TRAIT_BAR.render({'label': label, 'percent': percent}) for label, percent in percents
+    )
+    fields['trait_lines'] = '\n'.join(f"- {label.split(' ', 1)[1]}: {percent}%" for label, percent in percents)
+    return FITMENT_SCORE.render(html_fields, fields)
+
+
+# =========================
+# Comprehensive results email
+# =========================
+
+RESULTS_TRAIT_ROW = compile_fragment("""
+                    <tr class="row">
+                    <td class="cell-padded">$label</td>
+                    <td class="cell-padded-right"><strong>$score/40</strong></td>
+                    </tr>""")
+
+RESULTS_TRAIT_ROW_LAST = compile_fragment("""
+                    <tr>
+                    <td class="cell-padded">$label</td>
+                    <td class="cell-padded-right"><strong>$score/40</strong></td>
+                    </tr>""")
+
+RESULTS_FLAG = CompiledTemplate('<li>$flag</li>')
+RESULTS_INSIGHT = compile_fragment('<li class="list-item">$insight</li>')
+
+RESULTS_FLAGS_BLOCK = compile_fragment("""
+                <div class="callout-warning">
+                    <strong>⚠️ Risk Flags Identified:</strong>
+                    <ul class="list-flags">
+                    $flags
+                    </ul>
+                </div>
+""")
+
+COMPREHENSIVE_RESULTS = EmailTemplate(
+    "Complete Assessment Results: Fitment $fitment_score/100 | $retention_risk Retention Risk | people.ai",
+    """
+        <html>
+        <body class="body">
+            <div class="container-wide">
+                <h2 class="brand">people.ai</h2>
+                <h3>Complete Assessment Results for $candidate_name</h3>
+
+                <p>Thank you for completing your comprehensive assessment! Below is your complete profile analysis.</p>
+
+                <hr style="border: none; border-top: 2px solid #667eea; margin: 25px 0;">
+
+                <!-- FITMENT SCORE -->
+                <div style="background: linear-gradient(135deg, $fitment_color 0%, ${fitment_color}dd 100%); padding: 25px; border-radius: 15px; text-align: center; color: white; margin: 20px 0;">
+                    <h2 style="margin: 0; opacity: 0.9;">Final Fitment Score</h2>
+                    <h1 style="font-size: 48px; margin: 15px 0;">$fitment_score/100</h1>
+                    <h3>$category</h3>
+                </div>
+
+                <!-- BIG FIVE PERSONALITY -->
+                <h3 style="color: #667eea; margin-top: 30px;">🧬 Personality Profile (Big Five)</h3>
+                <table class="table-spaced">$trait_rows
+                </table>
+
+                <!-- RETENTION ANALYSIS -->
+                <h3 style="color: #667eea; margin-top: 30px;">📊 Retention Risk Analysis</h3>
+                <div style="background-color: #f9fafb; padding: 20px; border-radius: 10px; border-left: 4px solid $retention_color;">
+                    <p class="list-item"><strong>Retention Score:</strong> $retention_score/100</p>
+                    <p class="list-item"><strong>Risk Level:</strong> <span style="color: $retention_color; font-weight: bold;">$retention_risk Risk</span></p>
+                    <p class="list-item"><strong>Risk Flags:</strong> $flag_count</p>
+                </div>
+
+                <div style="margin: 15px 0;">
+                    <strong>Component Scores:</strong>
+                    <ul class="muted">
+                        <li>Job Stability: $stability/100</li>
+                        <li>Personality Fit: $personality/100</li>
+                        <li>Professional Engagement: $engagement/100</li>
+                        <li>Fitment Factor: $fitment_factor/100</li>
+                    </ul>
+                </div>
+            $flags_block
+                <div class="callout-recommend">
+                    <h4 style="margin: 0 0 10px 0;">📝 Key Recommendations:</h4>
+                    <ul class="list-recommend">
+                    $insights
+                    </ul>
+                </div>
+
+                <hr style="border: none; border-top: 1px solid #ddd; margin: 25px 0;">
+
+                <div class="callout-info">
+                    <p style="margin: 0;"><strong>📬 What's Next?</strong></p>
+                    <p style="margin: 10px 0 0 0;">
+                    Our recruitment team will review your complete profile. If your qualifications match our current requirements, we'll contact you within 5-7 business days to discuss potential opportunities.
+                    </p>
+                </div>
+
+                <p style="margin-top: 20px;">Thank you for your interest in joining our team. We appreciate the time and effort you invested in this comprehensive assessment!</p>
+
+                <hr class="divider">
+
+                <p class="footer">
+                © 2025 people.ai - AI-Powered Recruitment<br>
+                Questions? Reply to this email for assistance.
+                </p>
+            </div>
+        </body>
+        </html>
+    """,
+    """Complete Assessment Results for $candidate_name
+
+FINAL FITMENT SCORE: $fitment_score/100 ($category)
+
+Personality profile (Big Five)
+$trait_lines
+
+Retention risk analysis
+- Retention score: $retention_score/100
+- Risk level: $retention_risk
+- Risk flags: $flag_count
+
+Component scores
+- Job Stability: $stability/100
+- Personality Fit: $personality/100
+- Professional Engagement: $engagement/100
+- Fitment Factor: $fitment_factor/100
+$flag_lines
+Key recommendations
+$insight_lines
+
+What's next?
+Our recruitment team will review your complete profile. If your qualifications match
+our current requirements, we'll contact you within 5-7 business days.
+
+--
+people.ai - AI-Powered Recruitment
+Questions? Reply to this email for assistance.
+"""
+)
+
+
+def render_comprehensive_results(candidate_name: str, fitment_data: Dict[str, Any],
+                                 big5_scores: Dict[str, int], retention_data: Dict[str, Any]) -> RenderedEmail:
+    fitment_score = fitment_data['overall_fitment_score']
+    retention_risk = retention_data['retention_risk']
+    components = retention_data['component_scores']
+    flags: List[str] = retention_data['risk_flags']
+    insights: List[str] = retention_data['insights'][:5]
+
+    # Emotional stability is reported as the inverse of neuroticism
+    traits = [
+        (label, 40 - big5_scores[name] if key == 'N' else big5_scores[name])
+        for key, name, label in TRAIT_LABELS
+    ]
+
+    fields = {
+        'candidate_name': candidate_name,
+        'fitment_score': f"{fitment_score:.0f}",
+        'category': fitment_data['category'],
+        'retention_score': retention_data['retention_score'],
+        'retention_risk': retention_risk,
+        'flag_count': retention_data['flag_count'],
+        'stability': components['stability'],
+        'personality': components['personality'],
+        'engagement': components['engagement'],
+        'fitment_factor': components['fitment_factor'],
+    }
+    html_fields = _escape_all(fields)
+    html_fields['fitment_color'] = fitment_banner_color(fitment_score)
+    html_fields['retention_color'] = risk_color(retention_risk)
+    html_fields['trait_rows'] = ''.join(
+        (RESULTS_TRAIT_ROW if i < len(traits) - 1 else RESULTS_TRAIT_ROW_LAST).render({'label': label, 'score': score})
+        for i, (label, score) in enumerate(traits)
+    )
+    html_fields['flags_block'] = RESULTS_FLAGS_BLOCK.render({
+        'flags': ''.join(RESULTS_FLAG.render({'flag': html.escape(flag)}) for flag in flags)
+    }) if flags else ''
+    html_fields['insights'] = ''.join(RESULTS_INSIGHT.render({'insight': html.escape(insight)}) for insight in insights)
+
+    fields['trait_lines'] = '\n'.join(f"- {label.split(' ', 1)[1]}: {score}/40" for label, score in traits)
+    fields['flag_lines'] = (
+        '\nRisk flags identified\n' + '\n'.join(f"- {flag}" for flag in flags) + '\n'
+    ) if flags else ''
+    fields['insight_lines'] = '\n'.join(f"- {insight}" for insight in insights)
+    return COMPREHENSIVE_RESULTS.render(html_fields, fields)
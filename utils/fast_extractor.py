@@ -0,0 +1,220 @@
+"""
+Deterministic local extraction of structured resume fields
+Pulls the fields that rules can decide reliably - contact details, the J&K flag,
+premier-institute flags and counts of listed entries - in microseconds, so the
+LLM prompt only has to ask for the rest (or the LLM is skipped in offline mode).
+guess_fields adds best-effort values for the remaining fields, used only when no
+model is available.
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from utils.text_preprocessor import normalize_whitespace, split_sections
+from utils.pdf_extraction import PAGE_SEPARATOR
+
+EMAIL = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+PHONE = re.compile(r'(?<![\w/])(?:\+?\d{1,3}[\s-]?)?\(?\d{2,5}\)?[\s-]?\d{3,5}(?:[\s-]?\d{3,5})?(?![\w/])')
+JK = re.compile(r'\bJammu\b|\bKashmir\b|\bSrinagar\b|\bJ\s?&\s?K\b', re.IGNORECASE)
+PREMIER_INSTITUTE = re.compile(
+    r'\bI\.?I\.?T\.?\b|\bN\.?I\.?T\.?\b|\bI\.?I\.?I\.?T\.?\b|Indian Institute of (?:Technology|Information Technology)'
+    r'|National Institute of Technology'
+)
+
+DEGREE_LEVELS = (
+    ('phd_institute', re.compile(r'\bPh\.?\s?D\b|Doctor of Philosophy|\bDoctorate\b', re.IGNORECASE)),
+    ('pg_institute', re.compile(
+        r'\bM\.?\s?Tech\b|\bM\.?\s?E\.?(?=\s|,|$)|\bM\.?\s?Sc\b|\bMCA\b|\bMBA\b|\bM\.?\s?S\.?(?=\s|,|$)|\bMaster',
+        re.IGNORECASE)),
+    ('ug_institute', re.compile(
+        r'\bB\.?\s?Tech\b|\bB\.?\s?E\.?(?=\s|,|$)|\bB\.?\s?Sc\b|\bBCA\b|\bB\.?\s?Com\b|\bBachelor', re.IGNORECASE)),
+)
+
+# Section -> (count field, list field)
+COUNTED_SECTIONS = {
+    'publications': ('total_papers', 'research_papers_list'),
+    'patents': ('total_patents', 'patents_list'),
+    'books': ('books', 'books_list'),
+    'workshops': ('workshops', 'workshops_list'),
+    'trainings': ('trainings', 'trainings_list'),
+    'achievements': ('achievements', 'achievements_list'),
+}
+
+_BULLET = re.compile(r'^(?:\[?\d{1,3}[.)\]]|[-•*▪●◦–])\s*')
+
+# Fields extract_fields can return - the prompt skips whichever of these it filled
+FAST_FIELDS = ('email', 'phone', 'state_jk', 'ug_institute', 'pg_institute', 'phd_institute') + tuple(
+    field for pair in COUNTED_SECTIONS.values() for field in pair
+)
+
+
+def _first_phone(text: str) -> Optional[str]:
+    for match in PHONE.finditer(text):
+        digits = re.sub(r'\D', '', match.group(0))
+        # Skip years ranges and other short numbers
+        if 10 <= len(digits) <= 13:
+            return match.group(0).strip()
+    return None
+
+
+def _institute_flags(lines: List[str]) -> Dict[str, int]:
+    """Premier-institute flag per degree level, for levels whose degree line can be found"""
+    flags = {}
+    for i, line in enumerate(lines):
+        for field, degree in DEGREE_LEVELS:
+            if field in flags or not degree.search(line):
+                continue
+            # Institution is usually on the degree line or the one after it
+            context = ' '.join(lines[i:i + 2])
+            flags[field] = 1 if PREMIER_INSTITUTE.search(context) else 0
+            break
+    return flags
+
+
+def _list_entries(lines: List[str]) -> List[str]:
+    """
+    Entries of a list section (heading excluded)
+
+    If any line is numbered/bulleted, only those lines start entries and the rest
+    are continuations; otherwise every non-empty line is an entry.
+    """
+    body = [line for line in lines[1:] if line]
+    if any(_BULLET.match(line) for line in body):
+        entries = []
+        for line in body:
+            if _BULLET.match(line):
+                entries.append(_BULLET.sub('', line))
+            elif entries:
+                entries[-1] += ' ' + line
+        return entries
+    return body
+
+
+def extract_fields(text: str) -> Dict[str, Any]:
+    """
+    Fields that can be determined locally from extracted resume text
+
+    Only fields the rules can decide are returned: institute flags only for
+    degree levels found in the text, counts only for sections with a heading.
+    """
+    text = normalize_whitespace(text).replace(PAGE_SEPARATOR, '\n')
+    lines = text.split('\n')
+    fields: Dict[str, Any] = {}
+
+    email = EMAIL.search(text)
+    if email:
+        fields['email'] = email.group(0)
+    phone = _first_phone(text)
+    if phone:
+        fields['phone'] = phone
+
+    fields['state_jk'] = 1 if JK.search(text) else 0
+
+    sections = split_sections(lines)
+    education = [line for section in sections if section.name == 'education' for line in section.lines]
+    fields.update(_institute_flags(education or lines))
+
+    for section in sections:
+        if section.name in COUNTED_SECTIONS:
+            count_field, list_field = COUNTED_SECTIONS[section.name]
+            entries = fields.get(list_field, []) + _list_entries(section.lines)
+            fields[list_field] = entries
+            fields[count_field] = len(entries)
+
+    return fields
+
+
+def guess_name(text: str) -> str:
+    """First short line without contact details - used only when the LLM is skipped"""
+    for line in normalize_whitespace(text).replace(PAGE_SEPARATOR, '\n').split('\n'):
+        if line and len(line.split()) <= 5 and not EMAIL.search(line) and not any(ch.isdigit() for ch in line):
+            return line
+    return ''
+
+
+YEAR_RANGE = re.compile(r'((?:19|20)\d{2})\s*(?:-|–|to)\s*((?:19|20)\d{2}|present|current|till date|now|ongoing)',
+                        re.IGNORECASE)
+INSTITUTION = re.compile(r'Universit|Institute|College|School|Academy|\bI\.?I\.?I?\.?T\b|\bN\.?I\.?T\b',
+                         re.IGNORECASE)
+_SKILL_SPLIT = re.compile(r'\s*[,;|•]\s*')
+_INSTITUTE_NAME_FIELDS = {'ug_institute': 'ug_institute_name', 'pg_institute': 'pg_institute_name',
+                          'phd_institute': 'phd_institute_name'}
+
+
+def _section_lines(sections, name: str) -> List[str]:
+    """Body lines (headings excluded) of every section with this name"""
+    return [line for section in sections if section.name == name for line in section.lines[1:] if line]
+
+
+def _experience(lines: List[str]) -> Dict[str, Any]:
+    current_year = datetime.now().year
+    years = []
+    titles = set()
+    for line in lines:
+        match = YEAR_RANGE.search(line)
+        if not match:
+            continue
+        end = match.group(2)
+        end_year = int(end) if end.isdigit() else current_year
+        years.append(max(0, end_year - int(match.group(1))))
+        titles.add(line.split(',')[0].strip().lower())
+    if not years:
+        return {}
+    total = float(sum(years))
+    return {'average_experience': total, 'longevity_years': round(total / len(years), 2),
+            'number_of_unique_designations': len(titles)}
+
+
+def _institute_names(lines: List[str]) -> Dict[str, str]:
+    names = {}
+    for i, line in enumerate(lines):
+        for flag_field, degree in DEGREE_LEVELS:
+            name_field = _INSTITUTE_NAME_FIELDS[flag_field]
+            if name_field in names or not degree.search(line):
+                continue
+            for part in ' , '.join(lines[i:i + 2]).split(','):
+                if INSTITUTION.search(part):
+                    names[name_field] = part.strip()
+                    break
+            break
+    return names
+
+
+def guess_fields(text: str) -> Dict[str, Any]:
+    """
+    Best-effort values for fields extract_fields doesn't decide
+
+    Name, summary, address, institution names, experience from year ranges, skills
+    and projects. Rough - meant for when the LLM is unavailable, not to override it.
+    """
+    text = normalize_whitespace(text).replace(PAGE_SEPARATOR, '\n')
+    lines = text.split('\n')
+    sections = split_sections(lines)
+    fields: Dict[str, Any] = {'name': guess_name(text)}
+
+    header = sections[0].lines if sections and sections[0].name == 'header' else []
+    address = [line for line in header[1:] if ',' in line and not EMAIL.search(line) and not _first_phone(line)]
+    if address:
+        fields['address'] = re.sub(r'^(?:Address|Location)\s*:\s*', '', address[0], flags=re.IGNORECASE)
+
+    summary = _section_lines(sections, 'summary')
+    if summary:
+        fields['summary'] = ' '.join(summary)
+
+    education = _section_lines(sections, 'education') or lines
+    fields.update(_institute_names(education))
+    fields.update(_experience(_section_lines(sections, 'experience')))
+
+    skills = [skill for line in _section_lines(sections, 'skills')
+              for skill in _SKILL_SPLIT.split(_BULLET.sub('', line)) if skill]
+    if skills:
+        fields['skills'] = skills
+        fields['skills_count'] = len(skills)
+
+    projects = [entry for section in sections if section.name == 'projects' for entry in _list_entries(section.lines)]
+    if projects:
+        fields['projects'] = projects
+        fields['projects_count'] = len(projects)
+
+    return fields
@@ -1,154 +1,99 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from utils.big5_scoring import TRAIT_POSITION, score_answers
+from utils.rounding import round2
+from utils.scoring_rules import ScoringRules, load_rules
+
+# Neutral Big5 values used until the candidate completes the personality test
+NEUTRAL_BIG5 = {
+    'openness': 25,
+    'conscientiousness': 25,
+    'extraversion': 25,
+    'agreeableness': 25,
+    'neuroticism': 25
+}
+
+# Rules behind the static score_* / categorize_candidate helpers and FitmentScorer()
+DEFAULT_RULES = load_rules()
 
 class FitmentScorer:
     """Calculate fitment score based on candidate data"""
     
+    def __init__(self, rules: Optional[ScoringRules] = None):
+        """
+        Args:
+            rules: Compiled thresholds and weights (default: DEFAULT_RULES - utils/fitment_rules.json)
+        """
+        self.rules = rules or DEFAULT_RULES
+    
     @staticmethod
     def categorize_candidate(longevity_years: float, average_experience: float) -> str:
         """Determine candidate category"""
-        if (longevity_years >= 5) and (average_experience >= 3):
-            return "Experienced"
-        elif (longevity_years > 1) and (average_experience > 1):
-            return "Inexperienced"
-        else:
-            return "Fresher"
+        return DEFAULT_RULES.categorize(longevity_years, average_experience)
     
+    # Per-feature scores under the default rules file
     @staticmethod
     def score_longevity(val: float) -> float:
-        if val >= 6: return 100
-        elif val >= 4: return 75
-        elif val >= 1: return 50
-        else: return 20
+        return DEFAULT_RULES.feature_scorers['longevity_years'](val)
     
     @staticmethod
     def score_avg_exp(val: float) -> float:
-        if val >= 3: return 100
-        elif val >= 1.8: return 75
-        elif val >= 1: return 50
-        else: return 20
+        return DEFAULT_RULES.feature_scorers['average_experience'](val)
     
     @staticmethod
     def score_workshops(val: int) -> float:
-        if val >= 12.73: return 100
-        elif val >= 7: return 75
-        elif val >= 3: return 50
-        else: return 20
+        return DEFAULT_RULES.feature_scorers['workshops'](val)
     
     @staticmethod
     def score_trainings(val: int) -> float:
-        if val >= 12.90: return 100
-        elif val >= 7: return 75
-        elif val >= 3: return 50
-        else: return 20
+        return DEFAULT_RULES.feature_scorers['trainings'](val)
     
     @staticmethod
     def score_papers(val: int) -> float:
-        if val >= 1.18: return 100
-        elif val >= 0.5: return 75
-        elif val >= 0.2: return 50
-        else: return 0
+        return DEFAULT_RULES.feature_scorers['total_papers'](val)
     
     @staticmethod
     def score_patents(val: int) -> float:
-        return 100 if val >= 0.04 else 0
+        return DEFAULT_RULES.feature_scorers['total_patents'](val)
     
     @staticmethod
     def score_achievements(val: int) -> float:
-        if val >= 7.54: return 100
-        elif val >= 4: return 75
-        elif val >= 1: return 50
-        else: return 0
+        return DEFAULT_RULES.feature_scorers['achievements'](val)
     
     @staticmethod
     def score_books(val: int) -> float:
-        return 100 if val >= 0.81 else 0
+        return DEFAULT_RULES.feature_scorers['books'](val)
     
     @staticmethod
     def score_state(val: int) -> float:
-        return 100 if val == 1 else 0
+        return DEFAULT_RULES.feature_scorers['state_jk'](val)
     
     @staticmethod
     def score_jobs(val: int) -> float:
-        return 100 if val >= 0.17 else 0
+        return DEFAULT_RULES.feature_scorers['number_of_unique_designations'](val)
     
     @staticmethod
     def score_institute(val: int) -> float:
-        return 100 if val == 1 else 0
+        return DEFAULT_RULES.feature_scorers['ug_institute'](val)
     
     def calculate_dataset_score(self, data: Dict[str, Any]) -> float:
         """Calculate raw dataset score (0-100)"""
-        
-        scores = {}
-        scores['longevity'] = self.score_longevity(data['longevity_years']) * 0.30
-        scores['avg_exp'] = self.score_avg_exp(data['average_experience']) * 0.30
-        scores['workshops'] = self.score_workshops(data['workshops']) * 0.045
-        scores['trainings'] = self.score_trainings(data['trainings']) * 0.045
-        scores['papers'] = self.score_papers(data['total_papers']) * 0.05
-        scores['patents'] = self.score_patents(data['total_patents']) * 0.07
-        scores['achievements'] = self.score_achievements(data['achievements']) * 0.04
-        scores['books'] = self.score_books(data['books']) * 0.02
-        scores['state'] = self.score_state(data['state_jk']) * 0.02
-        scores['jobs'] = self.score_jobs(data['number_of_unique_designations']) * 0.01
-        scores['ug'] = self.score_institute(data['ug_institute']) * 0.02
-        scores['pg'] = self.score_institute(data['pg_institute']) * 0.03
-        scores['phd'] = self.score_institute(data['phd_institute']) * 0.05
-        
-        return sum(scores.values())
+        raw_score = 0
+        for name, score, weight in self.rules.dataset_scorers:
+            raw_score += score(data[name]) * weight
+        return raw_score
     
     def scale_dataset_score(self, raw_score: float, category: str) -> float:
         """Scale dataset score based on category"""
-        if category == "Experienced":
-            return (raw_score / 100) * 70
-        else:  # Inexperienced & Fresher
-            return (raw_score / 100) * 30
+        return (raw_score / 100) * self.rules.weights_for(category)['dataset']
     
     def calculate_big5_score(self, big5_data: Dict[str, float], category: str) -> Dict[str, float]:
         """Calculate Big Five personality score"""
-        
-        scores = {}
-        
-        # Openness
-        O = big5_data.get('openness', 0)
-        if O <= 10: scores['O'] = 0.25
-        elif O <= 20: scores['O'] = 0.50
-        elif O <= 30: scores['O'] = 0.75
-        else: scores['O'] = 1.0
-        
-        # Conscientiousness
-        C = big5_data.get('conscientiousness', 0)
-        if C <= 10: scores['C'] = 0.25
-        elif C <= 20: scores['C'] = 0.50
-        elif C <= 30: scores['C'] = 0.75
-        else: scores['C'] = 1.0
-        
-        # Extraversion
-        E = big5_data.get('extraversion', 0)
-        if E <= 10: scores['E'] = 0.50
-        elif E <= 20: scores['E'] = 0.75
-        elif E <= 30: scores['E'] = 1.0
-        else: scores['E'] = 0.75
-        
-        # Agreeableness
-        A = big5_data.get('agreeableness', 0)
-        if A <= 10: scores['A'] = 0.25
-        elif A <= 20: scores['A'] = 0.50
-        elif A <= 30: scores['A'] = 1.0
-        else: scores['A'] = 0.75
-        
-        # Neuroticism (reverse scored)
-        N = big5_data.get('neuroticism', 0)
-        if N <= 10: scores['N'] = 1.0
-        elif N <= 20: scores['N'] = 0.75
-        elif N <= 30: scores['N'] = 0.50
-        else: scores['N'] = 0.25
+        scores = {key: score(big5_data.get(name, 0)) for name, key, score in self.rules.big5_scorers}
         
         # Weight per trait based on category
-        if category == "Experienced":
-            weight_per_trait = 30 / 5
-        else:
-            weight_per_trait = 70 / 5
+        weight_per_trait = self.rules.weights_for(category)['big5'] / len(self.rules.big5)
         
         # Total Big5 score
         big5_total = sum(v * weight_per_trait for v in scores.values())
@@ -173,7 +118,7 @@ class FitmentScorer:
         """
         
         # Determine category
-        category = self.categorize_candidate(
+        category = self.rules.categorize(
             candidate_data['longevity_years'],
             candidate_data['average_experience']
         )
@@ -187,19 +132,14 @@ class FitmentScorer:
         # Calculate Big5 score (placeholder if not provided)
         if big5_data is None:
             # For now, use neutral values (will be replaced with actual personality test)
-            big5_data = {
-                'openness': 25,
-                'conscientiousness': 25,
-                'extraversion': 25,
-                'agreeableness': 25,
-                'neuroticism': 25
-            }
+            big5_data = NEUTRAL_BIG5
         
         big5_result = self.calculate_big5_score(big5_data, category)
         big5_score = big5_result['total_score']
         
         # Overall fitment score
         overall_score = fitment_score + big5_score
+        weights = self.rules.weights_for(category)
         
         return {
             'category': category,
@@ -208,8 +148,89 @@ class FitmentScorer:
             'big5_score': round(big5_score, 2),
             'big5_trait_scores': big5_result['trait_scores'],
             'overall_fitment_score': round(overall_score, 2),
+            'rule_version': self.rules.version,
             'breakdown': {
-                'dataset_contribution': f"{fitment_score:.2f} ({'70%' if category == 'Experienced' else '30%'} weight)",
-                'big5_contribution': f"{big5_score:.2f} ({'30%' if category == 'Experienced' else '70%'} weight)"
+                'dataset_contribution': f"{fitment_score:.2f} ({weights['dataset']}% weight)",
+                'big5_contribution': f"{big5_score:.2f} ({weights['big5']}% weight)"
             }
-        }
\ No newline at end of file
+        }
+    
+    def score_batch(self, df: pd.DataFrame, answers: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Vectorized version of calculate_overall_fitment for many candidates
+        
+        Args:
+            df: One row per candidate with the resume columns used by
+                calculate_dataset_score. Big5 columns (openness, ...) are optional;
+                missing columns or NaN values get the neutral placeholder.
+            answers: Optional (len(df), 50) matrix of raw test answers (rows of
+                big5_scoring.answer_vector) - traits are scored from it instead of
+                read from the Big5 columns
+        
+        Returns:
+            DataFrame (same index) with category, raw_dataset_score, fitment_score,
+            big5_score, overall_fitment_score, the five *_score trait columns and
+            rule_version
+        """
+        n = len(df)
+        
+        def column(name: str, default: float) -> np.ndarray:
+            if name not in df:
+                return np.full(n, default, dtype=float)
+            return pd.to_numeric(df[name], errors='coerce').fillna(default).to_numpy(dtype=float)
+        
+        rules = self.rules
+        
+        # Category
+        longevity = column('longevity_years', 0)
+        experience = column('average_experience', 0)
+        min_longevity, min_experience = rules.experienced_min
+        above_longevity, above_experience = rules.inexperienced_above
+        category = np.select(
+            [(longevity >= min_longevity) & (experience >= min_experience),
+             (longevity > above_longevity) & (experience > above_experience)],
+            ['Experienced', 'Inexperienced'],
+            default='Fresher'
+        )
+        dataset_weight = np.zeros(n)
+        big5_weight = np.zeros(n)
+        for name, weights in rules.category_weights.items():
+            in_category = category == name
+            dataset_weight[in_category] = weights['dataset']
+            big5_weight[in_category] = weights['big5']
+        
+        # Raw dataset score - accumulated in the same order as calculate_dataset_score
+        raw_dataset_score = np.zeros(n)
+        for rule in rules.dataset:
+            raw_dataset_score = raw_dataset_score + rule.score_values(column(rule.name, 0)) * rule.weight
+        
+        fitment_score = (raw_dataset_score / 100) * dataset_weight
+        
+        # Big5 score
+        weight_per_trait = big5_weight / len(rules.big5)
+        big5_score = np.zeros(n)
+        trait_scores = {}
+        traits = score_answers(answers) if answers is not None else None
+        for rule in rules.big5:
+            if traits is not None:
+                trait = traits[:, TRAIT_POSITION[rule.name]]
+            else:
+                trait = column(rule.name, NEUTRAL_BIG5[rule.name])
+            trait_scores[rule.key] = rule.score_values(trait)
+            big5_score = big5_score + trait_scores[rule.key] * weight_per_trait
+        
+        overall_score = fitment_score + big5_score
+        
+        return pd.DataFrame({
+            'category': category,
+            'raw_dataset_score': round2(raw_dataset_score),
+            'fitment_score': round2(fitment_score),
+            'big5_score': round2(big5_score),
+            'overall_fitment_score': round2(overall_score),
+            'openness_score': trait_scores['O'],
+            'conscientiousness_score': trait_scores['C'],
+            'extraversion_score': trait_scores['E'],
+            'agreeableness_score': trait_scores['A'],
+            'neuroticism_score': trait_scores['N'],
+            'rule_version': rules.version,
+        }, index=df.index)
@@ -0,0 +1,521 @@
+"""
+Bulk resume ingestion pipeline
+Walks a folder or zip of resumes, extracts text in a process pool, fans the LLM
+parses out over a bounded, rate-limited thread pool (or async tasks with
+deadlines and retries) and writes candidates, resumes and fitment scores to the
+database in batches
+"""
+
+import asyncio
+import os
+import time
+import zipfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial
+from typing import Dict, Any, Callable, Iterable, Iterator, List, NamedTuple, Tuple, Optional
+
+from utils.database_manager import DatabaseManager, SCORING_COLUMNS
+from utils.fast_extractor import extract_fields
+from utils.fitment_scorer import FitmentScorer
+from utils.resume_parser import ResumeParser, SUPPORTED_EXTENSIONS
+from utils.text_preprocessor import PreparedText, estimate_tokens, prepare_resume_text
+
+# (document future, file bytes, prepared text, local fields) - one resume of an LLM batch
+BatchItem = Tuple[Future, bytes, str, Dict[str, Any]]
+
+
+class TokenBucket:
+    """Thread-safe token bucket - allows bursts of `capacity` then `rate` calls per second"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token if one is available (returns 0), else seconds until the next one"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Block until a token is available, returns seconds spent waiting"""
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self) -> float:
+        """acquire() for event-loop callers - sleeps without blocking the loop"""
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+
+class IngestionStats:
+    """Per-stage latency samples and document counters for one ingestion run"""
+
+    STAGES = ('extract', 'rate_limit_wait', 'llm', 'score', 'db_write')
+
+    def __init__(self):
+        self.latencies = {stage: [] for stage in self.STAGES}
+        self.documents = 0
+        self.succeeded = 0
+        self.cached = 0
+        self.failures: List[Tuple[str, str]] = []
+        # (filename, extracted tokens, tokens sent to the model) per parsed document
+        self.tokens: List[Tuple[str, int, int]] = []
+        # ResumeParser.output_stats counters for this run
+        self.model_output: Dict[str, int] = {}
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+
+    def record(self, stage: str, seconds: float):
+        self.latencies[stage].append(seconds)
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Successfully ingested documents per second"""
+        return self.succeeded / self.elapsed if self.elapsed > 0 else 0.0
+
+    @staticmethod
+    def _percentile(samples: List[float], pct: float) -> float:
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def summary(self) -> Dict[str, Any]:
+        stages = {}
+        for stage, samples in self.latencies.items():
+            if samples:
+                stages[stage] = {
+                    'count': len(samples),
+                    'p50_ms': round(self._percentile(samples, 50) * 1000, 2),
+                    'p95_ms': round(self._percentile(samples, 95) * 1000, 2),
+                    'total_s': round(sum(samples), 3)
+                }
+        return {
+            'documents': self.documents,
+            'succeeded': self.succeeded,
+            'cached': self.cached,
+            'failed': len(self.failures),
+            'elapsed_s': round(self.elapsed, 3),
+            'docs_per_sec': round(self.throughput, 2),
+            'stages': stages,
+            'model_output': self.model_output,
+            'tokens': {
+                'original': sum(original for _, original, _ in self.tokens),
+                'sent': sum(sent for _, _, sent in self.tokens),
+                'per_document': [
+                    {'filename': filename, 'original': original, 'sent': sent, 'saved': original - sent}
+                    for filename, original, sent in self.tokens
+                ]
+            }
+        }
+
+    def report(self) -> str:
+        summary = self.summary()
+        lines = [
+            f"Documents: {summary['documents']} "
+            f"(succeeded {summary['succeeded']}, cached {summary['cached']}, failed {summary['failed']})",
+            f"Elapsed: {summary['elapsed_s']}s - {summary['docs_per_sec']} docs/sec",
+        ]
+        tokens = summary['tokens']
+        if tokens['original']:
+            saved = tokens['original'] - tokens['sent']
+            lines.append(f"Tokens: {tokens['original']} extracted, {tokens['sent']} sent "
+                         f"(saved {saved}, {saved / tokens['original']:.0%})")
+        output = summary['model_output']
+        if output.get('responses'):
+            lines.append(f"Model output: {output['responses']} answers, {output['repaired']} repaired, "
+                         f"{output['coerced']} type-coerced, {output['rerequested']} re-requested "
+                         f"({output['rerequested'] / output['responses']:.1%}), {output['failed']} unusable")
+            if output.get('batches'):
+                lines.append(f"  {output['batches']} batched requests, "
+                             f"{output['batch_fallbacks']} documents re-sent on their own")
+        for stage, s in summary['stages'].items():
+            lines.append(f"  {stage:<16} n={s['count']:<5} p50={s['p50_ms']}ms p95={s['p95_ms']}ms total={s['total_s']}s")
+        for filename, error in self.failures:
+            lines.append(f"  ❌ {filename}: {error}")
+        return "\n".join(lines)
+
+
+class ResumeFile(NamedTuple):
+    """Where one resume lives - a file on disk, or a member of a zip archive at path"""
+    filename: str
+    path: str
+    member: Optional[str] = None
+
+    def read(self) -> bytes:
+        if self.member is None:
+            with open(self.path, 'rb') as f:
+                return f.read()
+        return _open_archive(self.path).read(self.member)
+
+
+@lru_cache(maxsize=4)
+def _open_archive(path: str) -> zipfile.ZipFile:
+    """Zip archives stay open per worker process - reopening re-reads the whole central directory"""
+    return zipfile.ZipFile(path)
+
+
+def collect_resume_files(path: str) -> Iterator[ResumeFile]:
+    """Yield every supported resume in a directory tree or zip archive, without reading it"""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            members = archive.infolist()
+        for info in members:
+            name = os.path.basename(info.filename)
+            if not info.is_dir() and name.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield ResumeFile(name, path, info.filename)
+    elif os.path.isdir(path):
+        for root, _, names in os.walk(path):
+            for name in sorted(names):
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    yield ResumeFile(name, os.path.join(root, name))
+    else:
+        raise ValueError(f"{path} is neither a directory nor a zip file")
+
+
+class ExtractedResume(NamedTuple):
+    """A resume after the process pool stage - file bytes, full text and the prompt-ready text"""
+    filename: str
+    file_bytes: bytes
+    text: str
+    prepared: PreparedText
+    local_fields: Dict[str, Any]
+
+
+def _timed_extract(resume: ResumeFile, token_budget: Optional[int],
+                   local_fields: bool) -> Tuple[Optional[ExtractedResume], float, Optional[str]]:
+    """
+    Process pool worker - reads the file itself, extracts and preprocesses its text
+
+    Returns (document, seconds, error). Preprocessing is CPU-bound too, so it runs
+    here rather than on the LLM threads or the parser's event loop.
+    """
+    start = time.perf_counter()
+    try:
+        file_bytes = resume.read()
+        # Already one document per process - extract each PDF serially
+        text = ResumeParser.extract_text(file_bytes, resume.filename, workers=1)
+        # Rule-based fields come from the full text, before the token budget trims it
+        document = ExtractedResume(resume.filename, file_bytes, text, prepare_resume_text(text, token_budget),
+                                   extract_fields(text) if local_fields else {})
+        return document, time.perf_counter() - start, None
+    except Exception as e:
+        return None, time.perf_counter() - start, str(e)
+
+
+def _to_number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class BulkIngestor:
+    """Batch entry point replacing one-at-a-time uploads through app.py"""
+
+    def __init__(self, db: DatabaseManager, parser: ResumeParser, scorer: FitmentScorer = None,
+                 concurrency: int = 4, requests_per_second: float = None,
+                 extract_workers: int = None, batch_size: int = 25, async_llm: bool = False,
+                 llm_batch_tokens: int = None, llm_batch_docs: int = 8):
+        """
+        Args:
+            concurrency: Maximum in-flight LLM requests
+            requests_per_second: Token bucket rate for LLM requests (None = unlimited)
+            extract_workers: Process pool size for text extraction (None = CPU count)
+            batch_size: Applications written per database transaction
+            async_llm: Parse with parse_text_async on the parser's event loop, so each
+                call gets the parser's deadline, retries, hedging and circuit breaker
+            llm_batch_tokens: Pack consecutive resumes into one LLM request up to this many
+                estimated tokens of resume text (None = one resume per request); a resume
+                larger than this is sent on its own
+            llm_batch_docs: Maximum resumes per LLM request - bounded by the answer size
+        """
+        self.db = db
+        self.parser = parser
+        self.scorer = scorer or FitmentScorer()
+        self.concurrency = concurrency
+        self.rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+        self.extract_workers = extract_workers
+        self.batch_size = batch_size
+        self.async_llm = async_llm
+        self.llm_batch_tokens = llm_batch_tokens
+        self.llm_batch_docs = llm_batch_docs
+
+    def _extract(self) -> Callable[[ResumeFile], Tuple[Optional[ExtractedResume], float, Optional[str]]]:
+        """_timed_extract bound to the parser's preprocessing settings (picklable for the pool)"""
+        return partial(_timed_extract, token_budget=self.parser.token_budget,
+                       local_fields=self.parser.uses_local_fields)
+
+    @staticmethod
+    def _extracted(filename: str, seconds: float, error: Optional[str], stats: IngestionStats):
+        stats.documents += 1
+        stats.record('extract', seconds)
+        if error:
+            stats.failures.append((filename, error))
+
+    def extract_all(self, files: Iterable[ResumeFile], stats: IngestionStats,
+                    pool: ProcessPoolExecutor) -> Iterator[ExtractedResume]:
+        """
+        Extract and preprocess every file in the process pool, dropping failures
+
+        Workers read the files themselves, so the parent only holds documents that
+        are extracted and waiting to be parsed; they are yielded as soon as they are
+        ready, so parsing overlaps extraction.
+        """
+        files = list(files)
+        for resume, (document, seconds, error) in zip(files, pool.map(self._extract(), files)):
+            self._extracted(resume.filename, seconds, error, stats)
+            if document is not None:
+                yield document
+
+    @staticmethod
+    def _record_tokens(document: ExtractedResume, stats: IngestionStats):
+        stats.tokens.append((document.filename, document.prepared.original_tokens, document.prepared.tokens))
+
+    def _parse_one(self, document: ExtractedResume,
+                   stats: IngestionStats) -> Tuple[ExtractedResume, Dict[str, Any], bool]:
+        """Runs on the LLM thread pool - returns (document, parsed data, served from cache)"""
+        cached = self.parser.get_cached_parse(document.file_bytes)
+        if cached is not None:
+            return document, cached, True
+
+        self._record_tokens(document, stats)
+        if self.rate_limiter:
+            stats.record('rate_limit_wait', self.rate_limiter.acquire())
+
+        start = time.perf_counter()
+        parsed = self.parser.parse_text(document.prepared.text, document.file_bytes, preprocess=False,
+                                        local_fields=document.local_fields)
+        stats.record('llm', time.perf_counter() - start)
+        return document, parsed, False
+
+    async def _parse_one_async(self, resume: ResumeFile, stats: IngestionStats, slots: asyncio.Semaphore,
+                               extract_slots: asyncio.Semaphore,
+                               pool: ProcessPoolExecutor) -> Tuple[ExtractedResume, Dict[str, Any], bool]:
+        """
+        Runs on the parser's event loop - same contract as _parse_one, extracting the file first
+
+        Extraction and preprocessing go to the process pool and the cache lookup to a
+        thread, so the loop itself only waits on I/O. extract_slots bounds the files
+        queued in the pool, so documents reach the model while others are extracted.
+        """
+        async with extract_slots:
+            document, seconds, error = await asyncio.get_running_loop().run_in_executor(
+                pool, self._extract(), resume
+            )
+        # A failure is recorded by _write_results, like any other failed document
+        self._extracted(resume.filename, seconds, None, stats)
+        if error:
+            raise Exception(error)
+
+        cached = await asyncio.to_thread(self.parser.get_cached_parse, document.file_bytes)
+        if cached is not None:
+            return document, cached, True
+
+        self._record_tokens(document, stats)
+        async with slots:
+            if self.rate_limiter:
+                stats.record('rate_limit_wait', await self.rate_limiter.acquire_async())
+
+            start = time.perf_counter()
+            parsed = await self.parser.parse_text_async(document.prepared.text, document.file_bytes,
+                                                        preprocess=False, local_fields=document.local_fields)
+            stats.record('llm', time.perf_counter() - start)
+        return document, parsed, False
+
+    def _submit_batches(self, documents: Iterable[ExtractedResume], stats: IngestionStats,
+                        submit: Callable[[List[BatchItem]], Any]) -> Dict[Future, str]:
+        """
+        Pack documents into LLM batches by estimated tokens and submit each one
+
+        Returns one future per document (resolved by its batch) so results are written
+        exactly as in the one-request-per-document path.
+        """
+        futures = {}
+        batch: List[BatchItem] = []
+        batch_tokens = 0
+        for document in documents:
+            future = Future()
+            futures[future] = document.filename
+            cached = self.parser.get_cached_parse(document.file_bytes)
+            if cached is not None:
+                future.set_result((document, cached, True))
+                continue
+
+            self._record_tokens(document, stats)
+            tokens = estimate_tokens(document.prepared.text)
+            if batch and (batch_tokens + tokens > self.llm_batch_tokens or len(batch) >= self.llm_batch_docs):
+                submit(batch)
+                batch, batch_tokens = [], 0
+            batch.append((future, document))
+            batch_tokens += tokens
+        if batch:
+            submit(batch)
+        return futures
+
+    @staticmethod
+    def _batch_args(batch: List[BatchItem]) -> Dict[str, Any]:
+        """parse_batch keyword arguments for a batch of prepared documents"""
+        return {
+            'resume_texts': [document.prepared.text for _, document in batch],
+            'file_bytes_list': [document.file_bytes for _, document in batch],
+            'local_fields_list': [document.local_fields for _, document in batch],
+        }
+
+    @staticmethod
+    def _resolve(batch: List[BatchItem], results: List[Any]):
+        for (future, document), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result((document, result, False))
+
+    def _parse_batch(self, batch: List[BatchItem], stats: IngestionStats):
+        """Runs on the LLM thread pool - one request for the batch, results set on each document's future"""
+        try:
+            if self.rate_limiter:
+                stats.record('rate_limit_wait', self.rate_limiter.acquire())
+            start = time.perf_counter()
+            results = self.parser.parse_batch(**self._batch_args(batch), preprocess=False, return_exceptions=True)
+            stats.record('llm', time.perf_counter() - start)
+        except Exception as e:
+            results = [e] * len(batch)
+        self._resolve(batch, results)
+
+    async def _parse_batch_async(self, batch: List[BatchItem], stats: IngestionStats, slots: asyncio.Semaphore):
+        """Runs on the parser's event loop - same contract as _parse_batch"""
+        try:
+            async with slots:
+                if self.rate_limiter:
+                    stats.record('rate_limit_wait', await self.rate_limiter.acquire_async())
+                start = time.perf_counter()
+                results = await self.parser.parse_batch_async(**self._batch_args(batch), preprocess=False,
+                                                              return_exceptions=True)
+                stats.record('llm', time.perf_counter() - start)
+        except Exception as e:
+            results = [e] * len(batch)
+        self._resolve(batch, results)
+
+    def _build_application(self, document: ExtractedResume, parsed: Dict[str, Any],
+                           stats: IngestionStats) -> Dict[str, Any]:
+        if not parsed.get('email'):
+            raise ValueError("No email address found in resume")
+
+        candidate_data = dict(parsed)
+        for column in SCORING_COLUMNS:
+            candidate_data[column] = _to_number(candidate_data.get(column, 0))
+
+        start = time.perf_counter()
+        fitment_result = self.scorer.calculate_overall_fitment(candidate_data)
+        stats.record('score', time.perf_counter() - start)
+
+        return {
+            'candidate_data': candidate_data,
+            'fitment_result': fitment_result,
+            'filename': document.filename,
+            'file_content': document.file_bytes,
+            'file_type': document.filename.lower().split('.')[-1],
+            'extracted_text': document.text
+        }
+
+    def _flush(self, pending: List[Dict[str, Any]], stats: IngestionStats):
+        if not pending:
+            return
+        start = time.perf_counter()
+        try:
+            _, errors = self.db.save_applications_batch(pending)
+        except Exception as e:
+            errors = [str(e)] * len(pending)
+        for app, error in zip(pending, errors):
+            if error is None:
+                stats.succeeded += 1
+            else:
+                stats.failures.append((app['filename'], error))
+        stats.record('db_write', time.perf_counter() - start)
+        pending.clear()
+
+    def run(self, path: str) -> IngestionStats:
+        """Ingest every resume under path (directory or zip)"""
+        stats = IngestionStats()
+        output_before = dict(self.parser.output_stats)
+
+        with ProcessPoolExecutor(max_workers=self.extract_workers) as extract_pool:
+            if self.async_llm and not self.llm_batch_tokens:
+                # One semaphore per run, bound to the parser's loop on first use; extraction
+                # is awaited per document from the loop, a few files ahead of the pool
+                slots = asyncio.Semaphore(self.concurrency)
+                extract_slots = asyncio.Semaphore(2 * (self.extract_workers or os.cpu_count() or 1))
+                futures = {
+                    self.parser.submit_async(
+                        self._parse_one_async(resume, stats, slots, extract_slots, extract_pool)
+                    ): resume.filename
+                    for resume in collect_resume_files(path)
+                }
+                self._write_results(futures, stats)
+            else:
+                extracted = self.extract_all(collect_resume_files(path), stats, extract_pool)
+                if self.async_llm:
+                    slots = asyncio.Semaphore(self.concurrency)
+                    self._write_results(self._submit_batches(
+                        extracted, stats,
+                        lambda batch: self.parser.submit_async(self._parse_batch_async(batch, stats, slots))
+                    ), stats)
+                elif self.llm_batch_tokens:
+                    with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                        self._write_results(self._submit_batches(
+                            extracted, stats, lambda batch: pool.submit(self._parse_batch, batch, stats)
+                        ), stats)
+                else:
+                    with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                        futures = {
+                            pool.submit(self._parse_one, document, stats): document.filename
+                            for document in extracted
+                        }
+                        self._write_results(futures, stats)
+
+        stats.model_output = {key: count - output_before[key] for key, count in self.parser.output_stats.items()}
+        stats.finished_at = time.perf_counter()
+        return stats
+
+    def _write_results(self, futures: Dict[Future, str], stats: IngestionStats):
+        """
+        Score and write parses in batches as they complete, while other parses are in flight
+
+        futures maps each document's future - resolving to (document, parsed data,
+        served from cache) - to its filename.
+        """
+        pending = []
+        for future in as_completed(futures):
+            try:
+                document, parsed, was_cached = future.result()
+                stats.cached += was_cached
+                pending.append(self._build_application(document, parsed, stats))
+            except Exception as e:
+                stats.failures.append((futures[future], str(e)))
+                continue
+            if len(pending) >= self.batch_size:
+                self._flush(pending, stats)
+        self._flush(pending, stats)
@@ -0,0 +1,109 @@
+"""
+Lenient decoding of model JSON output
+Strips markdown fences and surrounding prose, and recovers the complete members
+of an object cut off mid-way (max_output_tokens, dropped stream), so a truncated
+answer costs a few list entries instead of the whole LLM call.
+"""
+
+import json
+import re
+from typing import Any, Dict, Optional, Tuple
+
+_decoder = json.JSONDecoder()
+# A string (its closing quote captured, empty if cut off) or a structural character
+_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*("?)|[{}\[\]:,]', re.DOTALL)
+
+
+def _truncated_candidates(text: str):
+    """
+    Closings to try for an object cut off mid-way, best first
+
+    First the text as-is with its open brackets closed (cut right after a value),
+    then the text up to the end of the last complete member or array item, then up
+    to the last string or bracket (in case the scalar before that last comma is
+    malformed). One pass over the strings and brackets tracks whether each object
+    expects a key or a value, so at most three candidates are ever decoded.
+    """
+    # Per open bracket: objects go key -> colon -> value -> done, arrays value -> done
+    states = []
+    closers = ''
+    in_string = False
+    # (end, closers) after the last complete value, and after the last one that
+    # is a string or container - scalars aren't validated by the scan
+    last_cut = last_checked_cut = None
+
+    for match in _TOKENS.finditer(text):
+        token = match.group(0)
+        if token[0] == '"':
+            if not match.group(1):
+                # Cut off inside this string
+                in_string = True
+            elif states and states[-1] == 'key':
+                states[-1] = 'colon'
+            else:
+                if states:
+                    states[-1] = 'done'
+                last_cut = last_checked_cut = (match.end(), closers)
+        elif token in '{[':
+            states.append('key' if token == '{' else 'value')
+            closers += '}' if token == '{' else ']'
+            # An empty container is a complete value
+            last_cut = last_checked_cut = (match.end(), closers)
+        elif token in '}]':
+            if states:
+                states.pop()
+            closers = closers[:-1]
+            if states:
+                states[-1] = 'done'
+            last_cut = last_checked_cut = (match.end(), closers)
+        elif token == ':':
+            if states:
+                states[-1] = 'value'
+        elif states:
+            # A comma - everything before it is a complete member or array item
+            last_cut = (match.start(), closers)
+            states[-1] = 'key' if closers[-1] == '}' else 'value'
+
+    if not in_string:
+        yield text.rstrip().rstrip(',:') + closers[::-1]
+    else:
+        yield text + '"' + closers[::-1]
+    for cut in dict.fromkeys((last_cut, last_checked_cut)):
+        if cut is not None:
+            end, cut_closers = cut
+            yield text[:end] + cut_closers[::-1]
+
+
+def decode_json_object(text: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Decode the JSON object in a model response
+
+    Returns (object, repaired): repaired is True when the object had to be
+    recovered from a truncated or malformed response. (None, False) if no object
+    can be recovered at all.
+    """
+    # Skips an opening ```json fence or any prose before the object; a closing
+    # fence or prose after it is ignored by raw_decode
+    start = text.find('{')
+    if start < 0:
+        return None, False
+    text = text[start:].rstrip()
+    if text.endswith('```'):
+        text = text[:-3]
+
+    try:
+        # raw_decode ignores trailing prose after the object
+        value, _ = _decoder.raw_decode(text)
+        if isinstance(value, dict):
+            return value, False
+    except json.JSONDecodeError:
+        pass
+
+    for candidate in _truncated_candidates(text):
+        try:
+            value, _ = _decoder.raw_decode(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value, True
+    return None, False
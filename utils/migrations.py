@@ -0,0 +1,358 @@
+"""
+Versioned schema migrations for database.db
+PRAGMA user_version records the last applied migration. Migrations only move
+forward; never edit one that has shipped - append a new version instead.
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utils.database_manager import DatabaseManager
+
+
+def read_only_connection(db_path: str) -> sqlite3.Connection:
+    """Connection that cannot write to (or create) the database file"""
+    return sqlite3.connect(f'{Path(db_path).resolve().as_uri()}?mode=ro', uri=True)
+
+
+def table_exists(conn, table: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def table_columns(conn, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({table})').fetchall()]
+
+
+def table_size(conn, table: str) -> Dict[str, int]:
+    """Row count and on-disk bytes of a table (bytes estimated if dbstat is unavailable)"""
+    if not table_exists(conn, table):
+        return {'rows': 0, 'bytes': 0}
+
+    rows = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    try:
+        size = conn.execute('SELECT SUM(pgsize) FROM dbstat WHERE name = ?', (table,)).fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        total_rows = sum(
+            conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            ).fetchall()
+        )
+        size = int(page_size * page_count * rows / total_rows) if total_rows else 0
+    return {'rows': rows, 'bytes': size}
+
+
+class Migration:
+    """One forward schema step"""
+
+    version: int = 0
+    description: str = ''
+
+    def estimate(self, db: 'DatabaseManager', conn) -> Dict[str, Any]:
+        """Estimated rewrite cost for --dry-run: rows and bytes the migration touches"""
+        return {'rows': 0, 'bytes': 0}
+
+    def apply(self, db: 'DatabaseManager', conn, batch_size: int):
+        """
+        Run the migration. It may commit intermediate batches; the runner bumps
+        user_version in the final transaction, so an interrupted migration reruns.
+        """
+        raise NotImplementedError
+
+
+class SQLMigration(Migration):
+    """DDL-only migration applied in a single transaction"""
+
+    # Statements that read or rewrite every row: index builds, DROP COLUMN and copy-based
+    # table rebuilds. ADD COLUMN, RENAME and triggers only change the schema record.
+    REWRITE_PATTERN = re.compile(
+        r'\bCREATE\s+(?:UNIQUE\s+)?INDEX\b.*?\bON\s+(\w+)|\bALTER\s+TABLE\s+(\w+)\s+DROP\b'
+        r'|\bINSERT\s+INTO\s+\w+\s.*?\bFROM\s+(\w+)',
+        re.IGNORECASE | re.DOTALL
+    )
+    ADD_COLUMN_PATTERN = re.compile(r'^\s*ALTER\s+TABLE\s+(\w+)\s+ADD\s+COLUMN\s+(\w+)', re.IGNORECASE)
+
+    def __init__(self, version: int, description: str, statements: List[str]):
+        self.version = version
+        self.description = description
+        self.statements = statements
+
+    def estimate(self, db, conn) -> Dict[str, Any]:
+        tables = set()
+        for statement in self.statements:
+            for match in self.REWRITE_PATTERN.finditer(statement):
+                tables.add(next(group for group in match.groups() if group))
+        sizes = [table_size(conn, table) for table in sorted(tables)]
+        return {
+            'rows': sum(size['rows'] for size in sizes),
+            'bytes': sum(size['bytes'] for size in sizes),
+            'tables': sorted(tables)
+        }
+
+    def apply(self, db, conn, batch_size: int):
+        for statement in self.statements:
+            # SQLite has no ADD COLUMN IF NOT EXISTS
+            add_column = self.ADD_COLUMN_PATTERN.match(statement)
+            if add_column and add_column.group(2) in table_columns(conn, add_column.group(1)):
+                continue
+            conn.execute(statement)
+
+
+class ResumeBlobMigration(Migration):
+    """
+    Move legacy resumes.file_content BLOBs into the blob store
+
+    The BLOBs are moved in batches of batch_size with a commit after each one, so
+    the write lock is only held briefly and the migration can resume if interrupted.
+    The final table rebuild (dropping the emptied column) is then cheap. Each batch
+    re-selects unmoved rows under BEGIN IMMEDIATE, so a second runner started
+    meanwhile just helps with the remaining batches instead of redoing them.
+    """
+
+    version = 2
+    description = 'Move resume BLOBs into the content-addressed blob store'
+
+    def estimate(self, db, conn) -> Dict[str, Any]:
+        if 'file_content' not in table_columns(conn, 'resumes'):
+            return {'rows': 0, 'bytes': 0, 'tables': []}
+        rows, blob_bytes = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(LENGTH(file_content)), 0) FROM resumes'
+        ).fetchone()
+        return {'rows': rows, 'bytes': blob_bytes, 'tables': ['resumes']}
+
+    def apply(self, db, conn, batch_size: int):
+        columns = table_columns(conn, 'resumes')
+        if 'file_content' not in columns:
+            return
+
+        for column, column_type in (('content_hash', 'TEXT'), ('file_size', 'INTEGER'), ('mime_type', 'TEXT')):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE resumes ADD COLUMN {column} {column_type}')
+        conn.commit()
+
+        # Batched backfill - each batch is its own short transaction
+        moved = 0
+        while True:
+            conn.execute('BEGIN IMMEDIATE')
+            if 'file_content' not in table_columns(conn, 'resumes'):
+                # Another runner finished the migration while this one was moving batches
+                return
+            rows = conn.execute('''
+                SELECT id, filename, file_content FROM resumes
+                WHERE content_hash IS NULL
+                ORDER BY id LIMIT ?
+            ''', (batch_size,)).fetchall()
+            if not rows:
+                # Keep the write lock for the rebuild
+                break
+            conn.executemany('''
+                UPDATE resumes SET content_hash = ?, file_size = ?, mime_type = ?, file_content = X''
+                WHERE id = ?
+            ''', [
+                (db.blob_store.put(bytes(content)), len(content), db.guess_mime_type(filename), row_id)
+                for row_id, filename, content in rows
+            ])
+            conn.commit()
+            moved += len(rows)
+        print(f"✅ Moved {moved} resume files to the blob store")
+
+        # Rebuild without the (now empty) BLOB column, keeping row IDs
+        from utils.database_manager import RESUMES_TABLE_SQL
+        conn.execute('DROP TABLE IF EXISTS resumes_migrated')
+        conn.execute(RESUMES_TABLE_SQL.format(table='resumes_migrated'))
+        conn.execute('''
+            INSERT INTO resumes_migrated (
+                id, candidate_id, filename, content_hash, file_size, mime_type,
+                file_type, extracted_text, uploaded_at
+            )
+            SELECT id, candidate_id, filename, content_hash, file_size, mime_type,
+                   file_type, extracted_text, uploaded_at
+            FROM resumes
+        ''')
+        conn.execute('DROP TABLE resumes')
+        conn.execute('ALTER TABLE resumes_migrated RENAME TO resumes')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_resumes_candidate ON resumes (candidate_id)')
+
+
+MIGRATIONS: List[Migration] = [
+    SQLMigration(1, 'Index foreign keys and hot lookup columns', [
+        'CREATE INDEX IF NOT EXISTS idx_personality_tests_candidate ON personality_tests (candidate_id)',
+        'CREATE INDEX IF NOT EXISTS idx_fitment_scores_candidate ON fitment_scores (candidate_id, calculated_at)',
+        'CREATE INDEX IF NOT EXISTS idx_email_logs_candidate ON email_logs (candidate_id, sent_at)',
+        'CREATE INDEX IF NOT EXISTS idx_resumes_candidate ON resumes (candidate_id)',
+        'CREATE INDEX IF NOT EXISTS idx_candidates_created_at ON candidates (created_at)',
+    ]),
+    ResumeBlobMigration(),
+    SQLMigration(3, 'Add durable email outbox', [
+        '''
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            candidate_id TEXT NOT NULL,
+            email_type TEXT NOT NULL,
+            recipient_email TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            body TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP,
+            FOREIGN KEY (candidate_id) REFERENCES candidates(candidate_id)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (status, next_attempt_at)',
+    ]),
+    SQLMigration(4, 'Store plain-text alternative of outbox emails', [
+        'ALTER TABLE email_outbox ADD COLUMN text_body TEXT',
+    ]),
+    SQLMigration(5, 'Store retention scores with a trigger-maintained summary', [
+        '''
+        CREATE TABLE IF NOT EXISTS retention_scores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            candidate_id TEXT NOT NULL,
+            category TEXT NOT NULL,
+            fitment_score REAL,
+            retention_score REAL NOT NULL,
+            retention_risk TEXT NOT NULL,
+            stability_score REAL,
+            personality_score REAL,
+            engagement_score REAL,
+            fitment_factor REAL,
+            risk_flags INTEGER NOT NULL DEFAULT 0,
+            flag_count INTEGER NOT NULL DEFAULT 0,
+            is_current INTEGER NOT NULL DEFAULT 1,
+            calculated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (candidate_id) REFERENCES candidates(candidate_id)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_retention_scores_candidate ON retention_scores (candidate_id, is_current)',
+        # One row per (risk level, category) counting each candidate's current score -
+        # kept up to date by the triggers below, so reports never aggregate retention_scores
+        '''
+        CREATE TABLE IF NOT EXISTS retention_summary (
+            retention_risk TEXT NOT NULL,
+            category TEXT NOT NULL,
+            candidates INTEGER NOT NULL DEFAULT 0,
+            total_retention_score REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (retention_risk, category)
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS retention_summary_insert
+        AFTER INSERT ON retention_scores WHEN NEW.is_current = 1
+        BEGIN
+            INSERT OR IGNORE INTO retention_summary (retention_risk, category)
+            VALUES (NEW.retention_risk, NEW.category);
+            UPDATE retention_summary
+            SET candidates = candidates + 1, total_retention_score = total_retention_score + NEW.retention_score
+            WHERE retention_risk = NEW.retention_risk AND category = NEW.category;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS retention_summary_supersede
+        AFTER UPDATE OF is_current ON retention_scores WHEN OLD.is_current = 1 AND NEW.is_current = 0
+        BEGIN
+            UPDATE retention_summary
+            SET candidates = candidates - 1, total_retention_score = total_retention_score - OLD.retention_score
+            WHERE retention_risk = OLD.retention_risk AND category = OLD.category;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS retention_summary_delete
+        AFTER DELETE ON retention_scores WHEN OLD.is_current = 1
+        BEGIN
+            UPDATE retention_summary
+            SET candidates = candidates - 1, total_retention_score = total_retention_score - OLD.retention_score
+            WHERE retention_risk = OLD.retention_risk AND category = OLD.category;
+        END
+        ''',
+    ]),
+    SQLMigration(6, 'Record the scoring rules version of fitment scores', [
+        # utils/fitment_rules.json "version"; NULL for scores calculated before the rules file
+        'ALTER TABLE fitment_scores ADD COLUMN rule_version TEXT',
+    ]),
+    SQLMigration(7, 'Record the Big5 scoring version of personality test scores', [
+        # big5_scoring.SCORING_VERSION the trait columns were computed with, so an
+        # interrupted rescore_personality.py run resumes instead of starting over
+        'ALTER TABLE personality_tests ADD COLUMN scoring_version TEXT',
+    ]),
+]
+
+
+class MigrationRunner:
+    """Applies pending MIGRATIONS to a DatabaseManager's database"""
+
+    def __init__(self, db: Optional['DatabaseManager'], migrations: List[Migration] = None, batch_size: int = 200):
+        self.db = db
+        self.migrations = sorted(migrations if migrations is not None else MIGRATIONS,
+                                 key=lambda m: m.version)
+        self.batch_size = batch_size
+
+    @staticmethod
+    def current_version(conn) -> int:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1].version if self.migrations else 0
+
+    def pending(self, conn) -> List[Migration]:
+        version = self.current_version(conn)
+        return [m for m in self.migrations if m.version > version]
+
+    def plan(self, conn=None) -> List[Dict[str, Any]]:
+        """
+        Dry run - describe pending migrations and their estimated rewrite cost without changing anything
+
+        Pass a read-only connection (see read_only_connection) to plan without a
+        DatabaseManager, whose start-up creates tables and switches the journal mode.
+        """
+        own_conn = conn is None
+        if own_conn:
+            conn = self.db.get_connection()
+        try:
+            return [
+                {'version': m.version, 'description': m.description, **m.estimate(self.db, conn)}
+                for m in self.pending(conn)
+            ]
+        finally:
+            if own_conn:
+                conn.close()
+
+    def run(self) -> int:
+        """
+        Apply all pending migrations in order, returns the resulting schema version
+
+        Every app and worker runs this on start, possibly at the same moment, so each
+        migration takes the write lock (BEGIN IMMEDIATE) before re-reading
+        user_version and is skipped if another process applied it meanwhile.
+        """
+        conn = self.db.get_connection()
+        try:
+            for migration in self.pending(conn):
+                try:
+                    conn.execute('BEGIN IMMEDIATE')
+                    if self.current_version(conn) >= migration.version:
+                        conn.commit()
+                        continue
+                    migration.apply(self.db, conn, self.batch_size)
+                    if not conn.in_transaction:
+                        conn.execute('BEGIN IMMEDIATE')
+                    if self.current_version(conn) < migration.version:
+                        conn.execute(f'PRAGMA user_version = {migration.version}')
+                    conn.commit()
+                    print(f"✅ Applied schema migration {migration.version}: {migration.description}")
+                except Exception as e:
+                    conn.rollback()
+                    raise Exception(f"Error applying schema migration {migration.version}: {str(e)}")
+            return self.current_version(conn)
+        finally:
+            conn.close()
@@ -0,0 +1,126 @@
+"""
+Persistent cache for resume parses
+Content-addressed on the uploaded file bytes plus prompt version and model name,
+so re-uploads and duplicate applications skip the Gemini call entirely
+"""
+
+import sqlite3
+import json
+import hashlib
+import threading
+import time
+from typing import Dict, Any, Optional
+
+
+class ParseCache:
+    """SQLite-backed parse cache with TTL expiry and size-bounded LRU eviction"""
+
+    def __init__(self, db_path: str = "parse_cache.db", ttl_seconds: int = 7 * 24 * 3600,
+                 max_entries: int = 5000):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        # One shared connection - Streamlit shares cached resources across threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                cache_key TEXT PRIMARY KEY,
+                parsed_data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_parse_cache_last_accessed
+            ON parse_cache (last_accessed_at)
+        ''')
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(file_bytes: bytes, prompt_version: str, model_name: str) -> str:
+        """Hash of the file content plus everything that changes the parse output"""
+        hash_object = hashlib.sha256(file_bytes)
+        hash_object.update(f"|{prompt_version}|{model_name}".encode())
+        return hash_object.hexdigest()
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached parse, or None on a miss or expired entry"""
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT parsed_data, created_at FROM parse_cache WHERE cache_key = ?',
+                (cache_key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute('DELETE FROM parse_cache WHERE cache_key = ?', (cache_key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                'UPDATE parse_cache SET last_accessed_at = ? WHERE cache_key = ?',
+                (now, cache_key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, cache_key: str, parsed_data: Dict[str, Any]):
+        """Store a parse and evict least recently used entries above max_entries"""
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO parse_cache (cache_key, parsed_data, created_at, last_accessed_at)
+                VALUES (?, ?, ?, ?)
+            ''', (cache_key, json.dumps(parsed_data), now, now))
+
+            self._conn.execute('''
+                DELETE FROM parse_cache WHERE cache_key IN (
+                    SELECT cache_key FROM parse_cache
+                    ORDER BY last_accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+            self._conn.commit()
+
+    def clear_expired(self) -> int:
+        """Delete entries older than the TTL, returns number removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM parse_cache WHERE created_at < ?',
+                (time.time() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache since startup"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            size = self._conn.execute('SELECT COUNT(*) FROM parse_cache').fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 4),
+            'entries': size
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
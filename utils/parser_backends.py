@@ -0,0 +1,325 @@
+"""
+Pluggable model backends for ResumeParser
+Every backend speaks the generate_content / generate_content_async interface of
+genai.GenerativeModel, so ResumeParser's prompt, decoding and caching don't change.
+BackendRouter tries them in order of preference per request - skipping ones that
+are unavailable, over quota or too slow - so parsing keeps going without Gemini:
+
+    Gemini (network) -> local CPU model (optional, llama.cpp) -> heuristic rules (always)
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import google.generativeai as genai
+
+from utils.candidate_schema import default_values
+from utils.fast_extractor import extract_fields, guess_fields
+from utils.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, is_transient
+
+try:
+    from google.api_core.exceptions import ResourceExhausted, TooManyRequests
+    _QUOTA_ERRORS: Tuple[type, ...] = (ResourceExhausted, TooManyRequests)
+except ImportError:
+    _QUOTA_ERRORS = ()
+
+try:
+    from llama_cpp import Llama
+except ImportError:
+    Llama = None
+
+# Use the correct model name without 'models/' prefix
+# This is the standard model name that works with most API keys
+MODEL_NAME = 'gemini-2.5-flash'
+
+# Batch prompts put each resume between a pair of delimiter lines
+BATCH_START = '<<<RESUME {doc_id}>>>'
+BATCH_END = '<<<END RESUME {doc_id}>>>'
+
+_RESUME_TEXT = re.compile(r'Resume Text:\s*(.*?)\s*Return ONLY', re.S)
+# BATCH_START, resume text, the matching BATCH_END
+_BATCH_DOCUMENT = re.compile(r'<<<RESUME (\S+?)>>>\n(.*?)\n<<<END RESUME \1>>>', re.S)
+
+
+def prompt_documents(prompt: str) -> List[Tuple[Optional[str], str]]:
+    """(doc_id, resume text) pairs embedded in a single or batch extraction prompt - doc_id is None for single"""
+    documents = _BATCH_DOCUMENT.findall(prompt)
+    if documents:
+        return documents
+    match = _RESUME_TEXT.search(prompt)
+    return [(None, match.group(1) if match else prompt)]
+
+
+class BackendResponse:
+    """Response with the text attribute ResumeParser reads, plus which backend produced it"""
+
+    def __init__(self, text: str, backend: str):
+        self.text = text
+        self.backend = backend
+
+
+class ParserBackend:
+    """Base class - subclasses implement generate_content; async runs it in a worker thread by default"""
+
+    name = 'backend'
+
+    def available(self) -> bool:
+        return True
+
+    def generate_content(self, prompt: str, generation_config: Dict[str, Any] = None) -> BackendResponse:
+        raise NotImplementedError
+
+    async def generate_content_async(self, prompt: str, generation_config: Dict[str, Any] = None) -> BackendResponse:
+        return await asyncio.to_thread(self.generate_content, prompt, generation_config)
+
+
+class GeminiBackend(ParserBackend):
+    """Gemini over the network - unavailable without an API key"""
+
+    name = MODEL_NAME
+
+    def __init__(self, api_key: Optional[str], model_name: str = MODEL_NAME):
+        self.name = model_name
+        self.model = None
+        if api_key:
+            genai.configure(api_key=api_key)
+            self.model = genai.GenerativeModel(model_name)
+
+    def available(self) -> bool:
+        return self.model is not None
+
+    def generate_content(self, prompt: str, generation_config: Dict[str, Any] = None) -> BackendResponse:
+        return BackendResponse(self.model.generate_content(prompt, generation_config=generation_config).text,
+                               self.name)
+
+    async def generate_content_async(self, prompt: str, generation_config: Dict[str, Any] = None) -> BackendResponse:
+        response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+        return BackendResponse(response.text, self.name)
+
+
+class HeuristicBackend(ParserBackend):
+    """
+    Pure-local rules: extract_fields plus guess_fields on the resume text in the prompt
+
+    Always available and sub-millisecond; counts and flags are as good as the fast
+    path, free-text fields (summary, skills, experience) are rough.
+    """
+
+    name = 'heuristic-rules'
+
+    @staticmethod
+    def parse(resume_text: str) -> Dict[str, Any]:
+        return {**default_values(), **guess_fields(resume_text), **extract_fields(resume_text)}
+
+    def generate_content(self, prompt: str, generation_config: Dict[str, Any] = None) -> BackendResponse:
+        documents = prompt_documents(prompt)
+        if documents[0][0] is None:
+            return BackendResponse(json.dumps(self.parse(documents[0][1])), self.name)
+        results = [{'doc_id': doc_id, **self.parse(text)} for doc_id, text in documents]
+        return BackendResponse(json.dumps({'results': results}), self.name)
+
+    async def generate_content_async(self, prompt: str, generation_config: Dict[str, Any] = None) -> BackendResponse:
+        return self.generate_content(prompt, generation_config)
+
+
+def _json_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Gemini response_schema (OpenAPI subset, upper-case types) -> JSON Schema"""
+    converted = {key: value for key, value in schema.items() if key not in ('type', 'properties', 'items')}
+    converted['type'] = schema['type'].lower()
+    if 'properties' in schema:
+        converted['properties'] = {name: _json_schema(prop) for name, prop in schema['properties'].items()}
+    if 'items' in schema:
+        converted['items'] = _json_schema(schema['items'])
+    return converted
+
+
+class LocalModelBackend(ParserBackend):
+    """
+    Small instruction-tuned GGUF model on the CPU via llama-cpp-python (optional dependency)
+
+    Unavailable unless llama_cpp is installed and model_path exists. The model is
+    loaded on first use; calls are serialized because a Llama instance isn't thread-safe.
+    """
+
+    name = 'local-model'
+
+    def __init__(self, model_path: Optional[str], n_ctx: int = 8192, n_threads: Optional[int] = None,
+                 max_tokens: int = 2048):
+        self.model_path = model_path
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads
+        self.max_tokens = max_tokens
+        self._llm = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'LocalModelBackend':
+        """Configured by LOCAL_MODEL_PATH (and optionally LOCAL_MODEL_THREADS)"""
+        threads = os.getenv('LOCAL_MODEL_THREADS')
+        return cls(os.getenv('LOCAL_MODEL_PATH'), n_threads=int(threads) if threads else None)
+
+    def available(self) -> bool:
+        return Llama is not None and bool(self.model_path) and os.path.exists(self.model_path)
+
+    def generate_content(self, prompt: str, generation_config: Dict[str, Any] = None) -> BackendResponse:
+        config = generation_config or {}
+        response_format = {'type': 'json_object'}
+        if config.get('response_schema'):
+            response_format['schema'] = _json_schema(config['response_schema'])
+
+        with self._lock:
+            if self._llm is None:
+                self._llm = Llama(model_path=self.model_path, n_ctx=self.n_ctx, n_threads=self.n_threads,
+                                  verbose=False)
+            completion = self._llm.create_chat_completion(
+                messages=[{'role': 'user', 'content': prompt}],
+                response_format=response_format,
+                temperature=config.get('temperature', 0.2),
+                max_tokens=min(config.get('max_output_tokens', self.max_tokens), self.max_tokens),
+            )
+        return BackendResponse(completion['choices'][0]['message']['content'], self.name)
+
+
+class BackendRouter:
+    """
+    Route each model request to the first usable backend, falling through on failure
+
+    A backend is skipped while unavailable, while its circuit breaker is open, for
+    quota_cooldown seconds after a quota / rate-limit error, and - when
+    latency_budget is set - while its p95 latency is over budget (one probe request
+    per probe_interval still goes through so it can recover). The last backend is
+    always tried, so put an always-available one (HeuristicBackend) last.
+
+    Only unavailability - transient errors (timeouts, dropped connections, 5xx) and
+    quota errors - falls through to the next backend. Anything else (bad API key,
+    rejected request or schema) is a configuration problem and is raised as-is
+    instead of being hidden behind a heuristic parse. On the async path each backend
+    gets at most timeout seconds, so a hung Gemini call still leaves time for the
+    fallbacks within the caller's deadline.
+    """
+
+    def __init__(self, backends: List[ParserBackend], latency_budget: Optional[float] = None,
+                 quota_cooldown: float = 60.0, probe_interval: float = 30.0, timeout: Optional[float] = None):
+        self.backends = backends
+        self.latency_budget = latency_budget
+        self.timeout = timeout
+        self.quota_cooldown = quota_cooldown
+        self.probe_interval = probe_interval
+        self.breakers = {backend.name: CircuitBreaker() for backend in backends}
+        self.latency = {backend.name: LatencyTracker(min_samples=10) for backend in backends}
+        self.counts = {backend.name: 0 for backend in backends}
+        self.errors = {backend.name: 0 for backend in backends}
+        self._quota_until: Dict[str, float] = {}
+        self._last_probe: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.backends[0].name
+
+    def _usable(self, backend: ParserBackend) -> bool:
+        if not backend.available() or self.breakers[backend.name].state == 'open':
+            return False
+        now = time.monotonic()
+        if self._quota_until.get(backend.name, 0) > now:
+            return False
+        if self.latency_budget is not None:
+            p95 = self.latency[backend.name].percentile(95)
+            if p95 is not None and p95 > self.latency_budget:
+                with self._lock:
+                    if now - self._last_probe.get(backend.name, 0) < self.probe_interval:
+                        return False
+                    self._last_probe[backend.name] = now
+        return True
+
+    def _candidates(self) -> List[ParserBackend]:
+        usable = [backend for backend in self.backends[:-1] if self._usable(backend)]
+        return usable + self.backends[-1:]
+
+    def _failed(self, backend: ParserBackend, error: Exception) -> bool:
+        """Record a failed call, returns whether the next backend should be tried"""
+        if isinstance(error, CircuitOpenError):
+            # Skipped, not tried
+            return True
+        self.errors[backend.name] += 1
+        if isinstance(error, _QUOTA_ERRORS):
+            self.breakers[backend.name].record_failure()
+            self._quota_until[backend.name] = time.monotonic() + self.quota_cooldown
+            return True
+        if is_transient(error):
+            self.breakers[backend.name].record_failure()
+            return True
+        # The backend answered - a bad request says nothing about its health
+        self.breakers[backend.name].record_success()
+        return False
+
+    def _succeeded(self, backend: ParserBackend, seconds: float):
+        self.breakers[backend.name].record_success()
+        self.latency[backend.name].record(seconds)
+        self.counts[backend.name] += 1
+
+    def generate_content(self, prompt: str, generation_config: Dict[str, Any] = None) -> BackendResponse:
+        error = None
+        for backend in self._candidates():
+            breaker = self.breakers[backend.name]
+            start = time.monotonic()
+            trial = False
+            try:
+                trial = breaker.before_call()
+                response = backend.generate_content(prompt, generation_config)
+            except Exception as e:
+                if not self._failed(backend, e):
+                    raise
+                error = e
+            else:
+                self._succeeded(backend, time.monotonic() - start)
+                return response
+            finally:
+                if trial:
+                    # No-op once an outcome was recorded; frees the half-open slot on cancellation
+                    breaker.end_trial()
+        raise error
+
+    async def generate_content_async(self, prompt: str, generation_config: Dict[str, Any] = None) -> BackendResponse:
+        error = None
+        for backend in self._candidates():
+            breaker = self.breakers[backend.name]
+            start = time.monotonic()
+            trial = False
+            try:
+                trial = breaker.before_call()
+                response = await asyncio.wait_for(backend.generate_content_async(prompt, generation_config),
+                                                  self.timeout)
+            except Exception as e:
+                if not self._failed(backend, e):
+                    raise
+                error = e
+            else:
+                self._succeeded(backend, time.monotonic() - start)
+                return response
+            finally:
+                if trial:
+                    # No-op once an outcome was recorded; frees the half-open slot on cancellation
+                    breaker.end_trial()
+        raise error
+
+    def report(self) -> str:
+        return "Backends: " + ", ".join(
+            f"{name} {count} served / {self.errors[name]} errors" for name, count in self.counts.items()
+        )
+
+
+def default_router(api_key: Optional[str], latency_budget: Optional[float] = None,
+                   timeout: Optional[float] = None) -> BackendRouter:
+    """Gemini, then a local model if LOCAL_MODEL_PATH is set up, then heuristic rules"""
+    backends: List[ParserBackend] = [GeminiBackend(api_key)]
+    local = LocalModelBackend.from_env()
+    if local.available():
+        backends.append(local)
+    backends.append(HeuristicBackend())
+    return BackendRouter(backends, latency_budget=latency_budget, timeout=timeout)
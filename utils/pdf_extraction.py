@@ -0,0 +1,84 @@
+"""
+Streaming PDF text extraction
+Pages are yielded one at a time and joined once, with a page cap and a text byte
+budget so an oversized upload can't pin a worker. Long documents can be split
+into page ranges and extracted in a process pool - opt in with workers, since
+forking from a server thread (Streamlit, asyncio.to_thread) isn't safe.
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import PyPDF2
+
+# Form feed between pages - keeps page boundaries visible to later preprocessing
+PAGE_SEPARATOR = "\f"
+
+MAX_PAGES = 100
+MAX_TEXT_BYTES = 512 * 1024
+
+# Below this many pages a process pool costs more than it saves
+PARALLEL_MIN_PAGES = 48
+
+
+def _page_texts(reader: PyPDF2.PdfReader, start: int, stop: Optional[int]) -> Iterator[str]:
+    stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+    for index in range(start, stop):
+        yield reader.pages[index].extract_text() or ""
+
+
+def iter_pdf_pages(file_bytes: bytes, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """Yield the text of pages [start, stop) one at a time"""
+    return _page_texts(PyPDF2.PdfReader(io.BytesIO(file_bytes)), start, stop)
+
+
+def within_budget(pages: Iterable[str], max_bytes: Optional[int]) -> Iterator[str]:
+    """Pass pages through until max_bytes of UTF-8 text is reached, truncating the last page"""
+    if max_bytes is None:
+        yield from pages
+        return
+
+    produced = 0
+    for text in pages:
+        encoded = text.encode('utf-8')
+        if produced + len(encoded) >= max_bytes:
+            yield encoded[:max_bytes - produced].decode('utf-8', errors='ignore')
+            return
+        produced += len(encoded) + len(PAGE_SEPARATOR)
+        yield text
+
+
+def _extract_range(args: Tuple[bytes, int, int, Optional[int]]) -> List[str]:
+    """Process pool worker - each worker parses the PDF itself (readers don't pickle)"""
+    file_bytes, start, stop, max_bytes = args
+    return list(within_budget(iter_pdf_pages(file_bytes, start, stop), max_bytes))
+
+
+def extract_pdf_text(file_bytes: bytes, max_pages: int = MAX_PAGES, max_bytes: int = MAX_TEXT_BYTES,
+                     workers: Optional[int] = 1, parallel_min_pages: int = PARALLEL_MIN_PAGES) -> str:
+    """
+    Extract text from the first max_pages pages, pages separated by PAGE_SEPARATOR
+
+    Args:
+        max_pages: Pages beyond this are ignored
+        max_bytes: Budget for the extracted text; extraction stops once it is reached
+        workers: Process pool size for long documents (1 = serial, the default; None = CPU count).
+            Only pass more from standalone batch processes, never from a request thread
+        parallel_min_pages: Documents with fewer pages are always extracted serially
+    """
+    reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
+    pages = min(len(reader.pages), max_pages)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or pages < parallel_min_pages:
+        return PAGE_SEPARATOR.join(within_budget(_page_texts(reader, 0, pages), max_bytes))
+
+    chunk = -(-pages // workers)
+    ranges = [(file_bytes, start, min(start + chunk, pages), max_bytes) for start in range(0, pages, chunk)]
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        # Each range is budgeted in its worker; ranges come back in order for the overall budget
+        page_texts = chain.from_iterable(pool.map(_extract_range, ranges))
+        return PAGE_SEPARATOR.join(within_budget(page_texts, max_bytes))
@@ -0,0 +1,250 @@
+"""
+Deadlines, retries, hedging and a circuit breaker for async model calls
+ResilientCaller wraps a coroutine factory so a slow or failing LLM backend costs a
+bounded amount of time: every attempt has a timeout, transient errors are retried
+with jittered backoff, a duplicate request is raced against attempts that run past
+the observed p95, and repeated failures open a breaker that fails fast.
+"""
+
+import asyncio
+import random
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Coroutine, Optional, Tuple, Type, TypeVar
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    _GOOGLE_TRANSIENT: Tuple[Type[BaseException], ...] = (
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.InternalServerError,
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+    )
+except ImportError:
+    _GOOGLE_TRANSIENT = ()
+
+T = TypeVar('T')
+
+
+class TransientError(Exception):
+    """Raised by model stand-ins for failures that are worth retrying"""
+
+
+class CircuitOpenError(Exception):
+    """The breaker is open - the backend failed too often recently"""
+
+
+# Timeouts, dropped connections, 5xx and rate limiting; anything else (bad request,
+# auth, unparseable output, and OSErrors such as a missing file) fails on the first attempt
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (
+    asyncio.TimeoutError, TimeoutError, socket.timeout, ConnectionError, TransientError,
+) + _GOOGLE_TRANSIENT
+
+
+def is_transient(error: BaseException) -> bool:
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failures; after reset_timeout
+    one trial call is let through (half-open) and its outcome closes or re-opens it
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError unless a call may go through now
+
+        Returns True when the call is the half-open trial - the caller must then record
+        its outcome or call end_trial (e.g. when it is cancelled) to free the slot.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                raise CircuitOpenError(
+                    f"Model backend unavailable after {self._failures} consecutive failures - retry later"
+                )
+            self._trial_in_flight = True
+            return True
+
+    def end_trial(self):
+        """Give up the trial slot without an outcome, so the next call can probe instead"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """None until min_samples calls have been observed"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class ResilientCaller:
+    """Run an async call under a per-attempt timeout, retries, optional hedging and a circuit breaker"""
+
+    def __init__(self, timeout: float = 60.0, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 deadline: Optional[float] = None, hedge_percentile: Optional[float] = None,
+                 breaker: CircuitBreaker = None, latency: LatencyTracker = None):
+        """
+        Args:
+            timeout: Seconds allowed for one attempt
+            attempts: Maximum attempts for transient errors (1 = no retries)
+            base_delay: Backoff before the second attempt, doubled for each further one
+            max_delay: Upper bound on a single backoff
+            deadline: Seconds allowed for the whole call including retries (None = attempts * timeout)
+            hedge_percentile: Start a duplicate request once an attempt runs past this latency
+                percentile (e.g. 95); None disables hedging
+            breaker: Shared circuit breaker (a new one by default)
+            latency: Shared latency window used for the hedge threshold
+        """
+        self.timeout = timeout
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = latency or LatencyTracker()
+        self.retries = 0
+        self.hedges = 0
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Jittered exponential backoff after the given (1-based) failed attempt"""
+        return min(self.max_delay, self.base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+    async def _timed(self, make_call: Callable[[], Awaitable[T]], timeout: float) -> T:
+        start = time.monotonic()
+        result = await asyncio.wait_for(make_call(), timeout)
+        self.latency.record(time.monotonic() - start)
+        return result
+
+    async def _attempt(self, make_call: Callable[[], Awaitable[T]], timeout: float) -> T:
+        """One attempt, raced against a hedge request if it runs past the latency percentile"""
+        hedge_after = self.latency.percentile(self.hedge_percentile) if self.hedge_percentile else None
+        if hedge_after is None or hedge_after >= timeout:
+            return await self._timed(make_call, timeout)
+
+        primary = asyncio.ensure_future(self._timed(make_call, timeout))
+        pending = {primary}
+        error = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if done:
+                return primary.result()
+
+            self.hedges += 1
+            pending.add(asyncio.ensure_future(self._timed(make_call, timeout - hedge_after)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, make_call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await make_call() (called again for every attempt/hedge) and return its result
+
+        Raises CircuitOpenError without calling when the breaker is open, otherwise the
+        last error once attempts or the deadline run out.
+        """
+        trial = self.breaker.before_call()
+        try:
+            return await self._call(make_call)
+        finally:
+            if trial:
+                # No-op once an outcome was recorded; frees the slot if the call was cancelled
+                self.breaker.end_trial()
+
+    async def _call(self, make_call: Callable[[], Awaitable[T]]) -> T:
+        deadline = self.deadline if self.deadline is not None else self.timeout * self.attempts
+        give_up_at = time.monotonic() + deadline
+
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = give_up_at - time.monotonic()
+            try:
+                result = await self._attempt(make_call, min(self.timeout, remaining))
+            except Exception as e:
+                if not is_transient(e):
+                    # The backend answered - a bad request says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                delay = self.backoff_delay(attempt)
+                if attempt >= self.attempts or time.monotonic() + delay >= give_up_at:
+                    self.breaker.record_failure()
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise TimeoutError(f"Model call timed out after {attempt} attempt(s)") from e
+                    raise
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+
+class BackgroundLoop:
+    """An event loop on a daemon thread, for submitting coroutines from synchronous code"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='async-model-calls', daemon=True)
+        self._thread.start()
+
+    def submit(self, coro: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
@@ -1,31 +1,137 @@
-import google.generativeai as genai
-import json
-import re
-from typing import Dict, Any
-import PyPDF2
+import asyncio
+import textwrap
+import threading
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Dict, Any, Coroutine, FrozenSet, Iterable, List, Optional, Tuple, Union
 import docx
 import io
+from utils.parse_cache import ParseCache
+from utils.pdf_extraction import extract_pdf_text
+from utils.text_preprocessor import DEFAULT_TOKEN_BUDGET, PreparedText, prepare_resume_text
+from utils.candidate_schema import (
+    FIELDS_BY_NAME, batch_response_schema, coerce_candidate, prompt_field_list, response_schema
+)
+from utils.fast_extractor import extract_fields
+from utils.json_repair import decode_json_object
+from utils.parser_backends import (
+    BATCH_END, BATCH_START, MODEL_NAME, GeminiBackend, HeuristicBackend, default_router
+)
+from utils.resilience import BackgroundLoop, CircuitOpenError, ResilientCaller
+
+# Bump whenever the prompt or post-processing changes so cached parses are not reused
+PROMPT_VERSION = '4'
+
+# Offline parses are the fallback router's heuristic parses - same cache entries
+OFFLINE_MODEL_NAME = HeuristicBackend.name
+
+GENERATION_CONFIG = {
+    'temperature': 0.2,
+    'top_p': 0.8,
+    'top_k': 40,
+    'max_output_tokens': 4096,
+    'response_mime_type': 'application/json',
+}
+
+# Model calls per document when the answer contains no recoverable JSON object
+MAX_OUTPUT_ATTEMPTS = 2
+
+# Batch mode: several resumes per request, each between BATCH_START / BATCH_END lines
+BATCH_MAX_OUTPUT_TOKENS = 8192
+
+SUPPORTED_EXTENSIONS = ('pdf', 'docx', 'doc', 'txt')
+
+# (fields a note is about, note) - notes are left out when all their fields were extracted locally
+PROMPT_NOTES = [
+    (('state_jk',), 'For locations, check if resume mentions Jammu, Kashmir, Srinagar, or J&K and set state_jk to 1'),
+    (('longevity_years',), 'For longevity_years: Calculate average time spent at each job (total experience / number of jobs)'),
+    (('ug_institute', 'pg_institute', 'phd_institute'),
+     'For premier institutes (IIT/NIT/IIIT/top universities): Set respective field to 1'),
+    (('workshops', 'trainings', 'total_papers', 'total_patents', 'books', 'achievements'),
+     'Count all workshops, trainings, papers, patents, books, achievements carefully'),
+    ((), 'If information is not available, use 0 for numbers, "" for strings, [] for arrays, "None" for optional education'),
+    ((), 'A line "[... N more lines omitted from this section]" stands for N further entries of that section - include them in counts'),
+]
+
+@lru_cache(maxsize=64)
+def generation_config(excluded: FrozenSet[str] = frozenset()) -> Dict[str, Any]:
+    """GENERATION_CONFIG plus the structured-output schema for the fields still asked for"""
+    return {**GENERATION_CONFIG, 'response_schema': response_schema(excluded)}
+
+
+@lru_cache(maxsize=64)
+def batch_generation_config(excluded: FrozenSet[str] = frozenset()) -> Dict[str, Any]:
+    return {**GENERATION_CONFIG, 'max_output_tokens': BATCH_MAX_OUTPUT_TOKENS,
+            'response_schema': batch_response_schema(excluded)}
+
 
 class ResumeParser:
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        
-        # Use the correct model name without 'models/' prefix
-        # This is the standard model name that works with most API keys
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+    def __init__(self, api_key: str = None, cache: ParseCache = None, model: Any = None,
+                 token_budget: Optional[int] = DEFAULT_TOKEN_BUDGET, fast_path: bool = True,
+                 offline: bool = False, resilience: ResilientCaller = None, fallback: bool = True,
+                 latency_budget: Optional[float] = None, backend_timeout: Optional[float] = None):
+        """
+        Args:
+            api_key: Gemini API key
+            cache: Optional parse cache shared across uploads
+            model: Model backend to use instead of Gemini (a ParserBackend, BackendRouter or stub_model.StubModel)
+            token_budget: Maximum estimated tokens of resume text sent to the model (None = no limit)
+            fast_path: Extract rule-decidable fields locally and leave them out of the prompt
+            offline: Never call a model - return only locally extracted fields plus defaults
+            resilience: Timeouts/retries/hedging/circuit breaker for the async path
+            fallback: Route through default_router - when Gemini is unreachable or over quota,
+                requests go to a local model (LOCAL_MODEL_PATH) or heuristic rules; other
+                Gemini errors (bad key, rejected request) still raise
+            latency_budget: With fallback, skip Gemini while its p95 latency exceeds this many seconds
+            backend_timeout: With fallback, seconds each backend gets on the async path before
+                the next one is tried (default: half the resilience timeout)
+        """
+        self.fast_path = fast_path
+        self.offline = offline
+        self.model_name = OFFLINE_MODEL_NAME if offline else MODEL_NAME
+        self.resilience = resilience or ResilientCaller()
+        if backend_timeout is None:
+            # The resilience timeout covers the whole router call - leave room for the fallbacks
+            backend_timeout = self.resilience.timeout / 2
+        if offline:
+            self.model = None
+        elif model is None:
+            self.model = (default_router(api_key, latency_budget, backend_timeout) if fallback
+                          else GeminiBackend(api_key))
+        else:
+            self.model = model
+        self.cache = cache
+        self.token_budget = token_budget
+        # Model answers: decoded cleanly, recovered from truncated/malformed JSON,
+        # with fields coerced to their schema type, re-requested, or given up on
+        # Batch requests count as one response; batch_fallbacks are documents re-sent on their own
+        self.output_stats = dict.fromkeys(
+            ('responses', 'repaired', 'coerced', 'rerequested', 'failed', 'batches', 'batch_fallbacks'), 0
+        )
+        # Counted from request threads and the background loop alike
+        self._stats_lock = threading.Lock()
+        self._loop: Optional[BackgroundLoop] = None
     
-    def extract_text_from_pdf(self, file_bytes: bytes) -> str:
-        """Extract text from PDF file"""
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.output_stats[key] += n
+    
+    @staticmethod
+    def extract_text_from_pdf(file_bytes: bytes, workers: Optional[int] = 1) -> str:
+        """
+        Extract text from PDF file, pages separated by form feeds
+        
+        Capped at MAX_PAGES pages / MAX_TEXT_BYTES of text. Serial by default;
+        workers > 1 (or None = CPU count) extracts long documents page-parallel in
+        a process pool - for batch scripts only, not the app.
+        """
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
+            return extract_pdf_text(file_bytes, workers=workers)
         except Exception as e:
             raise Exception(f"Error extracting PDF: {str(e)}")
     
-    def extract_text_from_docx(self, file_bytes: bytes) -> str:
+    @staticmethod
+    def extract_text_from_docx(file_bytes: bytes) -> str:
         """Extract text from DOCX file"""
         try:
             doc = docx.Document(io.BytesIO(file_bytes))
@@ -34,151 +140,379 @@ class ResumeParser:
         except Exception as e:
             raise Exception(f"Error extracting DOCX: {str(e)}")
     
-    def extract_text_from_txt(self, file_bytes: bytes) -> str:
+    @staticmethod
+    def extract_text_from_txt(file_bytes: bytes) -> str:
         """Extract text from TXT file"""
         try:
             return file_bytes.decode('utf-8')
         except Exception as e:
             raise Exception(f"Error extracting TXT: {str(e)}")
     
-    def parse_resume(self, file_bytes: bytes, filename: str) -> Dict[str, Any]:
-        """Main method to parse resume using Gemini API"""
-        
-        # Extract text based on file type
+    @staticmethod
+    def extract_text(file_bytes: bytes, filename: str, workers: Optional[int] = 1) -> str:
+        """Extract text based on file type (workers only applies to PDFs)"""
         file_extension = filename.lower().split('.')[-1]
         
         if file_extension == 'pdf':
-            resume_text = self.extract_text_from_pdf(file_bytes)
+            return ResumeParser.extract_text_from_pdf(file_bytes, workers)
         elif file_extension in ['docx', 'doc']:
-            resume_text = self.extract_text_from_docx(file_bytes)
+            return ResumeParser.extract_text_from_docx(file_bytes)
         elif file_extension == 'txt':
-            resume_text = self.extract_text_from_txt(file_bytes)
+            return ResumeParser.extract_text_from_txt(file_bytes)
         else:
             raise ValueError("Unsupported file format. Please upload PDF, DOCX, or TXT")
+    
+    def get_cached_parse(self, file_bytes: bytes) -> Optional[Dict[str, Any]]:
+        """Return a previous parse of identical file bytes, if cached"""
+        if self.cache is None:
+            return None
+        return self.cache.get(self.cache.make_key(file_bytes, PROMPT_VERSION, self.model_name))
+    
+    def parse_resume(self, file_bytes: bytes, filename: str) -> Dict[str, Any]:
+        """Main method to parse resume using Gemini API"""
+        
+        # Identical uploads are served from the parse cache without calling Gemini
+        cached = self.get_cached_parse(file_bytes)
+        if cached is not None:
+            return cached
+        
+        resume_text = self.extract_text(file_bytes, filename)
+        return self.parse_text(resume_text, file_bytes)
+    
+    def prepare_text(self, resume_text: str) -> PreparedText:
+        """Strip boilerplate and fit extracted text into the token budget"""
+        return prepare_resume_text(resume_text, self.token_budget)
+    
+    @property
+    def uses_local_fields(self) -> bool:
+        """Whether rule-based fields are extracted locally (fast path or offline)"""
+        return self.fast_path or self.offline
+    
+    def extract_local_fields(self, resume_text: str) -> Dict[str, Any]:
+        """Rule-based fields for the full (untrimmed) text - empty if the fast path is off"""
+        if not self.uses_local_fields:
+            return {}
+        return extract_fields(resume_text)
+    
+    @staticmethod
+    def _instructions(excluded: set) -> Tuple[str, str]:
+        """(field list, numbered notes) of the prompt, indented for the template"""
+        notes = [note for fields, note in PROMPT_NOTES if not fields or not set(fields) <= excluded]
+        notes_text = '\n'.join(f"        {i}. {note}" for i, note in enumerate(notes, 1))
+        return textwrap.indent(prompt_field_list(excluded), '        '), notes_text
+    
+    def build_prompt(self, resume_text: str, exclude: Iterable[str] = ()) -> str:
+        """Extraction prompt asking for every schema field except those in exclude"""
+        field_list, notes_text = self._instructions(set(exclude))
         
-        # Enhanced Gemini parsing prompt based on your original
-        prompt = f"""
+        return f"""
         Extract structured information from the following resume and return it in JSON format.
         Use double quotes for all keys and string values.
         
         Extract ALL of the following fields (use 0 for missing numbers, empty string "" for missing text, empty array [] for missing lists):
         
-        REQUIRED FIELDS:
-        - name: string (full name)
-        - email: string 
-        - phone: string
-        - address: string
-        - summary: string (professional summary)
-        
-        EDUCATION:
-        - ug_institute_name: string (undergraduate institution full name)
-        - ug_institute_code: string (UG institution abbreviation/code if mentioned)
-        - pg_institute_name: string (postgraduate institution, "None" if not applicable)
-        - pg_institute_code: string (PG institution abbreviation/code, "None" if not applicable)
-        - phd_institute_name: string (PhD institution, "None" if not applicable)
-        - phd_institute_code: string (PhD institution abbreviation/code, "None" if not applicable)
-        - ug_institute: number (1 if IIT/NIT/IIIT/Tier-1 institution, else 0)
-        - pg_institute: number (1 if IIT/NIT/IIIT/Tier-1 institution, else 0)
-        - phd_institute: number (1 if IIT/NIT/IIIT/Tier-1 institution, else 0)
-        
-        EXPERIENCE:
-        - longevity_years: number (average tenure at each job in years - calculate by total years / number of jobs)
-        - average_experience: number (total professional work experience in years)
-        - number_of_unique_designations: number (count of unique job titles/positions held)
-        
-        PROFESSIONAL DEVELOPMENT:
-        - workshops: number (count of workshops attended)
-        - trainings: number (count of training programs completed)
-        - workshops_list: array of strings (list workshop names)
-        - trainings_list: array of strings (list training program names)
-        
-        RESEARCH & PUBLICATIONS:
-        - total_papers: number (research papers published)
-        - total_patents: number (patents filed/granted)
-        - books: number (books authored/co-authored)
-        - research_papers_list: array of strings (list paper titles)
-        - patents_list: array of strings (list patent titles)
-        - books_list: array of strings (list book titles)
-        
-        ACHIEVEMENTS:
-        - achievements: number (count of awards/achievements)
-        - achievements_list: array of strings (list achievement descriptions)
-        
-        LOCATION:
-        - state_jk: number (1 if from Jammu & Kashmir or mentions J&K, else 0)
-        
-        SKILLS:
-        - skills: array of strings (technical and soft skills)
-        - skills_count: number (count of skills)
-        
-        PROJECTS:
-        - projects: array of strings (project names/descriptions)
-        - projects_count: number (count of projects)
-        
-        ADDITIONAL:
-        - best_fit_for: string (suggest 1-2 suitable job roles based on profile)
+{field_list}
         
         IMPORTANT NOTES:
-        1. For locations, check if resume mentions Jammu, Kashmir, Srinagar, or J&K and set state_jk to 1
-        2. For longevity_years: Calculate average time spent at each job (total experience / number of jobs)
-        3. For premier institutes (IIT/NIT/IIIT/top universities): Set respective field to 1
-        4. Count all workshops, trainings, papers, patents, books, achievements carefully
-        5. If information is not available, use 0 for numbers, "" for strings, [] for arrays, "None" for optional education
+{notes_text}
         
         Resume Text:
         {resume_text}
         
         Return ONLY a valid JSON object. Do not include markdown formatting or code blocks.
         """
+    
+    def build_batch_prompt(self, resume_texts: List[str], exclude: Iterable[str] = ()) -> str:
+        """One prompt for several resumes - the instructions are sent once, resumes are delimited by id"""
+        field_list, notes_text = self._instructions(set(exclude))
+        documents = '\n\n'.join(
+            f"{BATCH_START.format(doc_id=i)}\n{text}\n{BATCH_END.format(doc_id=i)}"
+            for i, text in enumerate(resume_texts, 1)
+        )
+        
+        return f"""
+        Extract structured information from each of the following {len(resume_texts)} resumes.
+        Each resume is between a {BATCH_START.format(doc_id='<id>')} line and a {BATCH_END.format(doc_id='<id>')} line.
+        Use double quotes for all keys and string values. Never mix information between resumes.
+        
+        For EACH resume extract ALL of the following fields (use 0 for missing numbers, empty string "" for missing text, empty array [] for missing lists):
+        
+{field_list}
+        
+        IMPORTANT NOTES:
+{notes_text}
+        
+        Resumes:
+{documents}
+        
+        Return ONLY a valid JSON object of the form {{"results": [...]}} with one entry per resume, in order,
+        each with "doc_id" set to the id from its delimiter lines. Do not include markdown formatting or code blocks.
+        """
+    
+    def _request(self, resume_text: str, preprocess: bool,
+                 local_fields: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """(local fields, prompt) for a parse - the prompt is None in offline mode"""
+        if local_fields is None:
+            local_fields = self.extract_local_fields(resume_text)
+        if self.offline:
+            return local_fields, None
+        if preprocess:
+            resume_text = self.prepare_text(resume_text).text
+        return local_fields, self.build_prompt(resume_text, exclude=local_fields)
+    
+    def _store(self, parsed_data: Dict[str, Any], file_bytes: Optional[bytes],
+               model_name: Optional[str] = None) -> Dict[str, Any]:
+        # Cached under the backend that produced it - a fallback parse is never served
+        # to a later lookup for the primary model
+        if self.cache is not None and file_bytes is not None:
+            key = self.cache.make_key(file_bytes, PROMPT_VERSION, model_name or self.model_name)
+            self.cache.put(key, parsed_data)
+        return parsed_data
+    
+    def _offline_parse(self, resume_text: str, local_fields: Dict[str, Any],
+                       file_bytes: Optional[bytes]) -> Dict[str, Any]:
+        return self._store({**HeuristicBackend.parse(resume_text), **local_fields}, file_bytes)
+    
+    def _decode(self, response_text: str) -> Optional[Dict[str, Any]]:
+        """Schema-validated candidate from a model answer, None if it holds no JSON object"""
+        self._count('responses')
+        decoded, repaired = decode_json_object(response_text)
+        if decoded is None:
+            return None
+        self._count('repaired', repaired)
+        candidate, fixed = coerce_candidate(decoded)
+        self._count('coerced', fixed > 0)
+        return candidate
+    
+    def _finish_parse(self, candidate: Dict[str, Any], local_fields: Dict[str, Any],
+                      file_bytes: Optional[bytes], response: Any = None) -> Dict[str, Any]:
+        # Rule-based fields are exact - they win over the model's reading
+        candidate.update(local_fields)
+        # Mark parses a fallback backend served, so they can be redone once the primary is back
+        backend = getattr(response, 'backend', None)
+        if backend is not None and backend != self.model_name:
+            candidate['parsed_by'] = backend
+        return self._store(candidate, file_bytes, backend)
+    
+    def _undecodable(self, response_text: str) -> Exception:
+        self._count('failed')
+        return Exception(f"Failed to parse Gemini response as JSON after {MAX_OUTPUT_ATTEMPTS} attempts\n"
+                         f"Response: {response_text}")
+    
+    def parse_text(self, resume_text: str, file_bytes: bytes = None, preprocess: bool = True,
+                   local_fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Parse already-extracted resume text with Gemini (or rules only, if offline)
+        
+        If file_bytes is given the result is stored in the parse cache under that content.
+        Pass preprocess=False if the text already went through prepare_text; pass
+        local_fields (from extract_fields on the full text) when the text was trimmed,
+        so counts come from the untrimmed document.
+        """
+        local_fields, prompt = self._request(resume_text, preprocess, local_fields)
+        if prompt is None:
+            return self._offline_parse(resume_text, local_fields, file_bytes)
+        config = generation_config(frozenset(local_fields))
         
         try:
-            # Generate content with explicit configuration
-            generation_config = {
-                'temperature': 0.2,
-                'top_p': 0.8,
-                'top_k': 40,
-                'max_output_tokens': 4096,
-            }
-            
-            response = self.model.generate_content(
-                prompt,
-                generation_config=generation_config
+            for attempt in range(MAX_OUTPUT_ATTEMPTS):
+                if attempt:
+                    self._count('rerequested')
+                response = self.model.generate_content(prompt, generation_config=config)
+                response_text = response.text
+                candidate = self._decode(response_text)
+                if candidate is not None:
+                    return self._finish_parse(candidate, local_fields, file_bytes, response)
+        except Exception as e:
+            raise Exception(f"Error parsing resume: {str(e)}")
+        raise self._undecodable(response_text)
+    
+    async def parse_text_async(self, resume_text: str, file_bytes: bytes = None, preprocess: bool = True,
+                               local_fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        parse_text on the async Gemini client, under the parser's ResilientCaller
+        
+        Each model call gets a deadline, transient errors are retried with jitter and
+        slow calls may be hedged. TimeoutError and CircuitOpenError are raised as-is so
+        callers can tell "backend unavailable" from a bad resume.
+        """
+        local_fields, prompt = self._request(resume_text, preprocess, local_fields)
+        if prompt is None:
+            return self._offline_parse(resume_text, local_fields, file_bytes)
+        config = generation_config(frozenset(local_fields))
+        
+        try:
+            for attempt in range(MAX_OUTPUT_ATTEMPTS):
+                if attempt:
+                    self._count('rerequested')
+                response = await self.resilience.call(
+                    lambda: self.model.generate_content_async(prompt, generation_config=config)
+                )
+                response_text = response.text
+                candidate = self._decode(response_text)
+                if candidate is not None:
+                    return self._finish_parse(candidate, local_fields, file_bytes, response)
+        except (TimeoutError, CircuitOpenError):
+            raise
+        except Exception as e:
+            raise Exception(f"Error parsing resume: {str(e)}")
+        raise self._undecodable(response_text)
+    
+    def _batch_request(self, resume_texts: List[str], preprocess: bool,
+                       local_fields_list: Optional[List[Dict[str, Any]]]
+                       ) -> Tuple[List[Dict[str, Any]], FrozenSet[str], str]:
+        """(local fields per document, fields left out of the prompt, prompt) for a batch"""
+        if local_fields_list is None:
+            local_fields_list = [self.extract_local_fields(text) for text in resume_texts]
+        if preprocess:
+            resume_texts = [self.prepare_text(text).text for text in resume_texts]
+        # Only fields filled locally for every document can be left out of a shared prompt
+        excluded = frozenset.intersection(*(frozenset(fields) for fields in local_fields_list))
+        return local_fields_list, excluded, self.build_batch_prompt(resume_texts, excluded)
+    
+    def _split_batch(self, response_text: str, count: int,
+                     excluded: FrozenSet[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Validated candidate per document; None where the answer has no usable entry for it
+        
+        Unlike a single answer, an entry missing requested fields (e.g. the one cut off
+        by a truncated response) is rejected - re-parsing that document alone is cheap.
+        """
+        required = [name for name in FIELDS_BY_NAME if name not in excluded]
+        self._count('responses')
+        self._count('batches')
+        candidates: List[Optional[Dict[str, Any]]] = [None] * count
+        decoded, repaired = decode_json_object(response_text)
+        results = decoded.get('results') if decoded else None
+        if not isinstance(results, list):
+            return candidates
+        self._count('repaired', repaired)
+        
+        for item in results:
+            if not isinstance(item, dict):
+                continue
+            try:
+                index = int(str(item.pop('doc_id', '')).strip()) - 1
+            except ValueError:
+                continue
+            if 0 <= index < count and candidates[index] is None and all(name in item for name in required):
+                candidate, fixed = coerce_candidate(item)
+                self._count('coerced', fixed > 0)
+                candidates[index] = candidate
+        return candidates
+    
+    def _fallbacks(self, candidates: List[Optional[Dict[str, Any]]]) -> List[int]:
+        missing = [i for i, candidate in enumerate(candidates) if candidate is None]
+        self._count('batch_fallbacks', len(missing))
+        return missing
+    
+    def parse_batch(self, resume_texts: List[str], file_bytes_list: Optional[List[bytes]] = None,
+                    preprocess: bool = True, local_fields_list: Optional[List[Dict[str, Any]]] = None,
+                    return_exceptions: bool = False) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Parse several resumes with one model request, in input order
+        
+        Documents the batch answer has no valid entry for (missing, wrong doc_id,
+        truncated away) are re-parsed one at a time with parse_text. With
+        return_exceptions, a document whose fallback fails gets its exception in
+        the result list instead of failing the whole batch.
+        """
+        if not resume_texts:
+            return []
+        file_bytes_list = file_bytes_list or [None] * len(resume_texts)
+        if self.offline or len(resume_texts) == 1:
+            local_fields_list = local_fields_list or [None] * len(resume_texts)
+            return [self._single(text, data, preprocess, local, return_exceptions)
+                    for text, data, local in zip(resume_texts, file_bytes_list, local_fields_list)]
+        
+        local_fields_list, excluded, prompt = self._batch_request(resume_texts, preprocess, local_fields_list)
+        config = batch_generation_config(excluded)
+        try:
+            response = self.model.generate_content(prompt, generation_config=config)
+        except Exception as e:
+            raise Exception(f"Error parsing resume batch: {str(e)}")
+        candidates = self._split_batch(response.text, len(resume_texts), excluded)
+        
+        results: List[Union[Dict[str, Any], Exception]] = [None] * len(resume_texts)
+        for i, candidate in enumerate(candidates):
+            if candidate is not None:
+                results[i] = self._finish_parse(candidate, local_fields_list[i], file_bytes_list[i], response)
+        for i in self._fallbacks(candidates):
+            results[i] = self._single(resume_texts[i], file_bytes_list[i], preprocess, local_fields_list[i],
+                                      return_exceptions)
+        return results
+    
+    def _single(self, resume_text: str, file_bytes: Optional[bytes], preprocess: bool,
+                local_fields: Optional[Dict[str, Any]], return_exceptions: bool):
+        try:
+            return self.parse_text(resume_text, file_bytes, preprocess, local_fields)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return e
+    
+    async def parse_batch_async(self, resume_texts: List[str], file_bytes_list: Optional[List[bytes]] = None,
+                                preprocess: bool = True, local_fields_list: Optional[List[Dict[str, Any]]] = None,
+                                return_exceptions: bool = False) -> List[Union[Dict[str, Any], Exception]]:
+        """parse_batch on the async client, under the parser's ResilientCaller; fallbacks run concurrently"""
+        if not resume_texts:
+            return []
+        file_bytes_list = file_bytes_list or [None] * len(resume_texts)
+        if self.offline or len(resume_texts) == 1:
+            local_fields_list = local_fields_list or [None] * len(resume_texts)
+            return list(await asyncio.gather(
+                *(self.parse_text_async(text, data, preprocess, local)
+                  for text, data, local in zip(resume_texts, file_bytes_list, local_fields_list)),
+                return_exceptions=return_exceptions
+            ))
+        
+        local_fields_list, excluded, prompt = self._batch_request(resume_texts, preprocess, local_fields_list)
+        config = batch_generation_config(excluded)
+        try:
+            response = await self.resilience.call(
+                lambda: self.model.generate_content_async(prompt, generation_config=config)
             )
-            
-            response_text = response.text.strip()
-            
-            # Clean up response - remove markdown code blocks if present
-            response_text = re.sub(r'^```json\s*', '', response_text)
-            response_text = re.sub(r'^```\s*', '', response_text)
-            response_text = re.sub(r'\s*```$', '', response_text)
-            response_text = response_text.strip()
-            
-            parsed_data = json.loads(response_text)
-            
-            # Ensure all required fields exist with default values
-            default_values = {
-                'name': '', 'email': '', 'phone': '', 'address': '', 'summary': '',
-                'ug_institute_name': '', 'ug_institute_code': '',
-                'pg_institute_name': 'None', 'pg_institute_code': 'None',
-                'phd_institute_name': 'None', 'phd_institute_code': 'None',
-                'longevity_years': 0.0, 'average_experience': 0.0,
-                'workshops': 0, 'trainings': 0, 'total_papers': 0,
-                'total_patents': 0, 'achievements': 0, 'books': 0,
-                'state_jk': 0, 'number_of_unique_designations': 0,
-                'ug_institute': 0, 'pg_institute': 0, 'phd_institute': 0,
-                'workshops_list': [], 'trainings_list': [],
-                'research_papers_list': [], 'patents_list': [], 'books_list': [],
-                'achievements_list': [], 'skills': [], 'skills_count': 0,
-                'projects': [], 'projects_count': 0, 'best_fit_for': ''
-            }
-            
-            for key, default_val in default_values.items():
-                if key not in parsed_data:
-                    parsed_data[key] = default_val
-            
-            return parsed_data
-            
-        except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse Gemini response as JSON: {str(e)}\nResponse: {response_text}")
+        except (TimeoutError, CircuitOpenError):
+            raise
         except Exception as e:
-            raise Exception(f"Error parsing resume: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error parsing resume batch: {str(e)}")
+        candidates = self._split_batch(response.text, len(resume_texts), excluded)
+        
+        results: List[Union[Dict[str, Any], Exception]] = [None] * len(resume_texts)
+        for i, candidate in enumerate(candidates):
+            if candidate is not None:
+                results[i] = self._finish_parse(candidate, local_fields_list[i], file_bytes_list[i], response)
+        missing = self._fallbacks(candidates)
+        fallbacks = await asyncio.gather(
+            *(self.parse_text_async(resume_texts[i], file_bytes_list[i], preprocess, local_fields_list[i])
+              for i in missing),
+            return_exceptions=return_exceptions
+        )
+        for i, result in zip(missing, fallbacks):
+            results[i] = result
+        return results
+    
+    async def parse_resume_async(self, file_bytes: bytes, filename: str) -> Dict[str, Any]:
+        """parse_resume without blocking the event loop - extraction runs in a worker thread"""
+        cached = self.get_cached_parse(file_bytes)
+        if cached is not None:
+            return cached
+        
+        resume_text = await asyncio.to_thread(self.extract_text, file_bytes, filename)
+        return await self.parse_text_async(resume_text, file_bytes)
+    
+    def submit_async(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on this parser's background event loop"""
+        if self._loop is None:
+            self._loop = BackgroundLoop()
+        return self._loop.submit(coro)
+    
+    def run_async(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine from synchronous code (Streamlit, bulk ingestion) and wait for it
+        
+        All calls share one long-lived loop: the async Gemini client is bound to the
+        loop that first used it, so a fresh asyncio.run() per call would break it.
+        """
+        return self.submit_async(coro).result(timeout)
+
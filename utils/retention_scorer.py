@@ -4,7 +4,48 @@ Rule-based system for immediate deployment
 Predicts retention likelihood without requiring ML training data
 """
 
-from typing import Dict, Any, List
+from bisect import bisect_right
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Tuple
+from utils.big5_scoring import TRAIT_POSITION
+from utils.rounding import round2
+
+# Scoring tables - (lower bounds, score per bin), shared by the scalar methods (bisect)
+# and the batch path (np.digitize). Bin 0 is "below the first bound".
+STABILITY_BINS = ([1, 1.5, 2.5, 4], [20, 40, 60, 80, 100])
+ENGAGEMENT_BINS = ([1, 2, 3, 5], [40, 55, 70, 85, 100])
+FITMENT_FACTOR_BINS = {
+    'Experienced': ([45, 60, 75], [40, 60, 80, 100]),
+    'Other': ([40, 55, 70], [40, 60, 80, 100]),
+}
+
+# Risk flags in identify_risk_flags order - bit i of the batch 'risk_flags' mask is RISK_FLAGS[i]
+RISK_FLAGS = (
+    'Job Hopper Pattern',
+    'Low Professional Development',
+    'Low Conscientiousness (Retention Risk)',
+    'High Emotional Instability',
+    'Low Overall Fitment',
+    'Short Average Tenure',
+)
+
+
+def bin_score(bins: Tuple[List[float], List[float]], value: float) -> float:
+    """Score of the bin value falls in - the scalar counterpart of np.digitize(value, bounds)"""
+    bounds, values = bins
+    return values[bisect_right(bounds, value)]
+
+
+def risk_flag_mask(flags: List[str]) -> int:
+    """Bitmask over RISK_FLAGS for a list of flag names (calculate_retention_risk's 'risk_flags')"""
+    return sum(1 << RISK_FLAGS.index(flag) for flag in set(flags))
+
+
+def risk_flag_names(mask: int) -> List[str]:
+    """Flag names set in a 'risk_flags' bitmask, in identify_risk_flags order"""
+    return [flag for bit, flag in enumerate(RISK_FLAGS) if mask >> bit & 1]
+
 
 class RetentionScorer:
     """
@@ -30,19 +71,8 @@ class RetentionScorer:
         # Average tenure per job
         avg_tenure = longevity / max(unique_jobs, 1)
         
-        # Scoring logic
-        if avg_tenure >= 4:  # Very stable (4+ years per job)
-            stability = 100
-        elif avg_tenure >= 2.5:  # Stable (2.5-4 years)
-            stability = 80
-        elif avg_tenure >= 1.5:  # Moderate (1.5-2.5 years)
-            stability = 60
-        elif avg_tenure >= 1:  # Concerning (1-1.5 years)
-            stability = 40
-        else:  # High risk (<1 year per job)
-            stability = 20
-        
-        return stability
+        # <1 year per job is high risk, 4+ years very stable
+        return bin_score(STABILITY_BINS, avg_tenure)
     
     def calculate_personality_retention_score(self, big5_scores: Dict[str, int]) -> float:
         """
@@ -68,6 +98,22 @@ class RetentionScorer:
         
         return personality_retention
     
+    def personality_retention_scores(self, traits: np.ndarray) -> np.ndarray:
+        """
+        calculate_personality_retention_score for a (n, 5) trait matrix
+        (big5_scoring.score_answers output, columns in TRAITS order)
+        """
+        traits = np.asarray(traits, dtype=float)
+        conscientiousness_norm = (traits[:, TRAIT_POSITION['conscientiousness']] / 40) * 100
+        agreeableness_norm = (traits[:, TRAIT_POSITION['agreeableness']] / 40) * 100
+        neuroticism_norm = ((40 - traits[:, TRAIT_POSITION['neuroticism']]) / 40) * 100
+        
+        return (
+            conscientiousness_norm * 0.50 +
+            agreeableness_norm * 0.35 +
+            neuroticism_norm * 0.15
+        )
+    
     def calculate_engagement_score(self, candidate_data: Dict[str, Any]) -> float:
         """
         Calculate professional engagement indicator (0-100)
@@ -83,44 +129,16 @@ class RetentionScorer:
         # Calculate activity rate (normalized by experience)
         activity_rate = (workshops + trainings + papers*2 + patents*3 + achievements) / max(experience, 1)
         
-        # Scoring
-        if activity_rate >= 5:  # Highly engaged
-            engagement = 100
-        elif activity_rate >= 3:  # Very engaged
-            engagement = 85
-        elif activity_rate >= 2:  # Engaged
-            engagement = 70
-        elif activity_rate >= 1:  # Moderately engaged
-            engagement = 55
-        else:  # Low engagement
-            engagement = 40
-        
-        return engagement
+        # Low engagement below 1 activity per year, highly engaged from 5
+        return bin_score(ENGAGEMENT_BINS, activity_rate)
     
     def calculate_fitment_factor(self, fitment_score: float, category: str) -> float:
         """
         Adjust retention based on fitment score and category
         Higher fitment = higher retention likelihood
         """
-        # Category-specific thresholds
-        if category == 'Experienced':
-            if fitment_score >= 75:
-                return 100
-            elif fitment_score >= 60:
-                return 80
-            elif fitment_score >= 45:
-                return 60
-            else:
-                return 40
-        else:  # Fresher/Inexperienced
-            if fitment_score >= 70:
-                return 100
-            elif fitment_score >= 55:
-                return 80
-            elif fitment_score >= 40:
-                return 60
-            else:
-                return 40
+        # Category-specific thresholds - Fresher/Inexperienced share 'Other'
+        return bin_score(FITMENT_FACTOR_BINS['Experienced' if category == 'Experienced' else 'Other'], fitment_score)
     
     def identify_risk_flags(self, candidate_data: Dict[str, Any], 
                            big5_scores: Dict[str, int]) -> List[str]:
@@ -272,6 +290,111 @@ class RetentionScorer:
         
         return result
     
+    def calculate_retention_risk_batch(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized version of calculate_retention_risk for many candidates
+        
+        Args:
+            df: One row per candidate with the resume columns, the Big5 trait columns
+                (openness, ...), fitment_score and category. Missing columns or NaN
+                values get the scalar path's defaults; fitment_score is used both for
+                the fitment factor and the 'Low Overall Fitment' flag.
+        
+        Returns:
+            DataFrame (same index) with stability, personality, engagement,
+            fitment_factor, retention_score, retention_risk, risk_flags (bitmask over
+            RISK_FLAGS) and flag_count. Insight text isn't built here - expand the
+            rows you display with retention_details.
+        """
+        n = len(df)
+        
+        def column(name: str, default: float) -> np.ndarray:
+            if name not in df:
+                return np.full(n, default, dtype=float)
+            return pd.to_numeric(df[name], errors='coerce').fillna(default).to_numpy(dtype=float)
+        
+        longevity = column('longevity_years', 0)
+        unique_jobs = column('number_of_unique_designations', 0)
+        workshops = column('workshops', 0)
+        trainings = column('trainings', 0)
+        fitment = column('fitment_score', 0)
+        traits = np.column_stack([column(trait, 20) for trait in TRAIT_POSITION])
+        category = df['category'].to_numpy() if 'category' in df else np.full(n, 'Fresher')
+        
+        # Components
+        avg_tenure = longevity / np.maximum(unique_jobs, 1)
+        bounds, values = STABILITY_BINS
+        stability = np.asarray(values, dtype=float)[np.digitize(avg_tenure, bounds)]
+        
+        personality = self.personality_retention_scores(traits)
+        
+        activity_rate = (workshops + trainings + column('total_papers', 0) * 2 + column('total_patents', 0) * 3 +
+                         column('achievements', 0)) / np.maximum(column('average_experience', 0), 1)
+        bounds, values = ENGAGEMENT_BINS
+        engagement = np.asarray(values, dtype=float)[np.digitize(activity_rate, bounds)]
+        
+        experienced = category == 'Experienced'
+        fitment_factor = np.zeros(n)
+        for key, mask in (('Experienced', experienced), ('Other', ~experienced)):
+            bounds, values = FITMENT_FACTOR_BINS[key]
+            fitment_factor[mask] = np.asarray(values, dtype=float)[np.digitize(fitment[mask], bounds)]
+        
+        retention_score = (
+            stability * 0.30 +
+            personality * 0.35 +
+            engagement * 0.20 +
+            fitment_factor * 0.15
+        )
+        retention_risk = np.select([retention_score >= 70, retention_score >= 50], ['Low', 'Medium'], default='High')
+        
+        # Risk flags, one bit each in RISK_FLAGS order
+        conditions = [
+            (unique_jobs >= 4) & (avg_tenure < 1.5),
+            workshops + trainings < 2,
+            traits[:, TRAIT_POSITION['conscientiousness']] < 20,
+            traits[:, TRAIT_POSITION['neuroticism']] > 30,
+            fitment < 45,
+            avg_tenure < 1.5,
+        ]
+        risk_flags = np.zeros(n, dtype=np.int64)
+        for bit, condition in enumerate(conditions):
+            risk_flags |= condition.astype(np.int64) << bit
+        
+        return pd.DataFrame({
+            'stability': round2(stability),
+            'personality': round2(personality),
+            'engagement': round2(engagement),
+            'fitment_factor': round2(fitment_factor),
+            'retention_score': round2(retention_score),
+            'retention_risk': retention_risk,
+            'risk_flags': risk_flags,
+            'flag_count': np.sum(conditions, axis=0),
+        }, index=df.index)
+    
+    def retention_details(self, row: Any) -> Dict[str, Any]:
+        """
+        One calculate_retention_risk_batch row as the calculate_retention_risk result
+        
+        Flag names, description and insight text are built here, so a dashboard
+        pays for them only on the rows it shows.
+        """
+        risk_level = row['retention_risk']
+        result = {
+            'retention_score': float(row['retention_score']),
+            'retention_risk': risk_level,
+            'risk_description': self.risk_categories[risk_level],
+            'component_scores': {
+                'stability': float(row['stability']),
+                'personality': float(row['personality']),
+                'engagement': float(row['engagement']),
+                'fitment_factor': float(row['fitment_factor'])
+            },
+            'risk_flags': risk_flag_names(int(row['risk_flags'])),
+            'flag_count': int(row['flag_count'])
+        }
+        result['insights'] = self.generate_retention_insights(result)
+        return result
+    
     def get_retention_summary(self, retention_data: Dict[str, Any]) -> str:
         """
         Generate human-readable summary
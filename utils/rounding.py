@@ -0,0 +1,14 @@
+"""
+Rounding shared by the batch scorers
+Vectorized results have to round exactly like the scalar path's round(x, 2), which
+numpy's np.round (round-half-even on the binary value) does not always do.
+"""
+
+import numpy as np
+
+
+def round2(values: np.ndarray) -> np.ndarray:
+    """Round like Python's round(x, 2) - applied per unique value so results match the scalar path"""
+    uniques, inverse = np.unique(values, return_inverse=True)
+    rounded = np.array([round(float(v), 2) for v in uniques])
+    return rounded[inverse].reshape(values.shape)
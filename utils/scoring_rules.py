@@ -0,0 +1,131 @@
+"""
+Declarative fitment scoring rules
+Thresholds and weights live in a versioned JSON file (utils/fitment_rules.json by
+default, FITMENT_RULES_PATH to override) instead of if/elif chains. It is compiled
+once into breakpoint tables that both the scalar path (bisect) and the batch path
+(np.digitize) read, and its version is stored with every fitment score.
+
+Each feature maps a value to scores[i], where i is the number of breakpoints it has
+passed: with "closed": "left" (default) value >= breakpoint passes it, with
+"right" only value > breakpoint does. "equals" features score scores[1] when the
+value equals it, else scores[0].
+"""
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fitment_rules.json')
+
+
+class FeatureRule(NamedTuple):
+    name: str
+    key: str                       # short name in trait score dicts (O, C, ...); same as name otherwise
+    breakpoints: Tuple[float, ...]
+    scores: Tuple[float, ...]
+    weight: float
+    right: bool                    # breakpoints are upper bounds of their bin
+    equals: Optional[float]
+    breakpoint_array: np.ndarray
+    score_array: np.ndarray
+
+    def scorer(self) -> Callable[[float], float]:
+        """Scalar path - value -> score, as a closure over the tables"""
+        scores, breakpoints, equals = self.scores, self.breakpoints, self.equals
+        if equals is not None:
+            return lambda value: scores[1 if value == equals else 0]
+        bisect = bisect_left if self.right else bisect_right
+        return lambda value: scores[bisect(breakpoints, value)]
+
+    def score_values(self, values: np.ndarray) -> np.ndarray:
+        """Batch path - the same tables through np.digitize"""
+        if self.equals is not None:
+            return self.score_array[(values == self.equals).astype(int)]
+        return self.score_array[np.digitize(values, self.breakpoint_array, right=self.right)]
+
+
+class ScoringRules:
+    """A compiled rules file - build with load_rules"""
+
+    def __init__(self, config: Dict[str, Any], source: str = '<dict>'):
+        try:
+            self.version = str(config['version'])
+            categories = config['categories']
+            self.experienced_min = (float(categories['experienced']['min_longevity_years']),
+                                    float(categories['experienced']['min_average_experience']))
+            self.inexperienced_above = (float(categories['inexperienced']['above_longevity_years']),
+                                        float(categories['inexperienced']['above_average_experience']))
+            self.category_weights: Dict[str, Dict[str, float]] = {
+                category: {'dataset': weights['dataset'], 'big5': weights['big5']}
+                for category, weights in config['category_weights'].items()
+            }
+            self.dataset = [self._compile(rule, rule['feature']) for rule in config['dataset_features']]
+            self.big5 = [self._compile(rule, rule['trait']) for rule in config['big5_traits']]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid fitment rules in {source}: {str(e)}")
+        # (column, score function, weight) / (column, trait key, score function) for the scalar path
+        self.dataset_scorers = [(rule.name, rule.scorer(), rule.weight) for rule in self.dataset]
+        self.big5_scorers = [(rule.name, rule.key, rule.scorer()) for rule in self.big5]
+        self.feature_scorers = {name: score for name, score, _ in self.dataset_scorers}
+        missing = {'Experienced', 'Inexperienced', 'Fresher'} - set(self.category_weights)
+        if missing:
+            raise ValueError(f"Invalid fitment rules in {source}: no category_weights for {', '.join(sorted(missing))}")
+
+    @staticmethod
+    def _compile(rule: Dict[str, Any], name: str) -> FeatureRule:
+        scores = tuple(rule['scores'])
+        equals = rule.get('equals')
+        breakpoints = tuple(rule.get('breakpoints', ()))
+        if equals is None:
+            if list(breakpoints) != sorted(breakpoints):
+                raise ValueError(f"{name}: breakpoints must be ascending")
+            if len(scores) != len(breakpoints) + 1:
+                raise ValueError(f"{name}: needs one score per bin ({len(breakpoints) + 1})")
+        elif len(scores) != 2:
+            raise ValueError(f"{name}: an equals rule needs exactly two scores")
+        if rule.get('closed', 'left') not in ('left', 'right'):
+            raise ValueError(f"{name}: closed must be 'left' or 'right'")
+        return FeatureRule(
+            name=name,
+            key=rule.get('key', name),
+            breakpoints=breakpoints,
+            scores=scores,
+            weight=rule.get('weight', 1.0),
+            right=rule.get('closed', 'left') == 'right',
+            equals=equals,
+            breakpoint_array=np.asarray(breakpoints, dtype=float),
+            score_array=np.asarray(scores, dtype=float),
+        )
+
+    def categorize(self, longevity_years: float, average_experience: float) -> str:
+        """Experienced / Inexperienced / Fresher from the categories thresholds"""
+        min_longevity, min_experience = self.experienced_min
+        above_longevity, above_experience = self.inexperienced_above
+        if (longevity_years >= min_longevity) and (average_experience >= min_experience):
+            return "Experienced"
+        elif (longevity_years > above_longevity) and (average_experience > above_experience):
+            return "Inexperienced"
+        else:
+            return "Fresher"
+
+    def weights_for(self, category: str) -> Dict[str, float]:
+        return self.category_weights[category]
+
+    @property
+    def feature_names(self) -> List[str]:
+        return [rule.name for rule in self.dataset]
+
+
+@lru_cache(maxsize=8)
+def _load(path: str) -> ScoringRules:
+    with open(path, encoding='utf-8') as f:
+        return ScoringRules(json.load(f), path)
+
+
+def load_rules(path: Optional[str] = None) -> ScoringRules:
+    """Compiled rules from path (default: FITMENT_RULES_PATH or utils/fitment_rules.json), cached per file"""
+    return _load(os.path.abspath(path or os.getenv('FITMENT_RULES_PATH') or DEFAULT_RULES_PATH))
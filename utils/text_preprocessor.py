@@ -0,0 +1,247 @@
+"""
+Resume text preprocessing before the LLM call
+Normalizes whitespace, strips boilerplate (page headers/footers, repeated contact
+lines), splits the resume into sections and fits it into a token budget, so
+prompt size no longer grows with document length.
+"""
+
+import re
+from collections import Counter
+from typing import List, NamedTuple, Optional, Tuple
+
+from utils.pdf_extraction import PAGE_SEPARATOR
+
+# Rough Gemini tokenization for English text
+CHARS_PER_TOKEN = 4
+
+DEFAULT_TOKEN_BUDGET = 6000
+
+# Section heading keywords -> canonical section name
+SECTION_HEADINGS = {
+    'summary': ('summary', 'profile', 'objective', 'about me', 'career objective', 'professional summary'),
+    'education': ('education', 'academic', 'academics', 'qualification', 'qualifications', 'academic background'),
+    'experience': ('experience', 'employment', 'work history', 'professional experience', 'work experience',
+                   'career history', 'positions held'),
+    'publications': ('publications', 'research papers', 'papers', 'journal publications', 'conference publications',
+                     'research', 'research work'),
+    'patents': ('patents',),
+    'books': ('books', 'book chapters'),
+    'workshops': ('workshops', 'seminars', 'conferences attended', 'workshops attended', 'fdp', 'faculty development'),
+    'trainings': ('trainings', 'training', 'certifications', 'certificates', 'courses'),
+    'achievements': ('achievements', 'awards', 'honors', 'honours', 'awards and achievements', 'accomplishments'),
+    'skills': ('skills', 'technical skills', 'key skills', 'core competencies', 'competencies'),
+    'projects': ('projects', 'key projects', 'academic projects'),
+    'personal': ('personal details', 'personal information', 'personal profile'),
+    'hobbies': ('hobbies', 'interests', 'extracurricular', 'extra curricular activities'),
+    'references': ('references', 'referees'),
+    'declaration': ('declaration',),
+}
+
+_HEADING_LOOKUP = {keyword: section for section, keywords in SECTION_HEADINGS.items() for keyword in keywords}
+
+# Sections the parse needs least - dropped first when over budget
+DROP_ORDER = ('declaration', 'references', 'hobbies', 'personal')
+
+# Sections that are long lists of entries; each entry is shortened instead of dropped so counts survive
+LIST_SECTIONS = ('publications', 'patents', 'books', 'workshops', 'trainings', 'achievements', 'projects')
+
+MAX_LIST_ENTRY_CHARS = 120
+
+MAX_PAGE_NUMBER_LINE_CHARS = 30
+
+_EMAIL = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+_PHONE = re.compile(r'\+?\d[\d\s-]{8,}\d')
+_URL = re.compile(r'https?://\S+|www\.\S+|linkedin\.com/\S+', re.IGNORECASE)
+_DIGITS = re.compile(r'\d+')
+_INLINE_SPACE = re.compile(r'[ \t\u00a0\u200b]+')
+_CONTROL = re.compile(r'[\x00-\x08\x0b\x0e-\x1f\x7f]')
+
+
+class Section(NamedTuple):
+    name: str
+    lines: List[str]
+
+
+class PreparedText(NamedTuple):
+    text: str
+    original_tokens: int
+    tokens: int
+    sections: List[str]
+    truncated: bool
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse runs of spaces, strip each line and squeeze blank lines (page separators are kept)"""
+    pages = []
+    for page in text.split(PAGE_SEPARATOR):
+        lines = [_INLINE_SPACE.sub(' ', _CONTROL.sub('', line)).strip() for line in page.splitlines()]
+        pages.append(re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip())
+    return PAGE_SEPARATOR.join(pages)
+
+
+def _boilerplate_key(line: str) -> str:
+    # "Page 3 of 12" and "Page 4 of 12" are the same footer; longer lines must repeat
+    # exactly, otherwise numbered list entries ("12. A. Author ... 2019") would match
+    if len(line) <= MAX_PAGE_NUMBER_LINE_CHARS:
+        return _DIGITS.sub('#', line.lower())
+    return line.lower()
+
+
+def strip_repeated_headers(text: str, edge_lines: int = 3, min_pages: int = 3) -> str:
+    """
+    Drop header/footer lines repeated across pages
+
+    A line counts as boilerplate if it appears within edge_lines of the top or
+    bottom of at least half the pages (and at least min_pages pages). The first
+    occurrence is kept - running headers often carry the candidate's name.
+    """
+    pages = [page.split('\n') for page in text.split(PAGE_SEPARATOR)]
+    if len(pages) < min_pages:
+        return text
+
+    seen = Counter()
+    for lines in pages:
+        edges = {_boilerplate_key(line) for line in lines[:edge_lines] + lines[-edge_lines:] if line}
+        seen.update(edges)
+
+    threshold = max(min_pages, len(pages) // 2)
+    boilerplate = {key for key, count in seen.items() if count >= threshold}
+    if not boilerplate:
+        return text
+
+    cleaned = []
+    emitted = set()
+    for lines in pages:
+        edge = set(range(min(edge_lines, len(lines)))) | set(range(max(0, len(lines) - edge_lines), len(lines)))
+        kept = []
+        for i, line in enumerate(lines):
+            key = _boilerplate_key(line)
+            if i in edge and key in boilerplate:
+                # Page numbers are dropped outright
+                if key in emitted or '#' in key:
+                    continue
+                emitted.add(key)
+            kept.append(line)
+        cleaned.append('\n'.join(kept))
+    return PAGE_SEPARATOR.join(cleaned)
+
+
+def _is_contact_line(line: str) -> bool:
+    return bool(_EMAIL.search(line) or _PHONE.search(line) or _URL.search(line))
+
+
+def dedupe_contact_lines(lines: List[str]) -> List[str]:
+    """Keep the first occurrence of each contact line (email / phone / URL)"""
+    seen = set()
+    kept = []
+    for line in lines:
+        if _is_contact_line(line):
+            key = line.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(line)
+    return kept
+
+
+def heading_section(line: str) -> Optional[str]:
+    """Canonical section name if the line is a section heading, else None"""
+    if not line or len(line) > 50:
+        return None
+    key = re.sub(r'[^a-z& ]', '', line.lower()).strip()
+    return _HEADING_LOOKUP.get(key)
+
+
+def split_sections(lines: List[str]) -> List[Section]:
+    """Split into sections at recognised headings; text before the first heading is 'header'"""
+    sections = [Section('header', [])]
+    for line in lines:
+        name = heading_section(line)
+        if name is not None:
+            sections.append(Section(name, [line]))
+        else:
+            sections[-1].lines.append(line)
+    return [section for section in sections if section.lines]
+
+
+def _render(sections: List[Section]) -> str:
+    return '\n\n'.join('\n'.join(section.lines).strip('\n') for section in sections)
+
+
+def _shorten_entries(section: Section) -> Section:
+    heading, entries = section.lines[0], section.lines[1:]
+    return Section(section.name, [heading] + [
+        entry if len(entry) <= MAX_LIST_ENTRY_CHARS else entry[:MAX_LIST_ENTRY_CHARS].rstrip() + '...'
+        for entry in entries
+    ])
+
+
+def fit_budget(sections: List[Section], token_budget: int) -> Tuple[List[Section], bool]:
+    """
+    Shrink sections until the rendered text fits token_budget
+
+    In order: shorten entries of list sections (one entry per line is kept, so
+    counts survive), drop low-value sections, then cut the longest sections
+    from the end with a marker saying how many lines were left out.
+    """
+    if estimate_tokens(_render(sections)) <= token_budget:
+        return sections, False
+
+    sections = [_shorten_entries(s) if s.name in LIST_SECTIONS and len(s.lines) > 1 else s for s in sections]
+    if estimate_tokens(_render(sections)) <= token_budget:
+        return sections, True
+
+    for name in DROP_ORDER:
+        sections = [s for s in sections if s.name != name]
+        if estimate_tokens(_render(sections)) <= token_budget:
+            return sections, True
+
+    # Cut lines from the end of the longest sections; the marker keeps the gap visible
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    kept = [len(s.lines) for s in sections]
+
+    def trimmed() -> List[Section]:
+        return [
+            s if keep == len(s.lines) else Section(s.name, s.lines[:keep] + [
+                f"[... {len(s.lines) - keep} more lines omitted from this section]"
+            ])
+            for s, keep in zip(sections, kept)
+        ]
+
+    while len(_render(trimmed())) > budget_chars:
+        longest = max(range(len(sections)), key=lambda i: sum(len(line) for line in sections[i].lines[:kept[i]]))
+        if kept[longest] <= 1:
+            # Only headings left - hard cut
+            return [Section('truncated', [_render(trimmed())[:budget_chars]])], True
+        overflow = len(_render(trimmed())) - budget_chars
+        removed = 0
+        while kept[longest] > 1 and removed < overflow:
+            kept[longest] -= 1
+            removed += len(sections[longest].lines[kept[longest]]) + 1
+
+    return trimmed(), True
+
+
+def prepare_resume_text(text: str, token_budget: Optional[int] = DEFAULT_TOKEN_BUDGET) -> PreparedText:
+    """Clean extracted resume text and fit it into token_budget (None = no limit)"""
+    original_tokens = estimate_tokens(text)
+
+    cleaned = strip_repeated_headers(normalize_whitespace(text))
+    lines = dedupe_contact_lines([line for line in cleaned.replace(PAGE_SEPARATOR, '\n').split('\n')])
+    sections = split_sections(lines)
+
+    truncated = False
+    if token_budget is not None:
+        sections, truncated = fit_budget(sections, token_budget)
+
+    prepared = re.sub(r'\n{3,}', '\n\n', _render(sections)).strip()
+    return PreparedText(prepared, original_tokens, estimate_tokens(prepared),
+                        [section.name for section in sections], truncated)
@@ -0,0 +1,89 @@
+"""
+Cached personality-test token resolution
+Keeps recently verified token -> candidate lookups in memory for a short TTL
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenResolver:
+    """In-process LRU cache in front of an indexed token lookup"""
+
+    def __init__(self, lookup: Callable[[str], Optional[Dict[str, Any]]],
+                 ttl_seconds: float = 60.0, max_entries: int = 1024):
+        """
+        Args:
+            lookup: Uncached token -> candidate function (one indexed read)
+            ttl_seconds: How long a resolved token is served from memory
+            max_entries: LRU bound on cached tokens
+        """
+        self.lookup = lookup
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        # Bumped by invalidate - a lookup that started before it must not be cached.
+        # _generation covers every token: clear() and forgetting an old counter bump it
+        self._generations: 'OrderedDict[str, int]' = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _version(self, test_token: str) -> tuple:
+        return self._generation, self._generations.get(test_token, 0)
+
+    def resolve(self, test_token: str) -> Optional[Dict[str, Any]]:
+        """Return the candidate for a test token, or None if the token is unknown"""
+        start = time.perf_counter()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(test_token)
+            if entry is not None and now - entry[0] <= self.ttl_seconds:
+                self._entries.move_to_end(test_token)
+                self.hits += 1
+                logger.debug("token resolved", extra={
+                    'token_prefix': test_token[:8], 'cache': 'hit',
+                    'latency_ms': round((time.perf_counter() - start) * 1000, 3)
+                })
+                return dict(entry[1])
+            version = self._version(test_token)
+
+        candidate = self.lookup(test_token)
+
+        with self._lock:
+            self.misses += 1
+            # Unknown tokens are not cached - a token may be created right after a failed lookup;
+            # nor are lookups an invalidate raced with, as they may have read the old row
+            if candidate is not None and self._version(test_token) == version:
+                self._entries[test_token] = (now, candidate)
+                self._entries.move_to_end(test_token)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        logger.info("token resolved", extra={
+            'token_prefix': test_token[:8], 'cache': 'miss', 'found': candidate is not None,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 3)
+        })
+        return dict(candidate) if candidate is not None else None
+
+    def invalidate(self, test_token: str):
+        """Drop a token, e.g. when its test is completed"""
+        with self._lock:
+            self._entries.pop(test_token, None)
+            self._generations[test_token] = self._generations.get(test_token, 0) + 1
+            self._generations.move_to_end(test_token)
+            if len(self._generations) > self.max_entries:
+                self._generations.popitem(last=False)
+                self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1